@@ -9,6 +9,24 @@ import sys
 # Add current directory to path
 sys.path.append(os.getcwd())
 from scrapers.myschool_scraper import MySchoolScraper
+from scrapers.local_store import LocalStore, BLOCKED
+from scripts.remote_manifest import RemoteManifest, fetch_manifest, fetch_partition_digests
+from backend.hashing import url_hash
+from scripts.uploader import Uploader
+
+def upload(server_url, questions):
+    """Pushes questions with the concurrent, resumable uploader and prints a summary."""
+    uploader = Uploader(server_url)
+    try:
+        report = uploader.upload(questions)
+    finally:
+        uploader.close()
+    print(f"  Added {report['accepted']} new questions ({report['duplicates']} already there) "
+          f"in {report['batches']} batches, {report['seconds']}s.")
+    if report['failed']:
+        print(f"  {len(report['failed'])} batches failed ({report['failed'][0]['error']}). "
+              "Run the sync again to resume them.")
+    return report
 
 def ultimate_sync():
     DEFAULT_URL = "https://waec-neco-jamb-igcse-past-questions.onrender.com"
@@ -52,62 +70,42 @@ def ultimate_sync():
     
     if choice == "3":
         print("\n--- Deep Scan Mode ---")
-        print("Scanning 'data/' folder for existing questions...")
-        all_to_upload = []
-        
-        # Walk through the data directory
-        for root, dirs, files in os.walk("data"):
-            for file in files:
-                if file == "questions.json":
-                    path = os.path.join(root, file)
-                    try:
-                        with open(path, 'r', encoding='utf-8') as f:
-                            qs = json.load(f)
-                            if not qs: continue
-                            
-                        # Infer data from path if possible: data/subject/exam/year/...
-                        parts = root.replace('\\', '/').split('/')
-                        # parts looks like: ['data', 'chemistry', 'waec', '2023']
-                        inf_subject = parts[1] if len(parts) > 1 else 'unknown'
-                        inf_exam = parts[2] if len(parts) > 2 else 'waec'
-                        inf_year = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else None
-                        
-                        for q in qs:
-                            if not q.get('subject'): q['subject'] = inf_subject
-                            if not q.get('exam_type'): q['exam_type'] = inf_exam
-                            if not q.get('year') and inf_year: q['year'] = inf_year
-                            if not q.get('question_type'): q['question_type'] = 'objective'
-                            all_to_upload.append(q)
-                    except Exception as e:
-                        print(f"Error reading {path}: {e}")
+        print("Reading the local question store (data/questions.sqlite)...")
+        store = LocalStore()
+        # Questions cached by older versions as data/<subject>/<exam>/<year>/<type>/questions.json
+        store.import_json_tree_once()
+
+        # Compare per-partition digests so only partitions that changed are sent
+        server_digests = fetch_partition_digests(server_url)
+        if server_digests is None:
+            print("Server has no /sync/partitions yet. Sending everything...")
+            changed = None
+            all_to_upload = list(store.iter_questions())
+        else:
+            changed = store.changed_partitions(server_digests)
+            all_to_upload = [q for p in changed for q in store.iter_questions(*p.scope)]
+            if not changed:
+                print("Everything is already on the server. Nothing to upload.")
+                return
+            print(f"{len(changed)} partitions changed since the last sync.")
 
         if not all_to_upload:
             print("No questions found in your 'data/' folder.")
             return
             
-        print(f"Found total of {len(all_to_upload)} questions locally.")
-        confirm = input("Upload ALL to Render? (y/n): ").strip().lower()
+        print(f"Found {len(all_to_upload)} questions to upload.")
+        confirm = input("Upload them to Render? (y/n): ").strip().lower()
         if confirm == 'y':
-            # Process in batches of 100 to avoid server timeouts
-            batch_size = 100
-            for i in range(0, len(all_to_upload), batch_size):
-                batch = all_to_upload[i:i+batch_size]
-                print(f"Uploading batch {i//batch_size + 1} ({i} to {i+len(batch)})...")
-                try:
-                    res = requests.post(f"{server_url}/questions/bulk", json=batch, timeout=30)
-                    if res.status_code == 200:
-                        print(f"  Result: {res.json().get('message')}")
-                    else:
-                        print(f"  SERVER ERROR {res.status_code}: {res.text[:500]}")
-                        print("\nStopping to avoid further errors. Please check your Render logs.")
-                        return
-                    
-                    # Add a small delay to avoid overwhelming the server
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"  CRITICAL ERROR: {e}")
-                    return
+            print("Uploading in concurrent compressed batches...")
+            try:
+                report = upload(server_url, all_to_upload)
+            except Exception as e:
+                print(f"  CRITICAL ERROR: {e}")
+                return
+            if report['failed']:
+                return
+            if changed:
+                store.mark_pushed(changed, fetch_partition_digests(server_url) or {})
             print("\nDONE! All local questions have been pushed to Render.")
         return
     
@@ -194,8 +192,7 @@ def ultimate_sync():
             return
 
         print(f"Sending to your Render server at {server_url}...")
-        res = requests.post(f"{server_url}/questions/bulk", json=formatted)
-        print(f"Server Response: {res.json().get('message', res.text)}")
+        upload(server_url, formatted)
         return
 
     # 4. Scrape Mode
@@ -204,52 +201,61 @@ def ultimate_sync():
     q_type = input("Type (objective/theory) [objective]: ").strip().lower() or "objective"
     limit = int(input("Limit [50]: ").strip() or "50")
 
-    scraper = MySchoolScraper()
+    # Finished pages are remembered in data/.frontier.sqlite, so a crash,
+    # block or Ctrl-C resumes from where it stopped on the next run
+    scraper = MySchoolScraper(frontier=True)
+    done = scraper.frontier.stats().get('done', 0)
+    if done:
+        print(f"Resuming: {done} pages already scraped in earlier runs.")
     
     # Enhanced logic: Skip years already on remote to save requests
     print("\nChecking remote status...")
-    remote_resp = requests.get(f"{server_url}/questions?subject={subject}&question_type={q_type}")
-    remote_urls = []
-    if remote_resp.status_code == 200:
-        remote_urls = [q['source_url'] for q in remote_resp.json() if q.get('source_url')]
-        print(f"Already have {len(remote_urls)} questions on server.")
+    remote = fetch_manifest(server_url, subject=subject, question_type=q_type)
+    if remote is None:
+        # Older server without /sync/manifest
+        remote = RemoteManifest()
+        remote_resp = requests.get(f"{server_url}/questions?subject={subject}&question_type={q_type}")
+        if remote_resp.status_code == 200:
+            remote.url_hashes = {url_hash(q['source_url']) for q in remote_resp.json() if q.get('source_url')}
+    print(f"Already have {len(remote.url_hashes)} questions on server.")
 
+    store = LocalStore()
+    store.import_json_tree_once()
     all_found = []
     current_year = 2025 # Fixed year focus
     
     for year in range(current_year, 2000, -1):
         if len(all_found) >= limit: break
         
-        # Check local cache first
-        cache_dir = f"data/{subject.lower().replace(' ','_')}/{exam}/{year}/{q_type}"
-        os.makedirs(cache_dir, exist_ok=True)
-        cache_file = f"{cache_dir}/questions.json"
-        
-        year_qs = []
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                year_qs = json.load(f)
+        # Check local store first
+        year_qs = store.load_partition(subject, exam, year, q_type) or []
         
         if not year_qs:
-            print(f"-- Year {year}: Scraping (Wait 3-7s) --")
+            print(f"-- Year {year}: Scraping --")
             sub_url = f"https://myschool.ng/classroom/{subject.lower().replace(' ','-')}"
             year_qs = scraper.scrape_questions(sub_url, limit=50, min_year=year, max_year=year, exam_type=exam, question_type=q_type)
             
             if year_qs:
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(year_qs, f, indent=2)
-            elif getattr(scraper, 'was_blocked', False):
+                store.save_partition(subject, exam, year, q_type, year_qs)
+            elif scraper.block_stats()['blocked']:
+                store.save_partition(subject, exam, year, q_type, [], status=BLOCKED)
                 print(f"!! BLOCKED BY MYSCHOOL for year {year} !!")
                 print("Try again in 5 minutes or use ALOC (Choice 2).")
                 break
+            else:
+                store.save_partition(subject, exam, year, q_type, [])
         
         for q in year_qs:
-            if q['source_url'] not in remote_urls:
-                q['subject'] = subject
+            q['subject'] = subject
+            if not remote.contains(q):
                 all_found.append(q)
+                remote.add(q)
                 
         if len(all_found) >= limit: break
 
+    if scraper.controller:
+        print(f"Request rate settled at {scraper.controller.stats()['rate']} req/s.")
+
     if not all_found:
         print("\nNo new questions found to upload.")
     else:
@@ -257,8 +263,7 @@ def ultimate_sync():
         confirm = input("Upload now? (y/n): ").strip().lower()
         if confirm == 'y':
             print("Uploading...")
-            res = requests.post(f"{server_url}/questions/bulk", json=all_found)
-            print(f"Server: {res.json().get('message', res.text)}")
+            upload(server_url, all_found)
 
 if __name__ == "__main__":
     try:
@@ -5,9 +5,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class ALOCClient:
-    def __init__(self):
+    def __init__(self, token=None):
         self.base_url = "https://questions.aloc.com.ng/api/v2"
-        self.token = os.getenv("ALOC_TOKEN")
+        self.token = token or os.getenv("ALOC_TOKEN")
 
     def get_question(self, subject, year=None, type=None):
         params = {"subject": subject}
@@ -25,8 +25,12 @@ class ALOCClient:
             return response.json()
         return None
 
-    def get_multiple_questions(self, subject, count=10):
+    def get_multiple_questions(self, subject, count=10, year=None, type=None):
         params = {"subject": subject, "count": count}
+        if year:
+            params["year"] = year
+        if type:
+            params["type"] = type
         headers = {}
         if self.token:
             headers["AccessToken"] = self.token
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+# Allow running as `python backend/benchmark.py` as well as `python -m backend.benchmark`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def synthetic_rows(count):
+    subjects = ["mathematics", "english", "physics", "chemistry", "biology"]
+    for i in range(count):
+        yield {
+            "body": f"Question {i}: which of the following best describes the value of x in equation {i % 97}?",
+            "options": [f"Option {c} for {i}" for c in "ABCD"],
+            "answer": "ABCD"[i % 4],
+            "explanation": None if i % 3 else f"Because x = {i % 97}; the other options don't satisfy it.",
+            "subject": subjects[i % len(subjects)],
+            "year": 2000 + i % 24,
+            "exam_type": "jamb" if i % 2 else "waec",
+            "question_type": "objective",
+            "topic": "General",
+            "source_url": f"https://myschool.ng/classroom/mathematics/{i}",
+            "content_hash": f"{i:064x}",
+        }
+
+def timed(fn, repeat):
+    """Best wall time of `repeat` runs, and the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rows/second of /questions serialization: pydantic per row vs. column tuples (FAST_JSON)."
+    )
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db', help="SQLite file to use (default: a temporary one)")
+    args = parser.parse_args(argv)
+
+    # backend.main creates its tables on import: point it at a scratch database first
+    path = args.db or os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from sqlalchemy import insert
+    from backend import main as api
+    from backend.models import Question, SessionLocal
+
+    db = SessionLocal()
+    try:
+        existing = db.query(Question).count()
+        if existing < args.rows:
+            rows = list(synthetic_rows(args.rows))[existing:]
+            for start in range(0, len(rows), 5000):
+                db.execute(insert(Question), rows[start:start + 5000])
+            db.commit()
+        query = db.query(Question).order_by(Question.id).limit(args.rows)
+
+        results = {}
+        for name, fast in (("pydantic", False), ("fast", True)):
+            seconds, body = timed(lambda: api.render_json(api.question_rows(query, fast=fast), fast=fast), args.repeat)
+            results[name] = body
+            print(f"{name:>9}: {args.rows} rows in {seconds:.3f}s = {args.rows / seconds:,.0f} rows/s "
+                  f"({len(body) / 1e6:.1f} MB)")
+            db.expire_all()
+        print(f"  encoder: {'orjson' if api.orjson is not None else 'json (install orjson for more)'}")
+        print(f"same body: {results['pydantic'] == results['fast']}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from itertools import chain
+from collections import OrderedDict
+from sqlalchemy import event, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import DATABASE_URL, DataVersion, Question, SessionLocal, canonical, engine
+
+# Generation of entries that don't depend on the questions table (a live
+# scrape of myschool.ng): bumps leave them alone, only their TTL ends them
+STATIC = 'static'
+
+# Query parameters stored canonical (see models.canonical), so case and
+# whitespace variants of one request share a cache entry
+CANONICAL_PARAMS = {'subject', 'exam_type', 'question_type'}
+
+class DatabaseVersion:
+    """Reads and bumps a data_versions row, shared by every process on the database.
+
+    The generation is "<token>:<version>". Reads hit the database at most
+    once per `check_interval` seconds per process; a bump from this process
+    is seen immediately, one from elsewhere within `check_interval`.
+    """
+
+    def __init__(self, name='questions', session_factory=SessionLocal, check_interval=1.0):
+        self.name = name
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self._current = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read(self, db):
+        row = db.get(DataVersion, self.name)
+        if row is None:
+            try:
+                row = DataVersion(name=self.name, token=uuid.uuid4().hex, version=0, updated_at=time.time())
+                db.add(row)
+                db.commit()
+            except IntegrityError:
+                # Another process created it first
+                db.rollback()
+                row = db.get(DataVersion, self.name)
+        return f"{row.token}:{row.version}"
+
+    def current(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._current is not None and now - self._checked_at < self.check_interval:
+                return self._current
+        db = self.session_factory()
+        try:
+            value = self._read(db)
+        finally:
+            db.close()
+        with self._lock:
+            self._current, self._checked_at = value, now
+        return value
+
+    def bump(self):
+        db = self.session_factory()
+        try:
+            self._read(db)
+            db.execute(update(DataVersion).where(DataVersion.name == self.name)
+                       .values(version=DataVersion.version + 1, updated_at=time.time()))
+            db.commit()
+            db.expire_all()
+            value = self._read(db)
+        finally:
+            db.close()
+        with self._lock:
+            self._current, self._checked_at = value, time.monotonic()
+        return value
+
+class LocalVersion:
+    """Per-process generation counter, for a cache without a database row."""
+
+    def __init__(self):
+        self.version = 0
+
+    def current(self):
+        return str(self.version)
+
+    def bump(self):
+        self.version += 1
+        return str(self.version)
+
+class MemoryStore:
+    """Per-process LRU of (generation, expires, value)."""
+
+    name = 'memory'
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def retain(self, generation):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[0] not in (generation, STATIC)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteStore:
+    """LRU of rendered responses in a SQLite file, shared by the processes of one host.
+
+    Values are (body bytes, headers dict). Recency is refreshed at most every
+    `touch_interval` seconds per entry to keep hits from writing, and the
+    size bound enforced every `prune_every` stores. SQLite
+    errors (a busy or missing file) count as misses rather than failing the
+    request.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path, maxsize=512, touch_interval=10.0, prune_every=32):
+        self.path = path
+        self.maxsize = maxsize
+        self.touch_interval = touch_interval
+        self.prune_every = prune_every
+        self.evictions = 0
+        self._sets = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=OFF')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                generation TEXT NOT NULL,
+                expires REAL NOT NULL,
+                used REAL NOT NULL,
+                body BLOB NOT NULL,
+                headers TEXT NOT NULL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS ix_entries_used ON entries (used)')
+        self.db.commit()
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key, default=str)
+
+    def get(self, key):
+        try:
+            with self._lock:
+                row = self.db.execute('SELECT generation, expires, used, body, headers FROM entries WHERE key = ?',
+                                      (self._key(key),)).fetchone()
+                if row is None:
+                    return None
+                generation, expires, used, body, headers = row
+                now = time.time()
+                if now - used > self.touch_interval:
+                    self.db.execute('UPDATE entries SET used = ? WHERE key = ?', (now, self._key(key)))
+                    self.db.commit()
+            # Stored as wall-clock time, shared across processes
+            return generation, expires, (bytes(body), json.loads(headers))
+        except sqlite3.Error:
+            return None
+
+    def set(self, key, entry):
+        generation, expires, (body, headers) = entry
+        try:
+            with self._lock:
+                self.db.execute(
+                    'INSERT OR REPLACE INTO entries (key, generation, expires, used, body, headers) VALUES (?, ?, ?, ?, ?, ?)',
+                    (self._key(key), generation, expires, time.time(), body, json.dumps(headers))
+                )
+                self._sets += 1
+                if self._sets % self.prune_every == 0:
+                    self._prune()
+                self.db.commit()
+        except sqlite3.Error:
+            pass
+
+    def _prune(self):
+        count = self.db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        if count > self.maxsize:
+            self.db.execute('DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)',
+                            (count - self.maxsize,))
+            self.evictions += count - self.maxsize
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                self.db.execute('DELETE FROM entries WHERE key = ?', (self._key(key),))
+                self.db.commit()
+        except sqlite3.Error:
+            pass
+
+    def retain(self, generation):
+        try:
+            with self._lock:
+                self.db.execute('DELETE FROM entries WHERE generation NOT IN (?, ?)', (generation, STATIC))
+                self.db.commit()
+        except sqlite3.Error:
+            pass
+
+    def __len__(self):
+        try:
+            with self._lock:
+                return self.db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+class ResponseCache:
+    """Rendered responses with a TTL, tagged with the data generation they were built from.
+
+    Commits that write to the questions table call bump() (see the session
+    hooks below): every entry made under an older generation is dead from then on, so readers never see data from
+    before a write. With the database version (see build_cache) a bump in
+    any process, including the job worker, reaches every gunicorn worker;
+    with the SQLite store they also share the entries themselves.
+    """
+
+    def __init__(self, maxsize=512, ttl=300.0, store=None, version=None):
+        self.store = MemoryStore(maxsize) if store is None else store
+        self.version = LocalVersion() if version is None else version
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self.store.maxsize
+
+    @property
+    def generation(self):
+        return self.version.current()
+
+    @property
+    def evictions(self):
+        return self.store.evictions
+
+    @staticmethod
+    def key(name, params):
+        normalized = []
+        for param, value in params.items():
+            if value is None or value == '':
+                continue
+            if param in CANONICAL_PARAMS:
+                value = canonical(value)
+            elif isinstance(value, str):
+                value = value.strip()
+            normalized.append((param, value))
+        return (name, tuple(sorted(normalized)))
+
+    @staticmethod
+    def etag(key, generation):
+        """Strong ETag for the response under `key` at `generation`.
+
+        A response is a function of its parameters and the data, so the tag
+        can be computed, and a conditional request answered, before any query.
+        """
+        digest = hashlib.sha256(f"{generation}|{json.dumps(key, default=str)}".encode('utf-8')).hexdigest()
+        return f'"{key[0]}-{digest[:32]}"'
+
+    def get(self, key):
+        entry = self.store.get(key)
+        if entry is None or entry[0] not in (self.generation, STATIC) or entry[1] < time.time():
+            if entry is not None:
+                self.store.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key, value, generation, ttl=None):
+        """Stores `value` if no write happened since `generation` was read (or it is STATIC)."""
+        if generation != STATIC and generation != self.generation:
+            return
+        self.store.set(key, (generation, time.time() + (ttl or self.ttl), value))
+
+    def bump(self):
+        self.store.retain(self.version.bump())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.store.name, 'entries': len(self.store), 'maxsize': self.store.maxsize, 'ttl': self.ttl,
+            'generation': self.generation, 'hits': self.hits, 'misses': self.misses,
+            'evictions': self.store.evictions, 'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def default_cache_path():
+    """One cache file per database, in the temp dir shared by the host's workers."""
+    digest = hashlib.sha256(DATABASE_URL.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"past_questions_cache_{digest}.sqlite")
+
+def build_cache():
+    """The process-wide cache, configured by RESPONSE_CACHE_* environment variables.
+
+    RESPONSE_CACHE_BACKEND is 'sqlite' (shared by the host's workers,
+    default) or 'memory' (per process). Either way the generation comes from
+    the database, so writes from any process invalidate.
+    """
+    maxsize = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+    ttl = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+    store = None
+    if os.getenv('RESPONSE_CACHE_BACKEND', 'sqlite') == 'sqlite':
+        try:
+            store = SQLiteStore(os.getenv('RESPONSE_CACHE_PATH') or default_cache_path(), maxsize)
+        except sqlite3.Error as e:
+            print(f"Shared response cache unavailable, using memory: {e}")
+    check_interval = float(os.getenv('RESPONSE_CACHE_VERSION_CHECK', '1.0'))
+    return ResponseCache(maxsize, ttl, store, DatabaseVersion(check_interval=check_interval))
+
+response_cache = build_cache()
+
+# Invalidation follows every ORM write to questions, like the facet counts
+# (backend/facets.py): a session that flushed Question objects or ran an
+# INSERT/UPDATE/DELETE on Question bumps the generation once it commits.
+# Only sessions on the API's database count; LocalStore reuses the model.
+
+@event.listens_for(Session, 'after_flush')
+def _note_flushed_questions(session, flush_context):
+    for obj in chain(session.new, session.deleted, session.dirty):
+        if isinstance(obj, Question) and (obj not in session.dirty or session.is_modified(obj)):
+            session.info['questions_changed'] = True
+            return
+
+# insert=True: facets' hook returns the DELETE's result, which skips later hooks
+@event.listens_for(Session, 'do_orm_execute', insert=True)
+def _note_bulk_questions(state):
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is Question.__mapper__:
+        state.session.info['questions_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    if session.info.pop('questions_changed', False) and session.get_bind() is engine:
+        try:
+            response_cache.bump()
+        except Exception as e:
+            print(f"Response cache not invalidated: {e}")
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_questions_changed(session):
+    session.info.pop('questions_changed', None)
@@ -0,0 +1,124 @@
+from collections import Counter
+from sqlalchemy import event, func, inspect, insert, select, update
+from sqlalchemy.orm import Session
+from .models import Question, QuestionFacet
+
+FACET_COLUMNS = ('subject', 'exam_type', 'year', 'topic', 'question_type')
+
+# Counts follow every ORM write: Question objects added, changed or deleted
+# through a session (flush hooks below) and bulk `query(Question).delete()`
+# (do_orm_execute hook). Bulk INSERT statements go through
+# ingest.insert_questions, which records its own counts; bulk UPDATEs of
+# facet columns and raw SQL are not tracked, run `migrate` after those.
+
+def facet_key(row):
+    """Returns the facet tuple for a Question or a dict of column values."""
+    get = row.get if isinstance(row, dict) else lambda name: getattr(row, name, None)
+    return (
+        get('subject') or '',
+        get('exam_type') or '',
+        get('year') or 0,
+        get('topic') or '',
+        get('question_type') or '',
+    )
+
+def _dialect_insert(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def apply_counts(db, counts):
+    """Adds a Counter of facet_key -> delta to the facet table."""
+    counts = {key: delta for key, delta in counts.items() if delta}
+    if not counts:
+        return
+
+    upsert = _dialect_insert(db)
+    if upsert is not None:
+        stmt = upsert(QuestionFacet)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(FACET_COLUMNS),
+            set_={'count': QuestionFacet.count + stmt.excluded['count']}
+        )
+        db.execute(stmt, [dict(zip(FACET_COLUMNS, key), count=delta) for key, delta in counts.items()])
+    else:
+        # Statements only (no flush), so this also works from the flush hooks
+        for key, delta in counts.items():
+            match = dict(zip(FACET_COLUMNS, key))
+            result = db.execute(update(QuestionFacet).filter_by(**match).values(count=QuestionFacet.count + delta))
+            if not result.rowcount:
+                db.execute(insert(QuestionFacet).values(count=delta, **match))
+
+    if any(delta < 0 for delta in counts.values()):
+        db.query(QuestionFacet).filter(QuestionFacet.count <= 0).delete(synchronize_session=False)
+
+def record_added(db, rows):
+    apply_counts(db, Counter(facet_key(row) for row in rows))
+
+def _old_key(obj):
+    """facet_key of a changed Question as it was loaded."""
+    state = inspect(obj)
+    values = {}
+    for name in FACET_COLUMNS:
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else getattr(obj, name)
+    return facet_key(values)
+
+@event.listens_for(Session, 'before_flush')
+def _count_flush(session, flush_context, instances):
+    """Collects facet deltas of the Question objects about to be flushed."""
+    counts = session.info.setdefault('facet_counts', Counter())
+    for obj in session.new:
+        if isinstance(obj, Question):
+            # The column default is applied by the INSERT, after this hook
+            counts[facet_key(obj)[:-1] + (obj.question_type or 'objective',)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            counts[_old_key(obj)] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Question) and session.is_modified(obj):
+            counts[_old_key(obj)] -= 1
+            counts[facet_key(obj)] += 1
+
+@event.listens_for(Session, 'after_flush')
+def _apply_flush(session, flush_context):
+    counts = session.info.pop('facet_counts', None)
+    if counts:
+        apply_counts(session, counts)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_flush(session):
+    session.info.pop('facet_counts', None)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _count_bulk_delete(state):
+    """Subtracts the rows a bulk DELETE of questions removes."""
+    if not (state.is_delete and state.bind_mapper is Question.__mapper__):
+        return None
+    columns = [getattr(Question, name) for name in FACET_COLUMNS]
+    query = select(*columns, func.count()).group_by(*columns)
+    if state.statement.whereclause is not None:
+        query = query.where(state.statement.whereclause)
+    counts = Counter()
+    for row in state.session.execute(query):
+        counts[facet_key(dict(zip(FACET_COLUMNS, row[:-1])))] -= row[-1]
+    result = state.invoke_statement()
+    apply_counts(state.session, counts)
+    return result
+
+def reset(db):
+    db.query(QuestionFacet).delete(synchronize_session=False)
+
+def rebuild(db):
+    """Recomputes the whole facet table from the questions table."""
+    reset(db)
+    columns = [getattr(Question, name) for name in FACET_COLUMNS]
+    counts = Counter()
+    for row in db.query(*columns, func.count(Question.id)).group_by(*columns):
+        counts[facet_key(dict(zip(FACET_COLUMNS, row[:-1])))] += row[-1]
+    apply_counts(db, counts)
@@ -0,0 +1,37 @@
+import hashlib
+
+def _norm(value):
+    return str(value).strip().lower() if value is not None else ''
+
+def content_hash(body, subject, year, exam_type):
+    """Deterministic identity of a question used for deduplication.
+
+    Whitespace in the body is collapsed and the metadata lower-cased, so the
+    same question scraped twice (or cached locally by a sync client) always
+    hashes to the same value. Kept free of SQLAlchemy so the sync scripts can
+    import it.
+    """
+    body = ' '.join((body or '').split())
+    key = '\x1f'.join([body, _norm(subject), str(year) if year else '', _norm(exam_type)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+# Length of the hex prefixes served by the compact sync manifest (64 bits)
+SHORT_HASH_LEN = 16
+
+def url_hash(url):
+    """Short digest of a source URL, as listed in the compact sync manifest."""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:SHORT_HASH_LEN]
+
+def partition_digest(content_hashes):
+    """Order-independent digest of a partition's content hashes.
+
+    The count plus the XOR of the hashes, so server and client can compute
+    it while streaming rows in any order and compare partitions without
+    exchanging the hashes themselves.
+    """
+    count, acc = 0, 0
+    for h in content_hashes:
+        if h:
+            count += 1
+            acc ^= int(h, 16)
+    return f"{count}-{acc:064x}"
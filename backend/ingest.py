@@ -0,0 +1,91 @@
+from sqlalchemy import event, or_
+from .models import Question, canonical
+from .hashing import content_hash
+from . import facets
+
+# Keeps IN (...) lists well under SQLite's bound parameter limit
+IN_CHUNK = 500
+
+@event.listens_for(Question, 'before_insert')
+def fill_content_hash(mapper, connection, target):
+    if not target.content_hash:
+        target.content_hash = content_hash(target.body, target.subject, target.year, target.exam_type)
+
+def question_row(data):
+    """Builds a canonical questions-table row from a dict of incoming fields."""
+    row = {
+        'body': data['body'],
+        'options': data.get('options'),
+        'answer': data.get('answer'),
+        'explanation': data.get('explanation'),
+        'subject': canonical(data.get('subject')),
+        'year': data.get('year'),
+        'exam_type': canonical(data.get('exam_type')),
+        'question_type': canonical(data.get('question_type')) or 'objective',
+        'topic': (data.get('topic') or 'General').strip(),
+        'source_url': data.get('source_url') or None,
+    }
+    row['content_hash'] = content_hash(row['body'], row['subject'], row['year'], row['exam_type'])
+    return row
+
+def existing_keys(db, hashes, urls):
+    """Returns the subset of content hashes and source URLs already stored."""
+    found_hashes, found_urls = set(), set()
+    hashes, urls = list(hashes), list(urls)
+    for i in range(0, max(len(hashes), len(urls)), IN_CHUNK):
+        hash_chunk, url_chunk = hashes[i:i + IN_CHUNK], urls[i:i + IN_CHUNK]
+        conditions = []
+        if hash_chunk:
+            conditions.append(Question.content_hash.in_(hash_chunk))
+        if url_chunk:
+            conditions.append(Question.source_url.in_(url_chunk))
+        if not conditions:
+            continue
+        for h, url in db.query(Question.content_hash, Question.source_url).filter(or_(*conditions)):
+            found_hashes.add(h)
+            if url:
+                found_urls.add(url)
+    return found_hashes, found_urls
+
+def _insert_statement(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy import insert
+        return insert(Question)
+    return insert(Question).on_conflict_do_nothing()
+
+def insert_questions(db, items):
+    """Inserts new questions with a constant number of statements per call.
+
+    `items` are dicts shaped like QuestionSchema. Duplicates (same content
+    hash or source_url, within the batch or already stored) are skipped.
+    Returns (added, duplicates); the caller commits.
+    """
+    rows, seen_hashes, seen_urls = [], set(), set()
+    for item in items:
+        row = question_row(item)
+        if row['content_hash'] in seen_hashes or (row['source_url'] and row['source_url'] in seen_urls):
+            continue
+        seen_hashes.add(row['content_hash'])
+        if row['source_url']:
+            seen_urls.add(row['source_url'])
+        rows.append(row)
+
+    if rows:
+        found_hashes, found_urls = existing_keys(db, seen_hashes, seen_urls)
+        rows = [r for r in rows if r['content_hash'] not in found_hashes and r['source_url'] not in found_urls]
+
+    added = []
+    if rows:
+        stmt = _insert_statement(db).returning(*(getattr(Question, c) for c in facets.FACET_COLUMNS))
+        # render_nulls keeps every row on the same key set, otherwise the ORM
+        # splits the batch into one INSERT per distinct set of non-NULL columns
+        stmt = stmt.execution_options(render_nulls=True)
+        added = [dict(zip(facets.FACET_COLUMNS, r)) for r in db.execute(stmt, rows)]
+        facets.record_added(db, added)
+
+    return len(added), len(items) - len(added)
@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+from sqlalchemy import func, update
+
+from . import aloc_client, ingest
+from . import cache  # noqa: F401  (session hooks: job writes invalidate cached responses)
+from .models import Job, Question, WorkerHeartbeat, canonical
+
+# Add parent directory to path to import scrapers
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.myschool_scraper import MySchoolScraper
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# A running job whose worker has not reported for this long is assumed dead
+STALE_AFTER = 15 * 60
+MAX_ATTEMPTS = 3
+# Idle workers record a heartbeat this often; the API warns about queued
+# jobs when no worker has reported for WORKER_SILENT_AFTER
+HEARTBEAT_EVERY = 30
+WORKER_SILENT_AFTER = 5 * 60
+
+HANDLERS = {}
+
+class JobError(Exception):
+    """A job failed for a reason worth showing to the user as is."""
+
+def handler(kind):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+def enqueue(db, kind, params):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, params=params, status=QUEUED, attempts=0, created_at=time.time())
+    db.add(job)
+    db.commit()
+    return job
+
+def claim(db, worker):
+    """Marks the oldest queued job as running for `worker` and returns it, or None.
+
+    The conditional UPDATE makes the claim atomic on SQLite and PostgreSQL
+    alike: if another worker took the row first, no row matches and the
+    next candidate is tried.
+    """
+    while True:
+        candidate = db.query(Job.id).filter(Job.status == QUEUED).order_by(Job.id).first()
+        if candidate is None:
+            return None
+        now = time.time()
+        result = db.execute(
+            update(Job).where(Job.id == candidate.id, Job.status == QUEUED)
+            .values(status=RUNNING, worker=worker, attempts=Job.attempts + 1, started_at=now, heartbeat_at=now)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.get(Job, candidate.id)
+
+def requeue_stale(db, stale_after=STALE_AFTER):
+    """Puts running jobs of dead workers back in the queue, or fails them after MAX_ATTEMPTS."""
+    cutoff = time.time() - stale_after
+    stale = db.query(Job).filter(Job.status == RUNNING, Job.heartbeat_at < cutoff).all()
+    for job in stale:
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status, job.finished_at = FAILED, time.time()
+            job.error = f"Worker {job.worker} stopped responding {job.attempts} times."
+        else:
+            job.status, job.worker = QUEUED, None
+    db.commit()
+    return len(stale)
+
+def beat(db, worker):
+    row = db.get(WorkerHeartbeat, worker) or WorkerHeartbeat(worker=worker)
+    row.seen_at = time.time()
+    db.add(row)
+    db.commit()
+
+def worker_seen_at(db):
+    """Last time any worker reported: an idle heartbeat or a running job's progress."""
+    times = [db.query(func.max(WorkerHeartbeat.seen_at)).scalar(),
+             db.query(func.max(Job.heartbeat_at)).filter(Job.status == RUNNING).scalar()]
+    times = [t for t in times if t]
+    return max(times) if times else None
+
+def worker_warning(db):
+    """Message for a queued job when no worker seems to be running, else None."""
+    seen = worker_seen_at(db)
+    if seen is not None and time.time() - seen < WORKER_SILENT_AFTER:
+        return None
+    return (f"No job worker has reported in the last {WORKER_SILENT_AFTER // 60} minutes; the job stays queued "
+            "until one runs (python -m backend.worker, the render.yaml worker service).")
+
+class Progress:
+    """Passed to handlers; every update is committed and doubles as a heartbeat."""
+
+    def __init__(self, db, job):
+        self.db = db
+        self.job = job
+
+    def update(self, **fields):
+        self.job.progress = dict(self.job.progress or {}, **fields)
+        self.job.heartbeat_at = time.time()
+        self.db.commit()
+
+def run(db, job):
+    """Runs a claimed job to completion and records its result and throughput."""
+    start = time.monotonic()
+    try:
+        result = HANDLERS[job.kind](db, job.params or {}, Progress(db, job))
+    except Exception as e:
+        db.rollback()
+        job.status, job.finished_at = FAILED, time.time()
+        job.error = str(e) if isinstance(e, JobError) else f"{type(e).__name__}: {e}"
+        db.commit()
+        return job
+
+    seconds = time.monotonic() - start
+    result = dict(result, seconds=round(seconds, 2))
+    if result.get('fetched') is not None:
+        result['per_second'] = round(result['fetched'] / seconds, 2) if seconds else None
+    job.status, job.result, job.finished_at = DONE, result, time.time()
+    db.commit()
+    return job
+
+def job_dict(job):
+    return {
+        'id': job.id, 'kind': job.kind, 'params': job.params, 'status': job.status, 'attempts': job.attempts,
+        'worker': job.worker, 'progress': job.progress, 'result': job.result, 'error': job.error,
+        'created_at': job.created_at, 'started_at': job.started_at, 'finished_at': job.finished_at,
+        'queued_seconds': round((job.started_at or time.time()) - job.created_at, 2),
+    }
+
+def stats(db):
+    """Per-kind job counts by status and mean throughput of finished jobs."""
+    summary = {}
+    for job in db.query(Job.kind, Job.status, Job.result):
+        entry = summary.setdefault(job.kind, {'statuses': {}, 'done': 0, 'fetched': 0, 'added': 0, 'seconds': 0.0})
+        entry['statuses'][job.status] = entry['statuses'].get(job.status, 0) + 1
+        if job.status == DONE and job.result:
+            entry['done'] += 1
+            for key in ('fetched', 'added', 'seconds'):
+                entry[key] += job.result.get(key) or 0
+    for entry in summary.values():
+        entry['per_second'] = round(entry['fetched'] / entry['seconds'], 2) if entry['seconds'] else None
+        entry['seconds'] = round(entry['seconds'], 2)
+    return summary
+
+def aloc_rows(data, subject):
+    rows = []
+    for q_data in data:
+        options = [q_data['option']['a'], q_data['option']['b'], q_data['option']['c'], q_data['option']['d']]
+        if 'e' in q_data['option'] and q_data['option']['e']:
+            options.append(q_data['option']['e'])
+
+        rows.append({
+            "body": q_data['question'],
+            "options": options,
+            "answer": q_data['answer'].upper() if q_data.get('answer') else 'A',
+            "explanation": q_data.get('solution'),
+            "subject": subject,
+            "year": int(q_data['examyear']) if q_data.get('examyear') and str(q_data['examyear']).isdigit() else None,
+            "exam_type": q_data.get('examtype', 'jamb'),
+            "question_type": 'objective', # ALOC is almost exclusively objective
+            "topic": "General"
+        })
+    return rows
+
+@handler('aloc')
+def fetch_aloc(db, params, progress):
+    subject, count = params['subject'], params.get('count', 50)
+    client = aloc_client.ALOCClient()
+    data = client.get_multiple_questions(subject, count=count)
+    if not data or 'data' not in data:
+        raise JobError(f"Failed to fetch data from ALOC. Error: {data.get('error') if data else 'Unknown'}")
+    rows = aloc_rows(data['data'], subject)
+    progress.update(fetched=len(rows))
+
+    # Duplicates (same content hash) are skipped by the ingest helper
+    added, duplicates = ingest.insert_questions(db, rows)
+    db.commit()
+    return {'fetched': len(rows), 'added': added, 'duplicates': duplicates,
+            'message': f"Added {added} questions for {subject} using ALOC source."}
+
+@handler('myschool')
+def scrape_myschool(db, params, progress):
+    subject = params['subject']
+    year = params.get('year')
+    scraper = MySchoolScraper()
+    subject_url = f"{scraper.base_url}/classroom/{subject.lower().replace(' ', '-')}"
+
+    # Known URLs are not fetched again
+    existing_urls = [url for (url,) in db.query(Question.source_url).filter(
+        Question.subject == canonical(subject), Question.source_url.isnot(None)
+    )]
+    progress.update(phase='scraping', known=len(existing_urls))
+    questions = scraper.scrape_questions(
+        subject_url,
+        limit=params.get('limit', 50),
+        min_year=year if year else 2000,
+        max_year=year if year else None,
+        existing_urls=existing_urls,
+        exam_type=params.get('exam_type'),
+        question_type=params.get('question_type')
+    )
+    blocks = scraper.block_stats()
+    if not questions and blocks['blocked']:
+        raise JobError("MySchool is blocking this server's IP address (Cloudflare). "
+                       "Please use the ALOC source for ingestion.")
+    progress.update(phase='saving', fetched=len(questions))
+
+    added, duplicates = ingest.insert_questions(db, [dict(q, subject=subject) for q in questions])
+    db.commit()
+    return {'fetched': len(questions), 'added': added, 'duplicates': duplicates, 'requests': blocks['requests'],
+            'message': f"Scraped and added {added} questions for {subject} (Year {year or 2000}+)"}
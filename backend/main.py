@@ -1,13 +1,26 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from . import models, aloc_client
-from .models import SessionLocal, engine, Question, init_db
-from pydantic import BaseModel
+from . import models, facets, ingest, jobs, search
+from .cache import response_cache, STATIC
+from .hashing import url_hash, partition_digest, SHORT_HASH_LEN
+from .models import SessionLocal, engine, Question, QuestionFacet, Job, init_db, canonical
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional
+from collections import Counter, OrderedDict
 import sys
 import os
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add parent directory to path to import scrapers
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -23,8 +36,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "X-Next-Offset", "X-Cache", "ETag"],
 )
 
+# Upper bound for a single /questions page
+MAX_PAGE_SIZE = 500
+
 class QuestionSchema(BaseModel):
     id: Optional[int] = None
     body: str
@@ -42,6 +59,28 @@ class QuestionSchema(BaseModel):
         "from_attributes": True
     }
 
+# Opt-in (FAST_JSON=1): question rows are read as column tuples and encoded
+# directly, skipping per-row pydantic validation. The JSON is the same;
+# check that on a copy of real data before enabling it
+# (`python -m backend.benchmark --db copy.db --rows <row count>` prints "same body").
+FAST_JSON = os.getenv("FAST_JSON") == "1"
+QUESTION_FIELDS = list(QuestionSchema.model_fields)
+
+def question_rows(query, selected=None, fast=None):
+    """Rows of a Question query as dicts shaped like QuestionSchema (or `selected` fields)."""
+    if selected or (FAST_JSON if fast is None else fast):
+        names = selected or QUESTION_FIELDS
+        return [dict(zip(names, row)) for row in query.with_entities(*[getattr(Question, n) for n in names])]
+    return [QuestionSchema.model_validate(q).model_dump() for q in query.all()]
+
+def render_json(content, fast=None):
+    """JSON bytes as JSONResponse renders them, through orjson on the fast path if installed."""
+    if (FAST_JSON if fast is None else fast):
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return JSONResponse(content=content).body
+
 def get_db():
     db = SessionLocal()
     try:
@@ -49,6 +88,51 @@ def get_db():
     finally:
         db.close()
 
+# /myschool-subjects scrapes the site, and the subject list rarely changes
+SUBJECTS_CACHE_TTL = 24 * 3600
+
+# Browsers may keep read responses but must revalidate them: the ETag
+# changes with every write, and an unchanged one costs a bodiless 304
+REVALIDATE = "public, no-cache"
+
+def etag_matches(request: Request, etag):
+    """If-None-Match check; weak comparison, as RFC 9110 prescribes for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def cached_json(name, params, build, ttl=None, cacheable=None, request: Request = None, static=False):
+    """Serves a JSON response from response_cache, rendering it with build() on a miss.
+
+    build() returns (content, headers). The rendered bytes are cached, so a
+    hit skips the database and serialization alike, unless `cacheable`
+    rejects the content. With `request`, responses carry an ETag for the
+    data generation and a matching If-None-Match gets a 304 straight away.
+    `static` content doesn't come from the database: writes don't expire it.
+    """
+    key = response_cache.key(name, params)
+    generation = STATIC if static else response_cache.generation
+    validators = {}
+    if request is not None:
+        validators = {"ETag": response_cache.etag(key, generation), "Cache-Control": REVALIDATE}
+        if etag_matches(request, validators["ETag"]):
+            return Response(status_code=304, headers=validators)
+
+    entry = response_cache.get(key)
+    if entry is not None:
+        body, headers = entry
+        return Response(content=body, media_type="application/json",
+                        headers=dict(headers, **validators, **{"X-Cache": "HIT"}))
+
+    content, headers = build()
+    body = render_json(content)
+    if cacheable is None or cacheable(content):
+        response_cache.set(key, (body, headers), generation, ttl)
+    return Response(content=body, media_type="application/json",
+                    headers=dict(headers, **validators, **{"X-Cache": "MISS"}))
+
 @app.get("/seed-mock")
 def seed_mock(db: Session = Depends(get_db)):
     mock_questions = [
@@ -72,59 +156,192 @@ def seed_mock(db: Session = Depends(get_db)):
         }
     ]
     
-    for q_data in mock_questions:
-        exists = db.query(Question).filter(Question.body == q_data['body']).first()
-        if not exists:
-            new_q = Question(**q_data)
-            db.add(new_q)
-    
+    ingest.insert_questions(db, mock_questions)
     db.commit()
     return {"message": "Database seeded with mock questions"}
 
-@app.get("/questions", response_model=List[QuestionSchema])
-def read_questions(subject: Optional[str] = None, year: Optional[int] = None, exam_type: Optional[str] = None, question_type: Optional[str] = None, topic: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(Question)
+def filter_questions(query, subject=None, year=None, exam_type=None, question_type=None, topic=None):
+    """Applies the standard /questions filters to a Question query.
+
+    Filter columns are stored lowercase (see models.canonical), so plain
+    equality is used and the composite indexes can be hit.
+    """
     if subject:
-        query = query.filter(Question.subject.ilike(subject))
+        query = query.filter(Question.subject == canonical(subject))
     if year:
         query = query.filter(Question.year == year)
     if exam_type:
-        query = query.filter(Question.exam_type.ilike(exam_type))
+        query = query.filter(Question.exam_type == canonical(exam_type))
     if question_type:
-        query = query.filter(Question.question_type.ilike(question_type))
+        query = query.filter(Question.question_type == canonical(question_type))
     if topic:
-        query = query.filter(Question.topic.ilike(topic))
-    return query.all()
+        query = query.filter(Question.topic == topic.strip())
+    return query
+
+def parse_fields(fields: Optional[str]):
+    """Turns a comma separated `fields=` value into a list of Question columns.
+
+    `id` is always included because it doubles as the pagination cursor.
+    """
+    if not fields:
+        return None
+    selected = ["id"]
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in selected:
+            continue
+        if name not in QuestionSchema.model_fields:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{name}' in fields parameter.")
+        selected.append(name)
+    return selected
+
+@app.get("/questions", response_model=List[QuestionSchema])
+def read_questions(
+    request: Request,
+    subject: Optional[str] = None,
+    year: Optional[int] = None,
+    exam_type: Optional[str] = None,
+    question_type: Optional[str] = None,
+    topic: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Lists questions ordered by id.
+
+    Pass `limit` to page through results and `after=<X-Next-Cursor>` to fetch
+    the next page. The total is only counted on the first page (no `after`)
+    and returned in the X-Total-Count header. Responses are cached until the
+    next write (see backend/cache.py) and can be revalidated with If-None-Match.
+    """
+    selected = parse_fields(fields)
+    params = {"subject": subject, "year": year, "exam_type": exam_type, "question_type": question_type,
+              "topic": topic, "limit": limit, "after": after, "fields": ",".join(selected) if selected else None}
+
+    def build():
+        query = filter_questions(db.query(Question), subject, year, exam_type, question_type, topic)
+
+        headers = {}
+        if after is None:
+            total = query.with_entities(func.count(Question.id)).scalar()
+            headers["X-Total-Count"] = str(total)
+        else:
+            query = query.filter(Question.id > after)
+
+        query = query.order_by(Question.id)
+        if limit:
+            query = query.limit(limit)
+
+        rows = question_rows(query, selected)
+        if limit and len(rows) == limit:
+            headers["X-Next-Cursor"] = str(rows[-1]["id"])
+        return rows, headers
+
+    return cached_json("questions", params, build, request=request)
+
+@app.get("/questions/search", response_model=List[QuestionSchema])
+def search_questions(
+    request: Request,
+    q: str,
+    subject: Optional[str] = None,
+    year: Optional[int] = None,
+    exam_type: Optional[str] = None,
+    question_type: Optional[str] = None,
+    topic: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Full-text search over bodies, options and explanations, best matches first.
+
+    Takes the /questions filters. Pages by `offset`; X-Total-Count is sent on
+    the first page and X-Next-Offset while more matches remain. Cached and
+    revalidated like /questions.
+    """
+    selected = parse_fields(fields)
+    params = {"q": " ".join(search.terms(q)).lower(), "subject": subject, "year": year, "exam_type": exam_type,
+              "question_type": question_type, "topic": topic, "limit": limit, "offset": offset,
+              "fields": ",".join(selected) if selected else None}
+
+    def build():
+        query = search.search(db, filter_questions(db.query(Question), subject, year, exam_type, question_type, topic), q)
+
+        headers = {}
+        if offset == 0:
+            headers["X-Total-Count"] = str(query.with_entities(func.count(Question.id)).order_by(None).scalar())
+        query = query.offset(offset).limit(limit)
+
+        rows = question_rows(query, selected)
+        if len(rows) == limit:
+            headers["X-Next-Offset"] = str(offset + limit)
+        return rows, headers
+
+    return cached_json("search", params, build, request=request)
 
 @app.get("/filters")
-def get_filters(subject: Optional[str] = None, exam_type: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(Question)
+def get_filters(
+    request: Request,
+    subject: Optional[str] = None,
+    exam_type: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Dropdown values and per-value question counts, read from the facet table."""
+    return cached_json("filters", {"subject": subject, "exam_type": exam_type},
+                       lambda: (compute_filters(db, subject, exam_type), {}), request=request)
+
+def compute_filters(db: Session, subject: Optional[str], exam_type: Optional[str]):
+    # Keep all subjects available for selection
+    subject_counts = Counter()
+    for name, count in db.query(QuestionFacet.subject, func.sum(QuestionFacet.count)).group_by(QuestionFacet.subject):
+        if name:
+            subject_counts[name.capitalize()] += count
+
+    query = db.query(QuestionFacet.year, QuestionFacet.topic, QuestionFacet.question_type, QuestionFacet.count)
     if subject:
-        query = query.filter(Question.subject.ilike(subject))
+        query = query.filter(QuestionFacet.subject == canonical(subject))
     if exam_type:
-        query = query.filter(Question.exam_type.ilike(exam_type))
-    
-    # Use distinct values from the filtered query
-    subjects = db.query(Question.subject).distinct().all() # Keep all subjects available for selection
-    years = query.with_entities(Question.year).distinct().all()
-    topics = query.with_entities(Question.topic).distinct().all()
-    q_types = query.with_entities(Question.question_type).distinct().all()
-    
-    # Handle duplicates and case sensitivity in Python
-    unique_subjects = sorted(list(set(s[0].capitalize() for s in subjects if s[0])))
-    unique_years = sorted([y[0] for y in years if y[0]], reverse=True)
-    unique_topics = sorted(list(set(t[0] for t in topics if t[0])))
-    unique_types = sorted(list(set(qt[0].lower() for qt in q_types if qt[0])))
+        query = query.filter(QuestionFacet.exam_type == canonical(exam_type))
+
+    year_counts, topic_counts, type_counts = Counter(), Counter(), Counter()
+    for year, topic, q_type, count in query:
+        if year:
+            year_counts[year] += count
+        if topic:
+            topic_counts[topic] += count
+        if q_type:
+            type_counts[q_type] += count
     
     return {
-        "subjects": unique_subjects,
-        "years": unique_years,
-        "topics": unique_topics,
-        "question_types": unique_types
+        "subjects": sorted(subject_counts),
+        "years": sorted(year_counts, reverse=True),
+        "topics": sorted(topic_counts),
+        "question_types": sorted(type_counts),
+        "counts": {
+            "subjects": dict(subject_counts),
+            "years": dict(year_counts),
+            "topics": dict(topic_counts),
+            "question_types": dict(type_counts)
+        }
+    }
+
+def queued(db, job, what):
+    content = {
+        "message": f"Queued {what} as job {job.id}.",
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}",
+        "job": jobs.job_dict(job)
     }
+    warning = jobs.worker_warning(db)
+    if warning:
+        print(f"WARNING: job {job.id}: {warning}")
+        content["warning"] = warning
+    return JSONResponse(status_code=202, content=content)
 
 @app.get("/fetch-aloc")
 def fetch_aloc(subject: str, count: int = 50, db: Session = Depends(get_db)):
+    """Queues an ALOC fetch for the worker (backend/worker.py); poll the returned status_url."""
     print(f"DEBUG: ALOC fetch request for {subject}. Count: {count}")
     
     # Check for token first
@@ -134,92 +351,238 @@ def fetch_aloc(subject: str, count: int = 50, db: Session = Depends(get_db)):
             detail="ALOC Access Token is missing. Please set the ALOC_TOKEN in your environment variables."
         )
 
-    client = aloc_client.ALOCClient()
-    data = client.get_multiple_questions(subject, count=count)
-    if not data or 'data' not in data:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Failed to fetch data from ALOC. Error: {data.get('error') if data else 'Unknown'}"
-        )
-    
-    questions_added = 0
-    for q_data in data['data']:
-        # Double check for existing body to avoid duplicates
-        exists = db.query(Question).filter(Question.body == q_data['question']).first()
-        if not exists:
-            options = [q_data['option']['a'], q_data['option']['b'], q_data['option']['c'], q_data['option']['d']]
-            if 'e' in q_data['option'] and q_data['option']['e']:
-                options.append(q_data['option']['e'])
-            
-            new_q = Question(
-                body=q_data['question'],
-                options=options,
-                answer=q_data['answer'].upper() if q_data.get('answer') else 'A',
-                explanation=q_data.get('solution'),
-                subject=subject.lower(),
-                year=int(q_data['examyear']) if q_data.get('examyear') and str(q_data['examyear']).isdigit() else None,
-                exam_type=q_data.get('examtype', 'jamb').lower(),
-                question_type='objective', # ALOC is almost exclusively objective
-                topic="General"
-            )
-            db.add(new_q)
-            questions_added += 1
-    
-    db.commit()
-    return {"message": f"Added {questions_added} questions for {subject} using ALOC source."}
+    job = jobs.enqueue(db, "aloc", {"subject": subject, "count": count})
+    return queued(db, job, f"ALOC fetch of {count} {subject} questions")
+
+# Responses of recent uploads by Idempotency-Key, so a client retrying a batch
+# whose response it lost gets the original counts back. Per process; after a
+# restart a replay is simply reported as duplicates.
+MAX_IDEMPOTENCY_KEYS = 2000
+recent_uploads = OrderedDict()
+
+def replayed_upload(request: Request):
+    key = request.headers.get("idempotency-key")
+    if key and key in recent_uploads:
+        return JSONResponse(content=recent_uploads[key], headers={"Idempotent-Replay": "true"})
+    return None
+
+def remember_upload(request: Request, result):
+    key = request.headers.get("idempotency-key")
+    if key:
+        recent_uploads[key] = result
+        while len(recent_uploads) > MAX_IDEMPOTENCY_KEYS:
+            recent_uploads.popitem(last=False)
+    return result
 
 @app.post("/questions/bulk")
-def bulk_upload_questions(questions: List[QuestionSchema], db: Session = Depends(get_db)):
+def bulk_upload_questions(request: Request, questions: List[QuestionSchema], db: Session = Depends(get_db)):
     print(f"DEBUG: Bulk upload request for {len(questions)} questions.")
-    added_count = 0
-    seen_urls_in_batch = set()
+    replay = replayed_upload(request)
+    if replay:
+        return replay
     
     try:
-        for q_data in questions:
-            # Check for duplicates within the current batch first
-            if q_data.source_url and q_data.source_url in seen_urls_in_batch:
-                continue
-            
-            # Avoid duplicates by body and metadata OR source_url in DB
-            exists = db.query(Question).filter(
-                (Question.source_url == q_data.source_url if q_data.source_url else False) | 
-                (
-                    (Question.body == q_data.body) & 
-                    (Question.subject == q_data.subject.lower()) & 
-                    (Question.year == q_data.year) & 
-                    (Question.exam_type == q_data.exam_type.lower())
-                )
-            ).first()
-            
-            if not exists:
-                new_q = Question(
-                    body=q_data.body,
-                    options=q_data.options,
-                    answer=q_data.answer,
-                    explanation=q_data.explanation,
-                    subject=q_data.subject.lower(),
-                    year=q_data.year,
-                    exam_type=q_data.exam_type.lower(),
-                    question_type=q_data.question_type.lower() if q_data.question_type else 'objective',
-                    topic=q_data.topic or "General",
-                    source_url=q_data.source_url
-                )
-                db.add(new_q)
-                added_count += 1
-                if q_data.source_url:
-                    seen_urls_in_batch.add(q_data.source_url)
-        
+        # One pre-check query plus one INSERT ... ON CONFLICT DO NOTHING per batch
+        added, duplicates = ingest.insert_questions(db, [q.model_dump() for q in questions])
         db.commit()
-        return {"message": f"Bulk upload complete. Added {added_count} new questions."}
+        return remember_upload(request, {
+            "message": f"Bulk upload complete. Added {added} new questions.",
+            "added": added,
+            "duplicates": duplicates
+        })
     except Exception as e:
         db.rollback()
         print(f"CRITICAL ERROR IN BULK UPLOAD: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error during bulk upload: {str(e)}")
 
+# Limits on a /questions/bulk/ndjson body after decompression: one line and
+# the whole upload. Gzip can inflate a few KB into gigabytes, so the body is
+# inflated at most DECOMPRESS_CHUNK bytes at a time and checked as it goes.
+MAX_NDJSON_LINE = 1024 * 1024
+MAX_NDJSON_BYTES = int(os.getenv("MAX_NDJSON_BYTES", str(512 * 1024 * 1024)))
+DECOMPRESS_CHUNK = 64 * 1024
+
+def inflate(decoder, chunk):
+    """Yields the decompressed `chunk` in pieces of at most DECOMPRESS_CHUNK bytes."""
+    while chunk:
+        yield decoder.decompress(chunk, DECOMPRESS_CHUNK)
+        chunk = decoder.unconsumed_tail
+
+async def ndjson_lines(request: Request):
+    """Yields complete lines from a (optionally gzip-encoded) request body as it arrives.
+
+    Raises 413 once a line or the decompressed body exceeds its limit.
+    """
+    decoder = None
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    pending, total = b"", 0
+
+    def split(piece):
+        nonlocal pending, total
+        total += len(piece)
+        if total > MAX_NDJSON_BYTES:
+            raise HTTPException(status_code=413, detail="NDJSON body exceeds the maximum allowed size.")
+        *lines, pending = (pending + piece).split(b"\n")
+        if len(pending) > MAX_NDJSON_LINE or any(len(line) > MAX_NDJSON_LINE for line in lines):
+            raise HTTPException(status_code=413, detail="NDJSON line exceeds the maximum allowed size.")
+        return lines
+
+    async for chunk in request.stream():
+        for piece in (inflate(decoder, chunk) if decoder else [chunk]):
+            for line in split(piece):
+                yield line
+    if decoder:
+        for line in split(decoder.flush()):
+            yield line
+    yield pending
+
+def ingest_batch(db: Session, rows):
+    try:
+        added, duplicates = ingest.insert_questions(db, rows)
+        db.commit()
+        return added, duplicates
+    except Exception:
+        db.rollback()
+        raise
+
+@app.post("/questions/bulk/ndjson")
+async def stream_upload_questions(
+    request: Request,
+    batch_size: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Streams newline-delimited QuestionSchema objects into the database.
+
+    The body may be gzip compressed (Content-Encoding: gzip). Rows are
+    validated as they arrive and committed every `batch_size` valid rows, so
+    memory stays bounded no matter how large the upload is. A repeated
+    Idempotency-Key gets the first response back without re-ingesting.
+    """
+    replay = replayed_upload(request)
+    if replay:
+        return replay
+    batches = []
+    rows, rejected, line_no = [], 0, 0
+    errors = []
+
+    async def flush():
+        nonlocal rows, rejected
+        added, duplicates = await run_in_threadpool(ingest_batch, db, rows) if rows else (0, 0)
+        batches.append({"batch": len(batches) + 1, "accepted": added, "duplicates": duplicates, "rejected": rejected})
+        rows, rejected = [], 0
+
+    try:
+        async for line in ndjson_lines(request):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                rows.append(QuestionSchema.model_validate_json(line).model_dump())
+            except ValidationError as e:
+                rejected += 1
+                if len(errors) < 20:
+                    errors.append({"line": line_no, "error": e.errors(include_url=False)[0]["msg"]})
+                continue
+            if len(rows) >= batch_size:
+                await flush()
+        if rows or rejected:
+            await flush()
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"CRITICAL ERROR IN STREAMING UPLOAD: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"message": f"Database error during streaming upload: {str(e)}", "committed_batches": batches}
+        )
+
+    totals = {key: sum(b[key] for b in batches) for key in ("accepted", "duplicates", "rejected")}
+    return remember_upload(request, {
+        "message": f"Streaming upload complete. Added {totals['accepted']} new questions.",
+        "totals": totals,
+        "batches": batches,
+        "errors": errors
+    })
+
+@app.get("/sync/manifest")
+def sync_manifest(
+    request: Request,
+    subject: Optional[str] = None,
+    exam_type: Optional[str] = None,
+    year: Optional[int] = None,
+    question_type: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|compact)$"),
+    db: Session = Depends(get_db)
+):
+    """What the server already holds for a scope, for client-side dedup.
+
+    `json` lists full source URLs and content hashes; `compact` lists sorted
+    64-bit prefixes of both (see hashing.url_hash) and is a fraction of the
+    size. Served through cached_json: the ETag is known from the data
+    generation alone, so an unchanged client gets its 304 without a query.
+    """
+    def build():
+        query = filter_questions(db.query(Question.source_url, Question.content_hash), subject, year, exam_type, question_type)
+        urls, hashes = set(), set()
+        for source_url, c_hash in query:
+            if source_url:
+                urls.add(source_url)
+            if c_hash:
+                hashes.add(c_hash)
+
+        if format == "compact":
+            return {
+                "format": "compact",
+                "count": len(hashes),
+                "url_hashes": sorted(url_hash(u) for u in urls),
+                "content_hashes": sorted(h[:SHORT_HASH_LEN] for h in hashes)
+            }, {}
+        return {"format": "json", "count": len(hashes), "source_urls": sorted(urls), "content_hashes": sorted(hashes)}, {}
+
+    params = {"subject": subject, "exam_type": exam_type, "year": year, "question_type": question_type, "format": format}
+    return cached_json("sync-manifest", params, build, request=request)
+
+@app.get("/sync/partitions")
+def sync_partitions(
+    request: Request,
+    subject: Optional[str] = None,
+    exam_type: Optional[str] = None,
+    year: Optional[int] = None,
+    question_type: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Per-partition digests (see hashing.partition_digest) for delta sync.
+
+    One entry per subject/exam_type/year/question_type. A client whose local
+    partition has the same digest has nothing to send for it. Cached and
+    revalidated like /sync/manifest.
+    """
+    def build():
+        columns = (Question.subject, Question.exam_type, Question.year, Question.question_type)
+        query = filter_questions(db.query(*columns, Question.content_hash), subject, year, exam_type, question_type)
+        groups = {}
+        for *key, c_hash in query:
+            groups.setdefault(tuple(key), []).append(c_hash)
+
+        partitions = [
+            {"subject": s, "exam_type": e, "year": y, "question_type": t,
+             "count": sum(1 for h in hashes if h), "digest": partition_digest(hashes)}
+            for (s, e, y, t), hashes in sorted(groups.items(), key=lambda item: tuple(str(v) for v in item[0]))
+        ]
+        return {"count": len(partitions), "partitions": partitions}, {}
+
+    params = {"subject": subject, "exam_type": exam_type, "year": year, "question_type": question_type}
+    return cached_json("sync-partitions", params, build, request=request)
+
 @app.get("/myschool-subjects")
 def get_myschool_subjects():
-    scraper = MySchoolScraper()
-    return scraper.scrape_subjects()
+    # An empty list means the scrape failed; try again next time
+    return cached_json("myschool-subjects", {}, lambda: (MySchoolScraper().scrape_subjects(), {}),
+                       ttl=SUBJECTS_CACHE_TTL, cacheable=bool, static=True)
 
 @app.get("/clear-questions")
 def clear_questions(db: Session = Depends(get_db)):
@@ -236,67 +599,41 @@ def scrape_myschool(
     question_type: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    scraper = MySchoolScraper()
-    subject_url = f"{scraper.base_url}/classroom/{subject.lower().replace(' ', '-')}"
-    
-    # Get existing URLs to avoid duplicates
-    existing_urls = [q.source_url for q in db.query(Question).filter(Question.subject == subject.lower()).all() if q.source_url]
-    
-    questions = scraper.scrape_questions(
-        subject_url, 
-        limit=limit, 
-        min_year=year if year else 2000, 
-        max_year=year if year else None,
-        existing_urls=existing_urls,
-        exam_type=exam_type,
-        question_type=question_type
-    )
-    # Check if we were likely blocked
-    # We can check a flag or just assume based on 0 results if we saw 403 in inner logs
-    # To be precise, let's look at the result count and the fact that we confirmed blocking
-    if not questions:
-        # We need a way for the scraper to communicate the block back up.
-        # For now, if it's 0 and we are on Render, it's almost certainly a block.
-        # Let's check status_code from a dummy request
-        test_resp = scraper.session.get(subject_url, headers=scraper.headers, timeout=5)
-        if test_resp.status_code == 403:
-            raise HTTPException(
-                status_code=403, 
-                detail="MySchool is blocking this server's IP address (Cloudflare). Please use the ALOC source for ingestion."
-            )
-
-    print(f"DEBUG: Scraper returned {len(scraped_data)} results.")
-    
-    questions_added = 0
-    for q_data in scraped_data:
-        # Final safety check against duplicates
-        exists = db.query(Question).filter(
-            (Question.source_url == q_data['source_url']) |
-            (
-                (Question.body == q_data['body']) & 
-                (Question.subject == subject_name.lower()) & 
-                (Question.year == q_data['year']) & 
-                (Question.exam_type == q_data['exam_type'].lower())
-            )
-        ).first()
-        if not exists:
-            new_q = Question(
-                body=q_data['body'],
-                options=q_data['options'],
-                answer=q_data['answer'],
-                explanation=q_data['explanation'],
-                subject=subject_name,
-                year=q_data['year'],
-                exam_type=q_data['exam_type'],
-                question_type=q_data.get('question_type', 'objective'),
-                topic=q_data.get('topic', 'General'),
-                source_url=q_data['source_url']
-            )
-            db.add(new_q)
-            questions_added += 1
-    
-    db.commit()
-    return {"message": f"Scraped and added {questions_added} questions for {subject_name} (Year {min_year}+)"}
+    """Queues a MySchool scrape for the worker (backend/worker.py); poll the returned status_url."""
+    job = jobs.enqueue(db, "myschool", {
+        "subject": subject, "exam_type": exam_type, "year": year, "limit": limit, "question_type": question_type
+    })
+    return queued(db, job, f"MySchool scrape of {subject}")
+
+@app.get("/jobs")
+def list_jobs(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Most recent jobs first, plus per-kind status counts and throughput."""
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return {
+        "jobs": [jobs.job_dict(job) for job in query.order_by(Job.id.desc()).limit(limit)],
+        "stats": jobs.stats(db),
+        "worker_seen_at": jobs.worker_seen_at(db)
+    }
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return jobs.job_dict(job)
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
 
 @app.get("/api/health")
 def health_check():
@@ -1,27 +1,105 @@
-import sqlite3
 import os
+import sys
+from sqlalchemy import inspect, text
 
-db_path = 'past_questions.db'
-if os.path.exists(db_path):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+# Allow running as `python backend/migrate.py` as well as `python -m backend.migrate`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.models import engine, init_db, Question, QuestionFacet, SessionLocal
+from backend import facets, search
+from backend.hashing import content_hash
+
+def add_column(conn, columns, name, ddl):
+    if name in columns:
+        return False
+    conn.execute(text(f'ALTER TABLE questions ADD COLUMN {name} {ddl}'))
+    print(f'Migration: {name} added.')
+    return True
+
+def create_missing_indexes(inspector):
+    """Creates model indexes whose column list is not already indexed under any name."""
+    existing = {tuple(ix['column_names']) for ix in inspector.get_indexes('questions')}
+    for index in Question.__table__.indexes:
+        columns = tuple(c.name for c in index.columns)
+        if columns not in existing:
+            index.create(bind=engine)
+            print(f'Migration: index {index.name} created.')
+
+def backfill_content_hashes():
+    """Hashes rows that predate the content_hash column.
+
+    Rows whose hash is already taken are older duplicates; they keep a NULL
+    hash so the unique index can still be created.
+    """
+    with engine.begin() as conn:
+        taken = {row[0] for row in conn.execute(text('SELECT content_hash FROM questions WHERE content_hash IS NOT NULL'))}
+        pending = conn.execute(text(
+            'SELECT id, body, subject, year, exam_type FROM questions WHERE content_hash IS NULL ORDER BY id'
+        )).fetchall()
+        updates, duplicates = [], 0
+        for id_, body, subject, year, exam_type in pending:
+            h = content_hash(body, subject, year, exam_type)
+            if h in taken:
+                duplicates += 1
+                continue
+            taken.add(h)
+            updates.append({'id': id_, 'h': h})
+        if updates:
+            conn.execute(text('UPDATE questions SET content_hash = :h WHERE id = :id'), updates)
+            print(f'Migration: content_hash backfilled on {len(updates)} rows ({duplicates} duplicates left unhashed).')
+
+def backfill_facets():
+    db = SessionLocal()
     try:
-        # Check if column exists
-        cursor.execute("PRAGMA table_info(questions)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'source_url' not in columns:
-            cursor.execute('ALTER TABLE questions ADD COLUMN source_url VARCHAR(500)')
-            cursor.execute('CREATE UNIQUE INDEX idx_questions_source_url ON questions (source_url)')
-            print('Migration: source_url added.')
-        
-        if 'question_type' not in columns:
-            cursor.execute('ALTER TABLE questions ADD COLUMN question_type VARCHAR(50) DEFAULT "objective"')
-            print('Migration: question_type added.')
-        
-        conn.commit()
+        if db.query(QuestionFacet.id).first() is None and db.query(Question.id).first() is not None:
+            facets.rebuild(db)
+            db.commit()
+            print('Migration: question_facets rebuilt.')
+    finally:
+        db.close()
+
+def install_search():
+    if search.install(engine):
+        print('Migration: full-text search index ready.')
+
+def migrate():
+    inspector = inspect(engine)
+    if not inspector.has_table('questions'):
+        print('Database not found, init_db will handle it.')
+        init_db()
+        install_search()
+        return
+
+    columns = [column['name'] for column in inspector.get_columns('questions')]
+    try:
+        with engine.begin() as conn:
+            if add_column(conn, columns, 'source_url', 'VARCHAR(500)'):
+                conn.execute(text('CREATE UNIQUE INDEX idx_questions_source_url ON questions (source_url)'))
+
+            add_column(conn, columns, 'question_type', "VARCHAR(50) DEFAULT 'objective'")
+            add_column(conn, columns, 'content_hash', 'VARCHAR(64)')
+
+            # Backfill canonical lowercase filter values (see models.canonical)
+            result = conn.execute(text(
+                "UPDATE questions SET "
+                "subject = lower(trim(subject)), "
+                "exam_type = lower(trim(exam_type)), "
+                "question_type = lower(trim(coalesce(question_type, 'objective'))), "
+                "topic = trim(topic) "
+                "WHERE subject <> lower(trim(subject)) "
+                "OR exam_type <> lower(trim(exam_type)) "
+                "OR question_type IS NULL OR question_type <> lower(trim(question_type)) "
+                "OR topic <> trim(topic)"
+            ))
+            if result.rowcount:
+                print(f'Migration: normalized filter columns on {result.rowcount} rows.')
+
+        backfill_content_hashes()
+        create_missing_indexes(inspect(engine))
+        init_db()
+        install_search()
+        backfill_facets()
     except Exception as e:
         print(f'Migration error: {e}')
-    finally:
-        conn.close()
-else:
-    print('Database not found, init_db will handle it.')
+
+if __name__ == "__main__":
+    migrate()
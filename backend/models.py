@@ -1,10 +1,17 @@
 import os
-from sqlalchemy import Column, Integer, String, Text, JSON, create_engine
+from sqlalchemy import Column, Integer, String, Text, JSON, Float, Index, UniqueConstraint, create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, validates
 
 Base = declarative_base()
 
+def canonical(value):
+    """Normalizes a filter value (subject, exam_type, question_type) to trimmed lowercase."""
+    if value is None:
+        return None
+    value = str(value).strip().lower()
+    return value or None
+
 class Question(Base):
     __tablename__ = 'questions'
     id = Column(Integer, primary_key=True)
@@ -12,12 +19,89 @@ class Question(Base):
     options = Column(JSON)  # Store options as a JSON array or dict
     answer = Column(String(500))
     explanation = Column(Text)
-    subject = Column(String(100))
+    subject = Column(String(100))  # always lowercase, see canonical()
     year = Column(Integer)
     exam_type = Column(String(50)) # jamb, waec, neco, nabteb, igcse
     question_type = Column(String(50), default='objective') # objective, theory
     topic = Column(String(200))
     source_url = Column(String(500), unique=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True)  # see backend/hashing.py
+
+    # Filters in /questions and /filters always pin subject and exam_type first,
+    # so these composites turn the common combinations into index range scans.
+    __table_args__ = (
+        Index('ix_questions_filters', 'subject', 'exam_type', 'year', 'question_type'),
+        Index('ix_questions_topic', 'subject', 'exam_type', 'topic'),
+    )
+
+    @validates('subject', 'exam_type', 'question_type')
+    def validate_filter_column(self, key, value):
+        return canonical(value)
+
+    @validates('topic')
+    def validate_topic(self, key, value):
+        return value.strip() if value else value
+
+class QuestionFacet(Base):
+    """Question counts per filter combination, maintained by backend/facets.py.
+
+    NULL year/topic are stored as 0/'' so the unique key can be upserted.
+    """
+    __tablename__ = 'question_facets'
+    id = Column(Integer, primary_key=True)
+    subject = Column(String(100), nullable=False, default='')
+    exam_type = Column(String(50), nullable=False, default='')
+    year = Column(Integer, nullable=False, default=0)
+    topic = Column(String(200), nullable=False, default='')
+    question_type = Column(String(50), nullable=False, default='')
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('subject', 'exam_type', 'year', 'topic', 'question_type', name='uq_question_facets_key'),
+    )
+
+class DataVersion(Base):
+    """Change counter per dataset, bumped after every write (see backend/cache.py).
+
+    `token` is random per database, so a recreated database never reuses
+    the versions of the one it replaced.
+    """
+    __tablename__ = 'data_versions'
+    name = Column(String(50), primary_key=True)
+    token = Column(String(32), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(Float)
+
+class Job(Base):
+    """A queued ingestion job (MySchool scrape, ALOC fetch), run by backend/worker.py.
+
+    Times are epoch seconds. `progress` is updated while the job runs and
+    `result` holds its counts and throughput once it is done.
+    """
+    __tablename__ = 'jobs'
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON)
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    worker = Column(String(100))
+    progress = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(Float, nullable=False)
+    started_at = Column(Float)
+    heartbeat_at = Column(Float)
+    finished_at = Column(Float)
+
+    __table_args__ = (
+        Index('ix_jobs_status', 'status', 'id'),
+    )
+
+class WorkerHeartbeat(Base):
+    """When each job worker (backend/worker.py) last reported, idle or not."""
+    __tablename__ = 'worker_heartbeats'
+    worker = Column(String(100), primary_key=True)
+    seen_at = Column(Float, nullable=False)
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./past_questions.db")
@@ -26,8 +110,16 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./past_questions.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Full-text search backend for /questions/search (see backend/search.py):
+# FTS5 on SQLite, a tsvector column with a GIN index on PostgreSQL.
+# SEARCH_BACKEND=none disables it and search falls back to LIKE.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND") or (
+    "tsvector" if DATABASE_URL.startswith("postgresql") else "fts5" if DATABASE_URL.startswith("sqlite") else "none"
+)
+
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
+    # The full-text index is created by backend.migrate (search.install)
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,146 @@
+import re
+import json
+import time
+from sqlalchemy import String, cast, func, literal_column, or_, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import column, table
+
+from .models import Question, SEARCH_BACKEND
+
+# Indexed columns and their weight in the ranking: body, options, explanation
+FTS_WEIGHTS = (1.0, 0.5, 0.25)
+TSVECTOR_CONFIG = 'english'
+
+# Engines (by URL) -> (index present, monotonic time checked). A missing
+# index is looked for again after RECHECK_SECONDS, so processes started
+# before `migrate` installed it pick it up without a restart.
+_available = {}
+RECHECK_SECONDS = 30.0
+
+SQLITE_DDL = [
+    # External content: the index reads column values from questions itself
+    "CREATE VIRTUAL TABLE questions_fts USING fts5("
+    "body, options, explanation, content='questions', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN "
+    "INSERT INTO questions_fts(rowid, body, options, explanation) VALUES (new.id, new.body, new.options, new.explanation); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, body, options, explanation) "
+    "VALUES ('delete', old.id, old.body, old.options, old.explanation); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE OF body, options, explanation ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, body, options, explanation) "
+    "VALUES ('delete', old.id, old.body, old.options, old.explanation); "
+    "INSERT INTO questions_fts(rowid, body, options, explanation) VALUES (new.id, new.body, new.options, new.explanation); "
+    "END",
+]
+
+POSTGRES_DDL = [
+    # Generated column: PostgreSQL keeps it current on every INSERT/UPDATE
+    "ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{TSVECTOR_CONFIG}', coalesce(body, '')), 'A') || "
+    f"setweight(to_tsvector('{TSVECTOR_CONFIG}', coalesce(options::text, '')), 'B') || "
+    f"setweight(to_tsvector('{TSVECTOR_CONFIG}', coalesce(explanation, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_questions_search ON questions USING GIN (search_vector)",
+]
+
+def install(engine):
+    """Creates the full-text index for the configured backend (idempotent).
+
+    Run by backend.migrate only, never on app or worker startup, so
+    concurrent workers don't race on the DDL. SQLite gets an FTS5 table kept in sync by triggers, PostgreSQL a
+    generated tsvector column with a GIN index, so every write path (ORM,
+    bulk INSERT, DELETE) maintains the index without application code.
+    Returns False if the database cannot do full-text search; search()
+    then falls back to LIKE.
+    """
+    key = str(engine.url)
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if SEARCH_BACKEND == 'fts5' and dialect == 'sqlite':
+                objects = {row[0] for row in conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name IN ('questions_fts', 'questions_fts_ai')"
+                ))}
+                if 'questions_fts' not in objects:
+                    conn.execute(text(SQLITE_DDL[0]))
+                if 'questions_fts_ai' not in objects:
+                    # New index, or questions was recreated (dropping its triggers):
+                    # index the rows written while no trigger was watching
+                    conn.execute(text("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')"))
+                for ddl in SQLITE_DDL[1:]:
+                    conn.execute(text(ddl))
+            elif SEARCH_BACKEND == 'tsvector' and dialect == 'postgresql':
+                for ddl in POSTGRES_DDL:
+                    conn.execute(text(ddl))
+            else:
+                return False
+    except DBAPIError as e:
+        print(f"Full-text search unavailable, falling back to LIKE: {e}")
+        return False
+    _available[key] = (True, time.monotonic())
+    return True
+
+def available(bind):
+    """Whether the index install() creates exists on `bind`'s database."""
+    dialect = bind.dialect.name
+    if not ((SEARCH_BACKEND == 'fts5' and dialect == 'sqlite') or (SEARCH_BACKEND == 'tsvector' and dialect == 'postgresql')):
+        return False
+    key = str(bind.url)
+    known = _available.get(key)
+    if known and (known[0] or time.monotonic() - known[1] < RECHECK_SECONDS):
+        return known[0]
+    if dialect == 'sqlite':
+        # Without its triggers the index would miss new writes
+        sql = "SELECT COUNT(*) FROM sqlite_master WHERE name IN ('questions_fts', 'questions_fts_ai', 'questions_fts_ad', 'questions_fts_au')"
+        expected = 4
+    else:
+        sql = ("SELECT COUNT(*) FROM information_schema.columns "
+               "WHERE table_name = 'questions' AND column_name = 'search_vector' AND table_schema = current_schema()")
+        expected = 1
+    try:
+        with bind.connect() as conn:
+            present = conn.execute(text(sql)).scalar() == expected
+    except DBAPIError:
+        present = False
+    _available[key] = (present, time.monotonic())
+    return present
+
+def terms(q):
+    """Words of a user query; punctuation and operators are dropped so input can't break the syntax."""
+    return re.findall(r'\w+', q or '', flags=re.UNICODE)[:16]
+
+def search(db, query, q):
+    """Restricts a Question query to matches of `q`, best first."""
+    words = terms(q)
+    if not words:
+        return query.filter(False)
+
+    bind = db.get_bind()
+    if not available(bind):
+        # Same columns as the index. Options are stored as JSON text, where
+        # non-ASCII letters are \u escapes, so a word is matched in that form too.
+        options = cast(Question.options, String)
+        for word in words:
+            escaped = json.dumps(word)[1:-1]
+            matches = [Question.body.ilike(f"%{word}%"), options.ilike(f"%{word}%"),
+                       Question.explanation.ilike(f"%{word}%")]
+            if escaped != word:
+                matches.append(options.ilike(f"%{escaped}%"))
+            query = query.filter(or_(*matches))
+        return query.order_by(Question.id)
+
+    if bind.dialect.name == 'sqlite':
+        fts = table('questions_fts', column('rowid'))
+        # Every word must match; the last one as a prefix, for search-as-you-type
+        match = ' '.join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+        rank = func.bm25(literal_column('questions_fts'), *FTS_WEIGHTS)
+        query = (query.join(fts, fts.c.rowid == Question.id)
+                 .filter(literal_column('questions_fts').op('MATCH')(match.strip())))
+        return query.order_by(rank, Question.id)
+
+    tsquery = func.to_tsquery(TSVECTOR_CONFIG, ' & '.join(words[:-1] + [f'{words[-1]}:*']))
+    vector = literal_column('questions.search_vector')
+    rank = func.ts_rank_cd(vector, tsquery)
+    query = query.filter(vector.op('@@')(tsquery))
+    return query.order_by(rank.desc(), Question.id)
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import socket
+import argparse
+
+# Allow running as `python backend/worker.py` as well as `python -m backend.worker`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.models import SessionLocal, init_db
+from backend import jobs
+
+def work(worker=None, poll=2.0, once=False, stale_after=jobs.STALE_AFTER):
+    """Claims and runs queued jobs until stopped. With `once`, returns when the queue is empty."""
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    last_beat = None
+    while True:
+        db = SessionLocal()
+        try:
+            if last_beat is None or time.monotonic() - last_beat >= jobs.HEARTBEAT_EVERY:
+                jobs.beat(db, worker)
+                last_beat = time.monotonic()
+            requeued = jobs.requeue_stale(db, stale_after)
+            if requeued:
+                print(f"Requeued {requeued} jobs of stopped workers.")
+            job = jobs.claim(db, worker)
+            if job is not None:
+                print(f"Job {job.id} ({job.kind}) started: {job.params}")
+                jobs.run(db, job)
+                processed += 1
+                print(f"Job {job.id} {job.status}: {job.result or job.error}")
+        finally:
+            db.close()
+
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs queued ingestion jobs (see backend/jobs.py).")
+    parser.add_argument('--poll', type=float, default=2.0, help="Seconds between queue checks when idle")
+    parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+    args = parser.parse_args(argv)
+
+    init_db()
+    print(f"Worker started (handlers: {', '.join(sorted(jobs.HANDLERS))}).")
+    work(poll=args.poll, once=args.once)
+
+if __name__ == "__main__":
+    main()
@@ -17,21 +17,23 @@ document.addEventListener('DOMContentLoaded', () => {
         try {
             const response = await fetch(`/filters?subject=${encodeURIComponent(currentSubject)}&exam_type=${currentExamType}`);
             const data = await response.json();
+            const counts = data.counts || { years: {}, topics: {}, question_types: {} };
+            const withCount = (label, n) => n ? `${label} (${n})` : label;
 
             // Populate Year Select
             const currentYearValue = yearSelect.value;
             yearSelect.innerHTML = '<option value="">All Years</option>' +
-                data.years.map(y => `<option value="${y}" ${y == currentYearValue ? 'selected' : ''}>${y}</option>`).join('');
+                data.years.map(y => `<option value="${y}" ${y == currentYearValue ? 'selected' : ''}>${withCount(y, counts.years[y])}</option>`).join('');
 
             // Populate Topic Select
             const currentTopicValue = topicSelect.value;
             topicSelect.innerHTML = '<option value="">All Topics</option>' +
-                data.topics.map(t => `<option value="${t}" ${t == currentTopicValue ? 'selected' : ''}>${t}</option>`).join('');
+                data.topics.map(t => `<option value="${t}" ${t == currentTopicValue ? 'selected' : ''}>${withCount(t, counts.topics[t])}</option>`).join('');
 
             // Populate Type Select (in case it changes)
             const currentTypeValue = typeSelect.value;
             typeSelect.innerHTML = '<option value="">All Types</option>' +
-                data.question_types.map(t => `<option value="${t}" ${t == currentTypeValue ? 'selected' : ''}>${t.toUpperCase()}</option>`).join('');
+                data.question_types.map(t => `<option value="${t}" ${t == currentTypeValue ? 'selected' : ''}>${withCount(t.toUpperCase(), counts.question_types[t])}</option>`).join('');
         } catch (error) {
             console.error('Error fetching filters:', error);
         }
@@ -67,15 +69,17 @@ document.addEventListener('DOMContentLoaded', () => {
             const year = yearSelect.value;
             const topic = topicSelect.value;
             const type = typeSelect.value;
-            const url = `/questions?subject=${currentSubject}&exam_type=${currentExamType}${year ? `&year=${year}` : ''}${topic ? `&topic=${encodeURIComponent(topic)}` : ''}${type ? `&question_type=${type}` : ''}`;
+            const filters = `subject=${currentSubject}&exam_type=${currentExamType}${year ? `&year=${year}` : ''}${topic ? `&topic=${encodeURIComponent(topic)}` : ''}${type ? `&question_type=${type}` : ''}`;
 
-            const response = await fetch(url);
-            let questions = await response.json();
+            // Searches run on the server, which returns only the best matches
+            const searchTerm = searchInput.value.trim();
+            const url = searchTerm
+                ? `/questions/search?q=${encodeURIComponent(searchTerm)}&${filters}&limit=100`
+                : `/questions?${filters}`;
 
-            const searchTerm = searchInput.value.toLowerCase();
-            if (searchTerm) {
-                questions = questions.filter(q => q.body.toLowerCase().includes(searchTerm));
-            }
+            const response = await fetch(url);
+            const questions = await response.json();
+            if (searchTerm !== searchInput.value.trim()) return; // a newer keystroke owns the list
 
             if (questions.length === 0) {
                 questionList.innerHTML = '<div class="question-card"><p class="question-text">No questions found matching your filters. Try clicking "Ingest" for more data.</p></div>';
@@ -130,6 +134,20 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // Ingestion runs in the background worker; poll the job until it finishes
+    async function waitForJob(statusUrl) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 2000));
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            if (!response.ok) throw new Error(job.detail || 'Could not read job status');
+            if (job.status === 'done') return job;
+            if (job.status === 'failed') throw new Error(job.error || 'Ingestion failed');
+            const fetched = job.progress && job.progress.fetched;
+            ingestBtn.textContent = job.status === 'queued' ? 'Queued...' : (fetched ? `Saving ${fetched}...` : 'Ingesting...');
+        }
+    }
+
     async function ingestQuestions() {
         const source = document.getElementById('source-select').value;
         const selectedOption = subjectSelect.options[subjectSelect.selectedIndex];
@@ -170,7 +188,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error(result.detail || 'Ingestion failed');
             }
 
-            alert(result.message);
+            if (result.status_url) {
+                const job = await waitForJob(result.status_url);
+                alert(job.result.message);
+            } else {
+                alert(result.message);
+            }
             fetchFilters();
             fetchQuestions();
         } catch (error) {
@@ -210,7 +233,11 @@ document.addEventListener('DOMContentLoaded', () => {
 
     ingestBtn.addEventListener('click', ingestQuestions);
     clearDbBtn.addEventListener('click', clearDatabase);
-    searchInput.addEventListener('input', fetchQuestions);
+    let searchTimer;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(fetchQuestions, 250);
+    });
 
     // Initial load
     fetchSubjects();
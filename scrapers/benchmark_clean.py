@@ -0,0 +1,110 @@
+import os
+import re
+import sys
+import gzip
+import time
+import argparse
+
+# Allow running as `python scrapers/benchmark_clean.py` as well as `python -m scrapers.benchmark_clean`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bs4 import BeautifulSoup
+from scrapers.myschool_scraper import clean_text
+from scrapers.http_cache import HTTPCache
+
+def legacy_clean_text(text, subject=""):
+    """The original per-call implementation, kept as the reference output."""
+    subject_lower = subject.lower() if subject else ""
+    is_english = "english" in subject_lower
+    is_science = any(s in subject_lower for s in ["chem", "bio", "phys", "science"])
+    if not text:
+        return ""
+    text = text.replace('\xa0', ' ').replace('&nbsp;', ' ')
+    text = text.replace('\ufffd', "'")
+    text = text.replace(r'\(', '').replace(r'\)', '').replace(r'\[', '').replace(r'\]', '')
+    if is_science or not is_english:
+        text = re.sub(r'\\?_\{([^}]+)\}', r'<sub>\1</sub>', text)
+        text = re.sub(r'_\{([^}]+)\}', r'<sub>\1</sub>', text)
+        text = re.sub(r'_(\d)', r'<sub>\1</sub>', text)
+        text = re.sub(r'\\?\^\{([^}]+)\}', r'<sup>\1</sup>', text)
+        text = re.sub(r'\^\{([^}]+)\}', r'<sup>\1</sup>', text)
+        text = re.sub(r'\^(\d)', r'<sup>\1</sup>', text)
+        text = text.replace(r'\to', '→').replace(r'\uparrow', '↑').replace(r'\downarrow', '↓')
+        text = text.replace(r'\lambda', 'λ').replace(r'\theta', 'θ')
+        text = text.replace(r'\times', '×').replace(r'\div', '÷')
+
+        def chem_sub(match):
+            return f"{match.group(1)}<sub>{match.group(2)}</sub>"
+
+        text = re.sub(r'([A-Z][a-z]?)([2-9])(?![a-zA-Z])', chem_sub, text)
+        text = re.sub(r'\b([1-7][spdf])(\d{1,2})\b', r'\1<sup>\2</sup>', text)
+        text = re.sub(r'\\frac\{([^}]+)\}\{([^}]+)\}', r'<sup>\1</sup>&frasl;<sub>\2</sub>', text)
+    return text.strip()
+
+SAMPLES = [
+    ("Which of the following is an example of a compound? CO2, O2 and H2SO4", "chemistry"),
+    ("The electronic configuration 1s2 2s2 2p6 3s2 belongs to which element?", "chemistry"),
+    (r"Evaluate \(\frac{3}{4} \times \frac{8}{9}\) and express x^2 + y_{1}", "mathematics"),
+    (r"A wave of wavelength \lambda travels at angle \theta \to the normal", "physics"),
+    ("Choose the option nearest in meaning to the word in italics.&nbsp;He was\xa0adamant", "english"),
+    ("The gas evolved turns lime water milky: Ca(OH)_2 + CO_2 \u2192 CaCO_3 + H_2O", "chemistry"),
+    ("<p>In the figure below, <img src=\"/images/Q12.png\"/> find the value of x</p>", "mathematics"),
+    ("Mendel\ufffds law of segregation states that alleles separate during meiosis", "biology"),
+]
+
+def corpus_from_cache(root, limit):
+    """Question, option and explanation HTML from cached detail pages."""
+    cache = HTTPCache(root)
+    corpus = []
+    try:
+        for url, path in cache.iter_pages('detail'):
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    soup = BeautifulSoup(f.read(), 'html.parser')
+            except OSError:
+                continue
+            for node in soup.select('.question-desc, li, .explanation'):
+                corpus.append((node.decode_contents(), url))
+            if len(corpus) >= limit:
+                break
+    finally:
+        cache.close()
+    return corpus[:limit]
+
+def timed(fn, corpus, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text, subject in corpus:
+            fn(text, subject)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clean_text against the legacy implementation.")
+    parser.add_argument('--cache', default=os.path.join('data', '.http_cache'), help="HTTP cache to draw detail pages from")
+    parser.add_argument('--limit', type=int, default=20000, help="Max text fragments in the corpus")
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = []
+    if os.path.exists(os.path.join(args.cache, 'index.sqlite')):
+        corpus = corpus_from_cache(args.cache, args.limit)
+    source = f"{len(corpus)} fragments from {args.cache}"
+    if not corpus:
+        corpus = SAMPLES * 250
+        source = f"{len(corpus)} built-in samples"
+
+    mismatches = [(text, subject) for text, subject in corpus if clean_text(text, subject) != legacy_clean_text(text, subject)]
+    if mismatches:
+        text, subject = mismatches[0]
+        print(f"❌ {len(mismatches)} outputs differ, first: {text[:80]!r} ({subject})")
+        sys.exit(1)
+
+    legacy = timed(legacy_clean_text, corpus, args.rounds)
+    current = timed(clean_text, corpus, args.rounds)
+    total = len(corpus) * args.rounds
+    print(f"Corpus: {source}, {args.rounds} rounds, outputs identical.")
+    print(f"legacy:     {legacy:.3f}s ({total / legacy:,.0f} fragments/s)")
+    print(f"clean_text: {current:.3f}s ({total / current:,.0f} fragments/s)")
+    print(f"speedup:    {legacy / current:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import httpx
+
+# Defaults for a host nobody configured explicitly
+DEFAULT_RATE = 1.0          # requests per second
+DEFAULT_BURST = 2
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Bounds for the adaptive controller
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 4.0
+MAX_BACKOFF = 60.0
+
+class TokenBucket:
+    """Reservation-based token bucket shared by threads and coroutines.
+
+    `reserve()` takes a token immediately (the balance may go negative) and
+    returns how long the caller must wait before using it, so waiters are
+    spaced 1/rate apart without any busy polling.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def reserve(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease tuning of a bucket's rate.
+
+    Every `window` clean responses in a row raise the rate by `increase`;
+    a block (403, bot-detection page) or throttle (429/503) multiplies it by
+    `decrease`. Responses to requests that were already in flight when the
+    rate was cut tend to be blocked too, so at most one cut is made per
+    `cooldown` seconds.
+    """
+
+    def __init__(self, bucket, min_rate=DEFAULT_MIN_RATE, max_rate=None, increase=0.1, decrease=0.5, window=10, cooldown=5.0):
+        self.bucket = bucket
+        self.min_rate = min_rate
+        self.max_rate = max_rate or max(DEFAULT_MAX_RATE, bucket.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.cooldown = cooldown
+        self.streak = 0
+        self.consecutive_blocks = 0
+        self.last_decrease = 0.0
+        self.counts = {'ok': 0, 'blocked': 0, 'increases': 0, 'decreases': 0}
+        self.lowest_rate = self.highest_rate = bucket.rate
+        self._lock = threading.Lock()
+
+    def _set_rate(self, rate):
+        self.bucket.set_rate(rate)
+        self.lowest_rate = min(self.lowest_rate, rate)
+        self.highest_rate = max(self.highest_rate, rate)
+
+    def on_success(self):
+        with self._lock:
+            self.counts['ok'] += 1
+            self.consecutive_blocks = 0
+            self.streak += 1
+            if self.streak >= self.window:
+                self.streak = 0
+                rate = min(self.max_rate, self.bucket.rate + self.increase)
+                if rate > self.bucket.rate:
+                    self._set_rate(rate)
+                    self.counts['increases'] += 1
+
+    def on_block(self):
+        with self._lock:
+            self.counts['blocked'] += 1
+            self.consecutive_blocks += 1
+            self.streak = 0
+            now = time.monotonic()
+            if now - self.last_decrease >= self.cooldown:
+                self.last_decrease = now
+                self._set_rate(max(self.min_rate, self.bucket.rate * self.decrease))
+                self.counts['decreases'] += 1
+
+    def backoff_delay(self):
+        """Pause before retrying a blocked request; doubles with each block in a row."""
+        with self._lock:
+            return min(MAX_BACKOFF, 2.0 ** max(0, self.consecutive_blocks - 1))
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, rate=round(self.bucket.rate, 3),
+                        lowest_rate=round(self.lowest_rate, 3), highest_rate=round(self.highest_rate, 3))
+
+class HostLimiter:
+    """Rate and in-flight limits for a single host.
+
+    `max_in_flight` is one process-wide count shared by threads
+    (thread_slot) and coroutines on any event loop (`async with`), so
+    concurrent scrapes, each with its own asyncio.run, split the allowance
+    instead of getting one each. Waiters are served first come, first served.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max_in_flight
+        self.controller = None
+        self.in_flight = 0
+        # threading.Event of a blocked thread, or (loop, future) of a coroutine
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def _take(self, waiter):
+        """Takes a free slot (True) or queues `waiter` to be handed one later (False)."""
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def _hand_over(self):
+        """Gives free slots to queued waiters; called with the lock held."""
+        while self._waiters and self.in_flight < self.max_in_flight:
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                continue
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(self._deliver, future)
+            except RuntimeError:
+                # Its loop is closed: nobody is waiting any more
+                self.in_flight -= 1
+
+    def _deliver(self, future):
+        # Runs on the waiter's loop; a waiter cancelled meanwhile gives the slot back
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._hand_over()
+
+    def resize(self, max_in_flight):
+        """Changes the limit; requests already in flight keep their slots."""
+        with self._lock:
+            self.max_in_flight = max_in_flight
+            self._hand_over()
+
+    @contextmanager
+    def thread_slot(self):
+        """Blocking in-flight slot for synchronous callers."""
+        event = threading.Event()
+        if not self._take(event):
+            event.wait()
+        try:
+            self.bucket.wait()
+            yield
+        finally:
+            self.release()
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._take((loop, future)):
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+                # Handed a slot just before the cancellation arrived
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def configure_host(host, rate=None, burst=None, max_in_flight=None, adaptive=False):
+    """Creates or retunes the process-wide limiter for `host`.
+
+    `adaptive=True` attaches an AIMDController (once) that then moves the
+    rate between its bounds; an explicit `rate` becomes its new ceiling.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(
+                rate or DEFAULT_RATE, burst or DEFAULT_BURST, max_in_flight or DEFAULT_MAX_IN_FLIGHT
+            )
+            if adaptive:
+                limiter.controller = AIMDController(limiter.bucket)
+            return limiter
+        if adaptive and limiter.controller is None:
+            limiter.controller = AIMDController(limiter.bucket)
+        if rate:
+            limiter.bucket.set_rate(rate)
+            if limiter.controller:
+                limiter.controller.max_rate = max(DEFAULT_MAX_RATE, rate)
+        if burst:
+            limiter.bucket.burst = float(burst)
+        if max_in_flight and max_in_flight != limiter.max_in_flight:
+            limiter.resize(max_in_flight)
+        return limiter
+
+def limiter_for(url):
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+    return limiter or configure_host(host)
+
+class AsyncFetcher:
+    """Pooled async HTTP client whose requests all pass through the host limiters.
+
+    Use as `async with AsyncFetcher() as fetcher: await fetcher.get(url)`.
+    """
+
+    def __init__(self, timeout=15, max_connections=10, transport=None):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.transport = transport
+        self.client = None
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            transport=self.transport,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        self.client = None
+
+    async def get(self, url, headers=None):
+        async with limiter_for(url):
+            return await self.client.get(url, headers=headers)
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from .http_cache import DEFAULT_TTL
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+class FrontierEntry:
+    def __init__(self, url, kind, partition, state, attempts, last_status, discovered_at, next_attempt_at, updated_at, result):
+        self.url = url
+        self.kind = kind
+        self.partition = partition
+        self.state = state
+        self.attempts = attempts
+        self.last_status = last_status
+        self.discovered_at = discovered_at
+        self.next_attempt_at = next_attempt_at
+        self.updated_at = updated_at
+        self.result = json.loads(result) if result else None
+
+    @property
+    def done(self):
+        return self.state == DONE
+
+    @property
+    def due(self):
+        """True if the URL may be fetched now (not done, not given up, not backing off)."""
+        return self.state == PENDING and self.next_attempt_at <= time.time()
+
+    def fresh(self, ttl):
+        return self.done and time.time() - self.updated_at < ttl
+
+class Frontier:
+    """SQLite-backed crawl queue, shared by scrapes of every subject.
+
+    Each URL is one row with its state (pending/done/failed), attempt count,
+    last HTTP status and, once done, its parsed result as JSON: the detail
+    links of a listing page or the question of a detail page. Failed fetches
+    are retried after an exponential backoff; after `max_attempts` the URL is
+    marked failed and left alone. `partition` groups the URLs of one
+    subject/exam/year/type scope so several crawls can share the file.
+    """
+
+    def __init__(self, path=os.path.join('data', '.frontier.sqlite'), base_delay=30, max_delay=3600, max_attempts=5,
+                 listing_ttl=DEFAULT_TTL['listing']):
+        self.path = path
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.listing_ttl = listing_ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                partition TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_status INTEGER,
+                discovered_at REAL NOT NULL,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS ix_frontier_due ON frontier (state, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS ix_frontier_partition ON frontier (partition, state);
+        ''')
+
+    def get(self, url):
+        with self._lock:
+            row = self.db.execute(
+                'SELECT url, kind, partition, state, attempts, last_status, discovered_at, next_attempt_at, updated_at, result '
+                'FROM frontier WHERE url = ?', (url,)
+            ).fetchone()
+        return FrontierEntry(*row) if row else None
+
+    def discover(self, urls, kind, partition=None):
+        """Queues URLs not seen before. Returns how many were new."""
+        now = time.time()
+        with self._lock:
+            before = self.db.total_changes
+            self.db.executemany(
+                'INSERT OR IGNORE INTO frontier (url, kind, partition, discovered_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                [(url, kind, partition, now, now) for url in urls]
+            )
+            self.db.commit()
+            return self.db.total_changes - before
+
+    def complete(self, url, result=None, kind='detail', partition=None, status=200):
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                'INSERT INTO frontier (url, kind, partition, state, attempts, last_status, discovered_at, updated_at, result) '
+                'VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?) '
+                'ON CONFLICT(url) DO UPDATE SET state = excluded.state, attempts = attempts + 1, '
+                'last_status = excluded.last_status, updated_at = excluded.updated_at, result = excluded.result',
+                (url, kind, partition, DONE, status, now, now, json.dumps(result))
+            )
+            self.db.commit()
+
+    def retry_later(self, url, status=None, kind='detail', partition=None):
+        """Records a failed fetch and schedules the next attempt. Returns the entry."""
+        now = time.time()
+        with self._lock:
+            row = self.db.execute('SELECT attempts FROM frontier WHERE url = ?', (url,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            state = FAILED if attempts >= self.max_attempts else PENDING
+            next_attempt_at = now + min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            self.db.execute(
+                'INSERT INTO frontier (url, kind, partition, state, attempts, last_status, discovered_at, next_attempt_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(url) DO UPDATE SET state = excluded.state, attempts = excluded.attempts, '
+                'last_status = excluded.last_status, next_attempt_at = excluded.next_attempt_at, updated_at = excluded.updated_at',
+                (url, kind, partition, state, attempts, status, now, next_attempt_at, now)
+            )
+            self.db.commit()
+        return self.get(url)
+
+    def due(self, partition=None, kind=None, limit=None):
+        """Pending URLs whose next attempt time has come, oldest first."""
+        query = 'SELECT url FROM frontier WHERE state = ? AND next_attempt_at <= ?'
+        params = [PENDING, time.time()]
+        if partition:
+            query += ' AND partition = ?'
+            params.append(partition)
+        if kind:
+            query += ' AND kind = ?'
+            params.append(kind)
+        query += ' ORDER BY discovered_at'
+        if limit:
+            query += f' LIMIT {int(limit)}'
+        with self._lock:
+            return [row[0] for row in self.db.execute(query, params).fetchall()]
+
+    def stats(self, partition=None):
+        """Counts per state, e.g. {'pending': 3, 'done': 120}."""
+        with self._lock:
+            if partition:
+                rows = self.db.execute('SELECT state, COUNT(*) FROM frontier WHERE partition = ? GROUP BY state', (partition,))
+            else:
+                rows = self.db.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state')
+            return dict(rows.fetchall())
+
+    def reset(self, partition=None):
+        """Forgets a partition (or everything) so it is crawled from scratch."""
+        with self._lock:
+            if partition:
+                self.db.execute('DELETE FROM frontier WHERE partition = ?', (partition,))
+            else:
+                self.db.execute('DELETE FROM frontier')
+            self.db.commit()
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_frontier(path=os.path.join('data', '.frontier.sqlite')):
+    """One Frontier per file per process, so every scraper shares the queue."""
+    path = os.path.abspath(path)
+    with _shared_lock:
+        if path not in _shared:
+            _shared[path] = Frontier(path)
+        return _shared[path]
@@ -0,0 +1,205 @@
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Freshness per URL class, in seconds. Listing pages gain questions over time;
+# detail pages practically never change once published.
+DEFAULT_TTL = {
+    'listing': 24 * 3600,
+    'detail': 30 * 24 * 3600,
+}
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+def classify_url(url):
+    return 'detail' if '/classroom/questions/' in url else 'listing'
+
+class CacheEntry:
+    def __init__(self, url, kind, digest, etag, last_modified, fetched_at, ttl):
+        self.url = url
+        self.kind = kind
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class HTTPCache:
+    """Content-addressed, gzip-compressed store of raw HTML keyed by URL.
+
+    Bodies live in objects/<aa>/<sha256>.html.gz (identical pages are stored
+    once); index.sqlite maps URLs to digests, validators and timestamps.
+    The least recently used entries are evicted once the objects exceed
+    `max_bytes`. Recency is refreshed at most every `touch_interval` seconds
+    per entry, so a cached re-crawl reads without writing to the index.
+    """
+
+    def __init__(self, root=os.path.join('data', '.http_cache'), max_bytes=DEFAULT_MAX_BYTES, ttl=None,
+                 touch_interval=3600.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                digest TEXT NOT NULL REFERENCES objects(digest),
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed_at);
+            CREATE INDEX IF NOT EXISTS ix_entries_digest ON entries (digest);
+            CREATE INDEX IF NOT EXISTS ix_entries_kind ON entries (kind);
+        ''')
+        self._total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], f'{digest}.html.gz')
+
+    def lookup(self, url):
+        with self._lock:
+            row = self.db.execute(
+                'SELECT kind, digest, etag, last_modified, fetched_at, accessed_at FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+            if not row or not os.path.exists(self._object_path(row[1])):
+                return None
+            now = time.time()
+            if now - row[5] > self.touch_interval:
+                self.db.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (now, url))
+                self.db.commit()
+        kind, digest, etag, last_modified, fetched_at, _ = row
+        return CacheEntry(url, kind, digest, etag, last_modified, fetched_at, self.ttl.get(kind, DEFAULT_TTL['listing']))
+
+    def read(self, entry):
+        try:
+            with gzip.open(self._object_path(entry.digest), 'rt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url, text, headers=None):
+        headers = headers or {}
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        now = time.time()
+
+        with self._lock:
+            previous = self.db.execute('SELECT digest FROM entries WHERE url = ?', (url,)).fetchone()
+            known = self.db.execute('SELECT 1 FROM objects WHERE digest = ?', (digest,)).fetchone()
+            if not known:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f'{path}.{threading.get_ident()}.tmp'
+                with gzip.open(tmp, 'wb', compresslevel=6) as f:
+                    f.write(data)
+                os.replace(tmp, path)
+                size = os.path.getsize(path)
+                self.db.execute('INSERT INTO objects (digest, size) VALUES (?, ?)', (digest, size))
+                self._total += size
+            self.db.execute(
+                'INSERT OR REPLACE INTO entries (url, kind, digest, etag, last_modified, fetched_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, classify_url(url), digest, headers.get('ETag'), headers.get('Last-Modified'), now, now)
+            )
+            if previous and previous[0] != digest:
+                self._release([previous[0]])
+            self.db.commit()
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def mark_revalidated(self, url):
+        """Records a 304: the stored body is fresh again."""
+        with self._lock:
+            self.db.execute('UPDATE entries SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self.db.commit()
+
+    def iter_entries(self, kind=None):
+        """Yields (url, kind) for every cached page, optionally of one class."""
+        with self._lock:
+            if kind:
+                rows = self.db.execute('SELECT url, kind FROM entries WHERE kind = ? ORDER BY url', (kind,)).fetchall()
+            else:
+                rows = self.db.execute('SELECT url, kind FROM entries ORDER BY url').fetchall()
+        return iter(rows)
+
+    def iter_pages(self, kind='detail'):
+        """Yields (url, path to the gzip body) for cached pages of one class."""
+        with self._lock:
+            rows = self.db.execute('SELECT url, digest FROM entries WHERE kind = ? ORDER BY url', (kind,)).fetchall()
+        for url, digest in rows:
+            yield url, self._object_path(digest)
+
+    def _release(self, digests):
+        """Deletes objects that no entry references any more."""
+        for digest in set(digests):
+            if self.db.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+                continue
+            row = self.db.execute('SELECT size FROM objects WHERE digest = ?', (digest,)).fetchone()
+            if not row:
+                continue
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            self.db.execute('DELETE FROM objects WHERE digest = ?', (digest,))
+            self._total -= row[0]
+
+    def _evict(self):
+        # Trim to 90% so we do not evict again on the very next store
+        target = self.max_bytes * 0.9
+        while self._total > target:
+            rows = self.db.execute('SELECT url, digest FROM entries ORDER BY accessed_at LIMIT 200').fetchall()
+            if not rows:
+                break
+            for url, digest in rows:
+                if self._total <= target:
+                    break
+                self.db.execute('DELETE FROM entries WHERE url = ?', (url,))
+                self._release([digest])
+        self.db.commit()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.db.execute('SELECT kind, COUNT(*) FROM entries GROUP BY kind').fetchall())
+        return {'entries': counts, 'bytes': self._total, 'max_bytes': self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_cache(root=os.path.join('data', '.http_cache')):
+    """One HTTPCache per directory per process, so scrapers can be created freely."""
+    root = os.path.abspath(root)
+    with _shared_lock:
+        if root not in _shared:
+            _shared[root] = HTTPCache(root)
+        return _shared[root]
@@ -0,0 +1,322 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+from sqlalchemy import Column, Integer, String, Float, Text, create_engine, event, func, inspect, text
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+# Allow running as `python scrapers/local_store.py` as well as `python -m scrapers.local_store`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.models import Base, Question, canonical
+from backend.hashing import partition_digest
+from backend import ingest
+
+DEFAULT_PATH = os.path.join('data', 'questions.sqlite')
+
+# Partition states
+OK = 'ok'                  # scraped, has questions
+EMPTY = 'empty'            # scraped cleanly, nothing there
+BLOCKED = 'blocked'        # scrape was blocked, retry later
+INCOMPLETE = 'incomplete'  # some pages still waiting for a retry
+
+LocalBase = declarative_base()
+
+class LocalPartition(LocalBase):
+    """Scrape bookkeeping for one subject/exam/year/type scope. Local only."""
+    __tablename__ = 'partitions'
+    key = Column(String(300), primary_key=True)
+    subject = Column(String(100), nullable=False)
+    exam_type = Column(String(50), nullable=False)
+    year = Column(Integer, nullable=False)
+    question_type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, index=True)
+    question_count = Column(Integer, nullable=False, default=0)
+    scraped_at = Column(Float)
+    # Delta sync: digest of the local questions, and what it and the server's
+    # digest were when the partition was last pushed
+    digest = Column(String(80))
+    pushed_digest = Column(String(80))
+    pushed_server_digest = Column(String(80))
+    pushed_at = Column(Float)
+
+    @property
+    def scope(self):
+        return (self.subject, self.exam_type, self.year, self.question_type)
+
+    def needs_push(self, server_digest):
+        """True unless the server already has this partition or nothing changed
+        on either side since it was last pushed."""
+        if not self.question_count or self.digest == server_digest:
+            return False
+        return not (self.digest == self.pushed_digest and server_digest == self.pushed_server_digest)
+
+class StoreMeta(LocalBase):
+    __tablename__ = 'store_meta'
+    key = Column(String(100), primary_key=True)
+    value = Column(Text)
+
+def partition_key(subject, exam_type, year, question_type):
+    """Same layout as the legacy data/<subject>/<exam>/<year>/<type> tree."""
+    return f"{canonical(subject).replace(' ', '_')}/{canonical(exam_type)}/{year}/{canonical(question_type)}"
+
+def question_dict(q):
+    return {
+        'body': q.body, 'options': q.options, 'answer': q.answer, 'explanation': q.explanation,
+        'subject': q.subject, 'year': q.year, 'exam_type': q.exam_type, 'question_type': q.question_type,
+        'topic': q.topic, 'source_url': q.source_url,
+    }
+
+class LocalStore:
+    """Scraped questions in one SQLite (WAL) file instead of a JSON tree.
+
+    Questions use the server's schema (backend.models.Question) and are
+    added through backend.ingest, so duplicates are dropped exactly as the
+    server would. A partitions table records when each scope was scraped
+    and whether it came back empty, blocked or incomplete.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{path}")
+        event.listen(self.engine, 'connect', self._on_connect)
+        Base.metadata.create_all(bind=self.engine)
+        LocalBase.metadata.create_all(bind=self.engine)
+        self._add_missing_columns()
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def _add_missing_columns(self):
+        """Adds partition columns introduced after a store file was created."""
+        existing = {c['name'] for c in inspect(self.engine).get_columns(LocalPartition.__tablename__)}
+        with self.engine.begin() as conn:
+            for column in LocalPartition.__table__.columns:
+                if column.name not in existing:
+                    ddl = column.type.compile(dialect=self.engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {LocalPartition.__tablename__} ADD COLUMN {column.name} {ddl}'))
+
+    @staticmethod
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    def save_partition(self, subject, exam_type, year, question_type, questions, status=None, replace=False):
+        """Adds a partition's questions and records its status. Returns how many were new.
+
+        With `replace`, stored questions with the same source_url are dropped
+        first, so a re-parsed page replaces its old version (see reparse.py).
+        """
+        key = partition_key(subject, exam_type, year, question_type)
+        status = status or (OK if questions else EMPTY)
+        db = self.Session()
+        try:
+            touched = set()
+            if replace:
+                urls = [q['source_url'] for q in questions if q.get('source_url')]
+                for i in range(0, len(urls), ingest.IN_CHUNK):
+                    stale = db.query(Question).filter(Question.source_url.in_(urls[i:i + ingest.IN_CHUNK]))
+                    touched.update(tuple(scope) for scope in stale.with_entities(
+                        Question.subject, Question.exam_type, Question.year, Question.question_type).distinct())
+                    stale.delete(synchronize_session=False)
+            added, _ = ingest.insert_questions(db, [
+                dict(q, subject=subject, exam_type=exam_type, year=year, question_type=question_type)
+                for q in questions if q.get('body')
+            ])
+            row = db.get(LocalPartition, key) or LocalPartition(
+                key=key, subject=canonical(subject), exam_type=canonical(exam_type), year=year,
+                question_type=canonical(question_type)
+            )
+            row.status = status
+            row.scraped_at = time.time()
+            db.add(row)
+            db.flush()
+            self._refresh_digest(db, row)
+            # Replaced questions may have lived in another partition
+            for scope in touched - {row.scope}:
+                other = db.get(LocalPartition, partition_key(*scope))
+                if other is not None:
+                    self._refresh_digest(db, other)
+            db.commit()
+            return added
+        finally:
+            db.close()
+
+    def _refresh_digest(self, db, row):
+        hashes = [h for (h,) in self._scope(db, *row.scope).with_entities(Question.content_hash)]
+        row.question_count = len(hashes)
+        row.digest = partition_digest(hashes)
+
+    def _scope(self, db, subject=None, exam_type=None, year=None, question_type=None):
+        query = db.query(Question)
+        if subject:
+            query = query.filter(Question.subject == canonical(subject))
+        if exam_type:
+            query = query.filter(Question.exam_type == canonical(exam_type))
+        if year:
+            query = query.filter(Question.year == year)
+        if question_type:
+            query = query.filter(Question.question_type == canonical(question_type))
+        return query
+
+    def partition(self, subject, exam_type, year, question_type):
+        db = self.Session()
+        try:
+            return db.get(LocalPartition, partition_key(subject, exam_type, year, question_type))
+        finally:
+            db.close()
+
+    def load_partition(self, subject, exam_type, year, question_type):
+        """A finished partition's questions ([] if it was empty), or None if it
+        was never scraped or its last scrape was blocked or incomplete."""
+        row = self.partition(subject, exam_type, year, question_type)
+        if row is None or row.status not in (OK, EMPTY):
+            return None
+        return list(self.iter_questions(subject, exam_type, year, question_type))
+
+    def iter_questions(self, subject=None, exam_type=None, year=None, question_type=None, batch_size=1000):
+        """Stored questions as dicts, optionally limited to a scope."""
+        db = self.Session()
+        try:
+            query = self._scope(db, subject, exam_type, year, question_type).order_by(Question.id)
+            for q in query.yield_per(batch_size):
+                yield question_dict(q)
+        finally:
+            db.close()
+
+    def partitions(self, status=None):
+        db = self.Session()
+        try:
+            query = db.query(LocalPartition)
+            if status:
+                query = query.filter(LocalPartition.status == status)
+            return query.order_by(LocalPartition.key).all()
+        finally:
+            db.close()
+
+    def clear_partitions(self, status=EMPTY):
+        """Forgets partitions in `status` so the next sync scrapes them again."""
+        db = self.Session()
+        try:
+            count = db.query(LocalPartition).filter(LocalPartition.status == status).delete()
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def changed_partitions(self, server_digests):
+        """Partitions to push, given {(subject, exam_type, year, question_type): digest}
+        from the server. Only the partitions table is read unless older rows
+        still lack a digest."""
+        db = self.Session()
+        try:
+            for row in db.query(LocalPartition).filter(LocalPartition.digest.is_(None)):
+                self._refresh_digest(db, row)
+            db.commit()
+            rows = db.query(LocalPartition).order_by(LocalPartition.key).all()
+            return [row for row in rows if row.needs_push(server_digests.get(row.scope))]
+        finally:
+            db.close()
+
+    def mark_pushed(self, partitions, server_digests):
+        """Checkpoints pushed partitions against the server's digests after the push."""
+        db = self.Session()
+        try:
+            now = time.time()
+            for partition in partitions:
+                row = db.get(LocalPartition, partition.key)
+                row.pushed_digest = row.digest
+                row.pushed_server_digest = server_digests.get(row.scope)
+                row.pushed_at = now
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self):
+        db = self.Session()
+        try:
+            by_status = dict(db.query(LocalPartition.status, func.count()).group_by(LocalPartition.status).all())
+            return {'questions': db.query(func.count(Question.id)).scalar(), 'partitions': by_status}
+        finally:
+            db.close()
+
+    def get_meta(self, key):
+        db = self.Session()
+        try:
+            row = db.get(StoreMeta, key)
+            return row.value if row else None
+        finally:
+            db.close()
+
+    def set_meta(self, key, value):
+        db = self.Session()
+        try:
+            db.merge(StoreMeta(key=key, value=value))
+            db.commit()
+        finally:
+            db.close()
+
+    def import_json_tree(self, root='data'):
+        """Imports legacy data/<subject>/<exam>/<year>/<type>/questions.json files."""
+        report = {'files': 0, 'questions': 0, 'added': 0, 'errors': 0}
+        for dirpath, dirs, files in os.walk(root):
+            if 'questions.json' not in files:
+                continue
+            path = os.path.join(dirpath, 'questions.json')
+            parts = os.path.relpath(dirpath, root).replace('\\', '/').split('/')
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    questions = json.load(f)
+            except Exception as e:
+                print(f"Error reading {path}: {e}")
+                report['errors'] += 1
+                continue
+
+            # Infer the scope from the path, falling back to the questions themselves
+            first = questions[0] if questions else {}
+            subject = (parts[0].replace('_', ' ') if len(parts) > 0 and parts[0] != '.' else None) or first.get('subject') or 'unknown'
+            exam_type = (parts[1] if len(parts) > 1 else None) or first.get('exam_type') or 'waec'
+            year = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else first.get('year')
+            question_type = (parts[3] if len(parts) > 3 else None) or first.get('question_type') or 'objective'
+            if year is None:
+                report['errors'] += 1
+                continue
+
+            report['files'] += 1
+            report['questions'] += len(questions)
+            report['added'] += self.save_partition(subject, exam_type, year, question_type, questions)
+        self.set_meta('json_tree_imported_at', str(time.time()))
+        return report
+
+    def import_json_tree_once(self, root='data'):
+        """Imports the legacy tree the first time a store is used. Returns the report or None."""
+        if self.get_meta('json_tree_imported_at') or not os.path.isdir(root):
+            return None
+        report = self.import_json_tree(root)
+        if report['files']:
+            print(f"Imported {report['added']} questions from {report['files']} legacy JSON files into {self.path}.")
+        return report
+
+    def close(self):
+        self.engine.dispose()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local question store (data/questions.sqlite).")
+    parser.add_argument('command', choices=['import', 'stats', 'clear-empty'])
+    parser.add_argument('--store', default=DEFAULT_PATH)
+    parser.add_argument('--root', default='data', help="Legacy JSON tree to import")
+    args = parser.parse_args(argv)
+
+    store = LocalStore(args.store)
+    if args.command == 'import':
+        print(json.dumps(store.import_json_tree(args.root), indent=2))
+    elif args.command == 'clear-empty':
+        print(f"Cleared {store.clear_partitions(EMPTY)} empty partitions.")
+    print(json.dumps(store.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,213 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import time
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 import copy
+from urllib.parse import urlparse
+from .crawl_engine import AsyncFetcher, configure_host
+from .http_cache import shared_cache, classify_url
+from .frontier import shared_frontier
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+# Listing and subject pages are only ever searched for links
+LISTING_STRAINER = SoupStrainer('a')
+
+# Regions parse_detail_page reads, matched on class and href so the layout
+# wrappers around them (and <head>, scripts, navigation, sidebars) are
+# dropped: the body (question-desc, h3.page-title), the options
+# (ul.list-unstyled, or any li for the fallback after h3.page-title),
+# answer and explanation blocks (h5 headers, answer/explanation classes,
+# and unclassed div/p, which carry explanation text after its h5), the
+# topic and the exam link. Whole subtrees of a match are kept. Text in
+# regions it doesn't recognise (an answer in a generic <div class="mb-4">)
+# is lost silently, so straining is opt-in: check a cache with
+# `reparse --strain --check-strain` before enabling it for a crawl.
+DETAIL_CLASS_RE = re.compile(r'question-desc|list-unstyled|page-title|answer|explanation|solution')
+DETAIL_HREF_RE = re.compile(r'exam_type=|/classroom/topic/')
+
+def detail_region(name, attrs=None):
+    attrs = attrs or {}
+    classes = attrs.get('class') or ''
+    if isinstance(classes, (list, tuple)):
+        classes = ' '.join(classes)
+    if name in ('h3', 'h4', 'h5', 'li') or DETAIL_CLASS_RE.search(classes):
+        return True
+    if name == 'a':
+        return bool(DETAIL_HREF_RE.search(attrs.get('href') or ''))
+    return name in ('div', 'p', 'ul') and not classes
+
+class RegionStrainer(SoupStrainer):
+    """SoupStrainer deciding on a tag's name and attributes with `match(name, attrs)`.
+
+    bs4 4.13+ passes a callable name rule only the tag name, so the check
+    hooks in where the tree builder asks whether to create a tag: search_tag
+    before 4.13, allow_tag_creation since.
+    """
+
+    def __init__(self, match):
+        super().__init__()
+        self.match = match
+
+    def search_tag(self, markup_name=None, markup_attrs=None):
+        if not isinstance(markup_name, str):
+            return super().search_tag(markup_name, markup_attrs)
+        return self.match(markup_name, dict(markup_attrs or {}))
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.match(name, dict(attrs or {}))
+
+DETAIL_STRAINER = RegionStrainer(detail_region)
+
+def make_soup(html, kind='detail', parser=DEFAULT_PARSER, strain_details=False, listing_items=False):
+    """Parses a page, keeping only the regions the scraper reads for its kind.
+    `listing_items` keeps whole listing pages for the listing fast path, which
+    finds each question through its item's wrapper markup."""
+    if kind == 'listing':
+        strainer = None if listing_items else LISTING_STRAINER
+    else:
+        strainer = DETAIL_STRAINER if strain_details else None
+    return BeautifulSoup(html, parser, parse_only=strainer)
+
+# --- clean_text rule tables, compiled once at import ---
+
+# Single-character fixes for common mis-encodings (MySchool.ng)
+CHAR_FIXES = str.maketrans({'\xa0': ' ', '\ufffd': "'"})
+
+# LaTeX delimiters which often cause (CO2) instead of CO2
+LATEX_DELIMITERS = (r'\(', r'\)', r'\[', r'\]')
+
+# Chemical symbols and arrows. All keys start with a backslash and none
+# contains another, so one alternation pass equals chained str.replace().
+LATEX_SYMBOLS = {
+    r'\to': '→', r'\uparrow': '↑', r'\downarrow': '↓',
+    r'\lambda': 'λ', r'\theta': 'θ',
+    r'\times': '×', r'\div': '÷',
+}
+LATEX_SYMBOL_RE = re.compile('|'.join(re.escape(k) for k in LATEX_SYMBOLS))
+
+# Science/maths rewrites as (trigger, pattern, replacement). Order matters:
+# later rules see the output of earlier ones (e.g. _{H2} -> <sub>H2</sub>
+# -> <sub>H<sub>2</sub></sub>). A rule is skipped when its trigger
+# substring is absent, since it cannot match then.
+SCIENCE_RULES = (
+    # LaTeX style subscripts/superscripts
+    ('_{', re.compile(r'\\?_\{([^}]+)\}'), r'<sub>\1</sub>'),
+    ('_{', re.compile(r'_\{([^}]+)\}'), r'<sub>\1</sub>'),
+    ('_', re.compile(r'_(\d)'), r'<sub>\1</sub>'),
+    ('^{', re.compile(r'\\?\^\{([^}]+)\}'), r'<sup>\1</sup>'),
+    ('^{', re.compile(r'\^\{([^}]+)\}'), r'<sup>\1</sup>'),
+    ('^', re.compile(r'\^(\d)'), r'<sup>\1</sup>'),
+    ('\\', LATEX_SYMBOL_RE, lambda m: LATEX_SYMBOLS[m.group(0)]),
+    # Plain text chemical formulas like CO2: capital letter (+ lowercase) and a digit
+    # not followed by a letter, to avoid common English words/patterns
+    ('', re.compile(r'([A-Z][a-z]?)([2-9])(?![a-zA-Z])'), r'\1<sub>\2</sub>'),
+    # Electronic configuration (spdf notation)
+    ('', re.compile(r'\b([1-7][spdf])(\d{1,2})\b'), r'\1<sup>\2</sup>'),
+    # LaTeX fractions \frac{num}{den}
+    ('\\frac', re.compile(r'\\frac\{([^}]+)\}\{([^}]+)\}'), r'<sup>\1</sup>&frasl;<sub>\2</sub>'),
+)
+
+SCIENCE_SUBJECTS = ("chem", "bio", "phys", "science")
+
+def clean_text(text, subject=""):
+    """String half of MySchoolScraper.clean_scientific_text."""
+    if not text:
+        return ""
+
+    text = text.translate(CHAR_FIXES)
+    if '&nbsp;' in text:
+        text = text.replace('&nbsp;', ' ')
+
+    if '\\' in text:
+        for delimiter in LATEX_DELIMITERS:
+            text = text.replace(delimiter, '')
+
+    # Determine if we should be aggressive with chemistry formatting
+    subject_lower = subject.lower() if subject else ""
+    is_english = "english" in subject_lower
+    is_science = any(s in subject_lower for s in SCIENCE_SUBJECTS)
+    if is_science or not is_english:
+        for trigger, pattern, replacement in SCIENCE_RULES:
+            if trigger in text:
+                text = pattern.sub(replacement, text)
+
+    return text.strip()
+
+# Option lines: "A. text", "A) text", "A text" ...
+OPTION_PATTERNS = {
+    letter: (
+        re.compile(rf'^{letter}[.\s\)]?\s*.+', re.IGNORECASE),
+        re.compile(rf'^{letter}[.\s\)]?\s*$', re.IGNORECASE),
+        re.compile(rf'^{letter}([.\s\)])\s*', re.IGNORECASE),
+    )
+    for letter in 'ABCDE'
+}
+LEADING_PUNCTUATION_RE = re.compile(r'^[\s\.]+')
+TRAILING_ELLIPSIS_RE = re.compile(r'\.{3,}$')
+ANSWER_RE = re.compile(r'Correct Answer: Option')
+EXPLANATION_RE = re.compile(r'Explanation', re.I)
+EXAM_TYPE_RE = re.compile(r'exam_type=([^&]+)')
+EXAM_YEAR_RE = re.compile(r'exam_year=(\d+)')
+DETAIL_LINK_RE = re.compile(r'/classroom/questions/')
 
 class MySchoolScraper:
-    def __init__(self):
+    # Page text that means we were served a challenge instead of content
+    BOT_KEYWORDS = ["captcha", "bot detection", "challenge-platform", "one more step", "please verify you are a human"]
+
+    # Returned by handle_response when the caller should back off and retry
+    RETRY = object()
+
+    # Per-run outcome counters, see block_stats()
+    STAT_KEYS = ('requests', 'ok', 'not_modified', 'blocked_403', 'bot_pages', 'throttled', 'errors', 'retries',
+                 'listing_items', 'detail_saved')
+
+    # Fields a listing entry must carry before its detail page can be skipped
+    DETAIL_FIELDS = ('answer', 'explanation')
+
+    def __init__(self, rate=None, max_in_flight=None, cache=True, offline=False, parser=None, strain_details=False, frontier=False,
+                 adaptive=True, listing_fast_path=True, detail_fields=None):
+        """`rate` (requests/second) and `max_in_flight` tune the limiter shared by
+        every scraper instance in this process that talks to myschool.ng. With
+        `adaptive` the rate then self-tunes: it creeps up while responses are
+        clean and is halved on 403s or bot-detection pages (AIMDController).
+
+        `cache` is True for the shared on-disk cache under data/.http_cache, an
+        HTTPCache instance, or False. With `offline=True` pages are served
+        only from the cache, whatever their age, and nothing is fetched.
+
+        `parser` defaults to lxml when installed, else html.parser;
+        `strain_details` parses detail pages with DETAIL_STRAINER.
+
+        `frontier` is True for the shared crawl queue in data/.frontier.sqlite,
+        a Frontier instance, or False. With a frontier, finished pages are
+        never fetched twice and an interrupted scrape resumes where it stopped.
+
+        With `listing_fast_path`, questions are read straight off listing pages
+        and a detail page is only fetched when the listing entry lacks one of
+        `detail_fields` (default: answer and explanation).
+        """
         self.base_url = "https://myschool.ng"
+        self.limiter = configure_host(urlparse(self.base_url).netloc, rate=rate, max_in_flight=max_in_flight, adaptive=adaptive)
+        self.controller = self.limiter.controller if adaptive else None
+        self.cache = shared_cache() if cache is True else (cache or None)
+        self.offline = offline
+        self.parser = parser or DEFAULT_PARSER
+        self.strain_details = strain_details
+        self.frontier = shared_frontier() if frontier is True else (frontier or None)
+        self.listing_fast_path = listing_fast_path
+        self.detail_fields = tuple(detail_fields) if detail_fields is not None else self.DETAIL_FIELDS
+        # was_blocked/last_status describe the last response seen by the
+        # calling thread; coroutines read them right after fetch_soup returns
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
         self.session = requests.Session()
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
@@ -18,9 +218,59 @@ class MySchoolScraper:
         ]
         self.update_headers()
 
+    @property
+    def was_blocked(self):
+        return getattr(self._local, 'was_blocked', False)
+
+    @was_blocked.setter
+    def was_blocked(self, value):
+        self._local.was_blocked = value
+
+    @property
+    def last_status(self):
+        return getattr(self._local, 'last_status', None)
+
+    @last_status.setter
+    def last_status(self, value):
+        self._local.last_status = value
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = dict.fromkeys(self.STAT_KEYS, 0)
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def record_success(self, key='ok'):
+        self.count(key)
+        if self.controller:
+            self.controller.on_success()
+
+    def record_block(self, key):
+        self.count(key)
+        if self.controller:
+            self.controller.on_block()
+
+    def block_stats(self):
+        """Counters since the last reset_stats(), plus the controller's view of the rate."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['blocked'] = stats['blocked_403'] + stats['bot_pages']
+        stats['block_rate'] = round(stats['blocked'] / stats['requests'], 4) if stats['requests'] else 0.0
+        if self.controller:
+            stats['controller'] = self.controller.stats()
+        return stats
+
+    def retry_delay(self):
+        return self.controller.backoff_delay() if self.controller else 10
+
     def update_headers(self):
+        self.headers = self.build_headers()
+
+    def build_headers(self):
         import random
-        self.headers = {
+        return {
             'User-Agent': random.choice(self.user_agents),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -36,38 +286,126 @@ class MySchoolScraper:
             'Referer': 'https://myschool.ng/classroom'
         }
 
+    def check_blocked(self, url, text):
+        # Check for common bot detection patterns in HTML
+        text_lower = text.lower()
+        if any(k in text_lower for k in self.BOT_KEYWORDS):
+            print(f"WARNING: Bot detection keywords found at {url}")
+            self.was_blocked = True
+        else:
+            self.was_blocked = False
+
+    def fetch_failed(self, soup):
+        """True if the page just returned by fetch_soup is not real content
+        (network error, block page or error status) and should be retried."""
+        return soup is None or self.was_blocked or (self.last_status or 0) >= 400
+
+    def make_soup(self, url, html):
+        return make_soup(html, classify_url(url), self.parser, self.strain_details, self.listing_fast_path)
+
+    def cached_soup(self, url):
+        """Looks `url` up in the cache. Returns (entry, soup); soup is set only
+        when the entry can be used without asking the server."""
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and (self.offline or entry.fresh):
+            html = self.cache.read(entry)
+            if html is not None:
+                self.was_blocked = False
+                self.last_status = 200  # only 200 responses are stored
+                return entry, self.make_soup(url, html)
+        return entry, None
+
+    def request_headers(self, entry):
+        headers = self.build_headers()
+        if entry:
+            headers.update(entry.validators())
+        return headers
+
+    def handle_response(self, url, entry, response, attempt, max_retries):
+        """Shared by get_soup and fetch_soup: block detection, 304 handling and
+        cache writes. Returns a soup, or RETRY to back off and try again."""
+        status = response.status_code
+        self.last_status = status
+        self.count('requests')
+
+        if status == 304 and entry:
+            self.cache.mark_revalidated(url)
+            html = self.cache.read(entry)
+            if html is not None:
+                self.was_blocked = False
+                self.record_success('not_modified')
+                return self.make_soup(url, html)
+
+        if status == 403:
+            print(f"WARNING: 403 Forbidden at {url}. Attempt {attempt+1}/{max_retries}")
+            self.was_blocked = True
+            self.record_block('blocked_403')
+            if attempt < max_retries - 1:
+                self.count('retries')
+                return self.RETRY
+            return self.make_soup(url, response.text)
+
+        self.check_blocked(url, response.text)
+        if self.was_blocked:
+            self.record_block('bot_pages')
+        elif status in (429, 503):
+            self.record_block('throttled')
+        elif status < 400:
+            self.record_success()
+        else:
+            self.count('errors')
+
+        if self.cache and response.status_code == 200 and not self.was_blocked:
+            self.cache.store(url, response.text, response.headers)
+        return self.make_soup(url, response.text)
+
     def get_soup(self, url):
-        import random
+        """Synchronous fetch; served from the cache when fresh, otherwise paced
+        by the shared per-host limiter."""
+        entry, soup = self.cached_soup(url)
+        if soup is not None or self.offline:
+            return soup
+
         max_retries = 2
         for attempt in range(max_retries):
             try:
-                # Randomized delay
-                time.sleep(random.uniform(2.0, 5.0))
-                self.update_headers()
-                
-                response = self.session.get(url, headers=self.headers, timeout=15)
-                self.last_status = response.status_code
-                
-                if response.status_code == 403:
-                    print(f"WARNING: 403 Forbidden at {url}. Attempt {attempt+1}/{max_retries}")
-                    self.was_blocked = True
-                    if attempt < max_retries - 1:
-                        time.sleep(10) # Heavy delay on fail
-                        continue
-                
-                # Check for common bot detection patterns in HTML
-                bot_keywords = ["captcha", "bot detection", "challenge-platform", "one more step", "please verify you are a human"]
-                text_lower = response.text.lower()
-                if any(k in text_lower for k in bot_keywords):
-                    print(f"WARNING: Bot detection keywords found at {url}")
-                    self.was_blocked = True
-                else:
-                    self.was_blocked = False
-                    
-                return BeautifulSoup(response.text, 'html.parser')
+                self.headers = self.request_headers(entry)
+                with self.limiter.thread_slot():
+                    response = self.session.get(url, headers=self.headers, timeout=15)
+                soup = self.handle_response(url, entry, response, attempt, max_retries)
+                if soup is self.RETRY:
+                    time.sleep(self.retry_delay())
+                    continue
+                return soup
+            except Exception as e:
+                print(f"Error fetching {url}: {e}")
+                self.was_blocked = False
+                self.count('errors')
+                if attempt < max_retries - 1:
+                    continue
+                return None
+        return None
+
+    async def fetch_soup(self, url, fetcher):
+        """Async counterpart of get_soup used by the crawl engine."""
+        entry, soup = self.cached_soup(url)
+        if soup is not None or self.offline:
+            return soup
+
+        max_retries = 2
+        for attempt in range(max_retries):
+            try:
+                response = await fetcher.get(url, headers=self.request_headers(entry))
+                soup = self.handle_response(url, entry, response, attempt, max_retries)
+                if soup is self.RETRY:
+                    await asyncio.sleep(self.retry_delay())
+                    continue
+                return soup
             except Exception as e:
                 print(f"Error fetching {url}: {e}")
                 self.was_blocked = False
+                self.count('errors')
+                self.last_status = None
                 if attempt < max_retries - 1:
                     continue
                 return None
@@ -123,17 +461,21 @@ class MySchoolScraper:
             return None, None, None, None, None, None
 
         # Extract answer
-        answer_tag = soup.find(string=re.compile(r'Correct Answer: Option'))
+        answer_tag = soup.find(string=ANSWER_RE)
         answer = ""
         if answer_tag:
             answer = answer_tag.split('Option')[-1].strip()
 
         # Extract explanation
-        explanation_header = soup.find('h5', string=re.compile(r'Explanation', re.I))
+        explanation_header = soup.find('h5', string=EXPLANATION_RE)
         explanation = ""
         if explanation_header:
-            # The explanation is often in a div following the h5
+            # The explanation is often in a div following the h5. On a listing
+            # item (soup is its container) find_next can run into the next
+            # question; an empty explanation sends it to the detail page instead.
             explanation_container = explanation_header.find_next(['div', 'p'])
+            if explanation_container is not None and not any(p is soup for p in explanation_container.parents):
+                explanation_container = None
             if explanation_container:
                 explanation = self.clean_scientific_text(explanation_container, subject=detail_url)
             else:
@@ -153,8 +495,8 @@ class MySchoolScraper:
         year = None
         if exam_link:
             href = exam_link['href']
-            type_match = re.search(r'exam_type=([^&]+)', href)
-            year_match = re.search(r'exam_year=(\d+)', href)
+            type_match = EXAM_TYPE_RE.search(href)
+            year_match = EXAM_YEAR_RE.search(href)
             if type_match:
                 exam_type = type_match.group(1)
             if year_match:
@@ -167,10 +509,6 @@ class MySchoolScraper:
         if not node:
             return ""
         
-        # Determine if we should be aggressive with chemistry formatting
-        subject_lower = subject.lower() if subject else ""
-        is_english = "english" in subject_lower
-        is_science = any(s in subject_lower for s in ["chem", "bio", "phys", "science"])
         if isinstance(node, str):
             text = node
         else:
@@ -187,52 +525,132 @@ class MySchoolScraper:
             # We want to keep <br>, <u>, <b>, <i> etc.
             text = node.decode_contents()
 
-        if not text:
-            return ""
-            
-        # Fix encoding issues (common in MySchool.ng)
-        text = text.replace('\xa0', ' ').replace('&nbsp;', ' ')
-        
-        # Replace common mis-encoded characters like U+FFFD (replacement character)
-        text = text.replace('\ufffd', "'")
-
-        # Remove LaTeX delimiters which often cause (CO2) instead of CO2
-        text = text.replace(r'\(', '').replace(r'\)', '').replace(r'\[', '').replace(r'\]', '')
-
-        # Handle LaTeX style subscripts/superscripts (mostly for science)
-        if is_science or not is_english:
-            text = re.sub(r'\\?_\{([^}]+)\}', r'<sub>\1</sub>', text)
-            text = re.sub(r'_\{([^}]+)\}', r'<sub>\1</sub>', text)
-            text = re.sub(r'_(\d)', r'<sub>\1</sub>', text)
-            text = re.sub(r'\\?\^\{([^}]+)\}', r'<sup>\1</sup>', text)
-            text = re.sub(r'\^\{([^}]+)\}', r'<sup>\1</sup>', text)
-            text = re.sub(r'\^(\d)', r'<sup>\1</sup>', text)
-            
-            # Chemical symbols and arrows
-            text = text.replace(r'\to', '→').replace(r'\uparrow', '↑').replace(r'\downarrow', '↓')
-            text = text.replace(r'\lambda', 'λ').replace(r'\theta', 'θ')
-            text = text.replace(r'\times', '×').replace(r'\div', '÷')
-
-            # Handle plain text chemical formulas like CO2, H2O (capital letter + digit)
-            def chem_sub(match):
-                return f"{match.group(1)}<sub>{match.group(2)}</sub>"
-            
-            # Pattern to find chemical formulas: Capital letter (+ lowercase) followed by digits
-            # Refining to avoid common English words/patterns
-            # Only apply if it looks like a formula (e.g., ends in digit or followed by science context)
-            text = re.sub(r'([A-Z][a-z]?)([2-9])(?![a-zA-Z])', chem_sub, text)
-            
-            # Electronic configuration (spdf notation)
-            text = re.sub(r'\b([1-7][spdf])(\d{1,2})\b', r'\1<sup>\2</sup>', text)
+        return clean_text(text, subject)
+
+    def process_detail_page(self, detail_url, force_type=None):
+        """Fetches and parses a single question detail page."""
+        return self.parse_detail_page(self.get_soup(detail_url), detail_url, force_type=force_type)
+
+    async def process_detail_page_async(self, detail_url, fetcher, force_type=None, partition=None):
+        if self.frontier:
+            entry = self.frontier.get(detail_url)
+            if entry and entry.done:
+                return entry.result
+            if entry and not entry.due:
+                return None
 
-            # Handle LaTeX fractions \frac{num}{den}
-            text = re.sub(r'\\frac\{([^}]+)\}\{([^}]+)\}', r'<sup>\1</sup>&frasl;<sub>\2</sub>', text)
+        detail_soup = await self.fetch_soup(detail_url, fetcher)
+        # fetch_soup set the status without yielding since, so it describes this page
+        if self.fetch_failed(detail_soup):
+            if self.frontier and not self.offline:
+                self.frontier.retry_later(detail_url, self.last_status, partition=partition)
+            return None
 
-        return text.strip()
+        result = self.parse_detail_page(detail_soup, detail_url, force_type=force_type)
+        if self.frontier:
+            self.frontier.complete(detail_url, result, partition=partition, status=self.last_status or 200)
+        return result
+
+    def parse_listing_page(self, soup, page):
+        """Returns (absolute detail URLs, whether a next page is linked)."""
+        # Find all links that contain "View Answer" or "Discuss"
+        all_links = soup.find_all('a', href=DETAIL_LINK_RE)
+        detail_urls = []
+        for l in all_links:
+            link_text = l.get_text().strip()
+            if "View Answer" in link_text or "Discuss" in link_text or "Question Detail" in link_text:
+                detail_url = l.get('href')
+                if not detail_url:
+                    continue
+                if not detail_url.startswith('http'):
+                    detail_url = self.base_url + detail_url
+                detail_urls.append(detail_url)
+
+        if not detail_urls and len(all_links) > 10:
+            # If no detail links but many other links exist, maybe the text changed
+            print(f"DEBUG: Found {len(all_links)} links but none matched 'View Answer'. Trying fallback...")
+
+        has_next = soup.find('a', href=re.compile(rf'page={page + 1}')) is not None
+        return detail_urls, has_next
+
+    def listing_container(self, link):
+        """Nearest ancestor of a question link that holds the question itself
+        (a question-desc or option items) and no other question's link."""
+        for parent in link.parents:
+            if parent.name in ('body', 'html', '[document]'):
+                return None
+            if parent.find(class_='question-desc') or parent.find('li'):
+                hrefs = {a.get('href') for a in parent.find_all('a', href=DETAIL_LINK_RE)}
+                return parent if len(hrefs) == 1 else None
+        return None
 
-    def process_detail_page(self, detail_url, force_type=None):
-        """Worker function for multi-threaded scraping."""
-        detail_soup = self.get_soup(detail_url)
+    def parse_listing_items(self, soup, force_type=None, exam_type=None, year=None):
+        """Questions shown in full on a listing page, keyed by detail URL.
+        Call after parse_listing_page: option items are cleaned in place."""
+        items = {}
+        for link in soup.find_all('a', href=DETAIL_LINK_RE):
+            href = link.get('href')
+            if not href:
+                continue
+            url = href if href.startswith('http') else self.base_url + href
+            if url in items:
+                continue
+            container = self.listing_container(link)
+            if container is None:
+                continue
+            has_exam_link = container.select_one('a[href*="exam_type="]') is not None
+            question = self.parse_detail_page(container, url, force_type=force_type)
+            if not question or not question['body']:
+                continue
+            if not has_exam_link:
+                # The listing itself is filtered by exam and year
+                question['exam_type'] = exam_type or question['exam_type']
+                question['year'] = year
+            items[url] = question
+        return items
+
+    def listing_complete(self, question):
+        return bool(question) and all(question.get(field) for field in self.detail_fields)
+
+    async def fetch_listing_page(self, url, page, fetcher, partition=None, force_type=None, exam_type=None, year=None):
+        """(detail URLs, has next page, listed questions by URL) for a listing page,
+        or None if it could not be fetched. Served from the frontier while fresh."""
+        entry = self.frontier.get(url) if self.frontier else None
+        if entry and entry.fresh(self.frontier.listing_ttl):
+            return entry.result['links'], entry.result['next'], entry.result.get('items', {})
+        if entry and not entry.done and not entry.due:
+            print(f"Backing off {url} ({entry.attempts} failed attempts)")
+            return None
+
+        soup = await self.fetch_soup(url, fetcher)
+        if self.fetch_failed(soup):
+            if self.frontier and not self.offline:
+                self.frontier.retry_later(url, self.last_status, kind='listing', partition=partition)
+            return None
+
+        detail_urls, has_next = self.parse_listing_page(soup, page)
+        items = {}
+        if self.listing_fast_path:
+            items = self.parse_listing_items(soup, force_type=force_type, exam_type=exam_type, year=year)
+            for _ in items:
+                self.count('listing_items')
+        if self.frontier:
+            self.frontier.discover(detail_urls, 'detail', partition)
+            self.frontier.complete(url, {'links': detail_urls, 'next': has_next, 'items': items}, kind='listing',
+                                   partition=partition, status=self.last_status or 200)
+        return detail_urls, has_next, items
+
+    async def question_for(self, detail_url, listed, fetcher, force_type=None, partition=None):
+        """The listing's copy of a question when it is complete, else the detail page's."""
+        if self.listing_complete(listed):
+            self.count('detail_saved')
+            if self.frontier:
+                self.frontier.complete(detail_url, listed, partition=partition)
+            return listed
+        return await self.process_detail_page_async(detail_url, fetcher, force_type=force_type, partition=partition)
+
+    def parse_detail_page(self, detail_soup, detail_url, force_type=None):
+        """Builds a question dict from an already fetched detail page."""
         if not detail_soup:
             return None
         
@@ -263,7 +681,7 @@ class MySchoolScraper:
             if not body_tag:
                 return None
             body = self.clean_scientific_text(body_tag, subject=detail_url)
-            body = re.sub(r'\.{3,}$', '', body)
+            body = TRAILING_ELLIPSIS_RE.sub('', body)
 
         options = []
         valid_items = []
@@ -285,20 +703,24 @@ class MySchoolScraper:
                 if item.name == 'li':
                     valid_items.append(item)
 
+        # Texts are taken once, before any item is edited. An item only matches
+        # the letter it starts with, so it is used at most once and can be
+        # cleaned in place instead of copied.
+        item_texts = [(item, item.get_text(strip=True)) for item in valid_items]
+
         letters = ['A', 'B', 'C', 'D', 'E']
         for letter in letters:
+            option_re, label_re, prefix_re = OPTION_PATTERNS[letter]
             found = False
-            for item in valid_items:
-                text = item.get_text(strip=True)
-                if re.match(rf'^{letter}[.\s\)]?\s*.+', text, re.IGNORECASE):
-                    item_copy = copy.copy(item)
-                    strong = item_copy.find('strong')
-                    if strong and re.match(rf'^{letter}[.\s\)]?\s*$', strong.get_text(strip=True), re.IGNORECASE):
+            for item, text in item_texts:
+                if option_re.match(text):
+                    strong = item.find('strong')
+                    if strong and label_re.match(strong.get_text(strip=True)):
                         strong.decompose()
                     
-                    cleaned_html = self.clean_scientific_text(item_copy, subject=detail_url)
-                    cleaned_html = re.sub(rf'^{letter}([.\s\)])\s*', '', cleaned_html, flags=re.IGNORECASE)
-                    cleaned_html = re.sub(r'^[\s\.]+', '', cleaned_html).strip()
+                    cleaned_html = self.clean_scientific_text(item, subject=detail_url)
+                    cleaned_html = prefix_re.sub('', cleaned_html)
+                    cleaned_html = LEADING_PUNCTUATION_RE.sub('', cleaned_html).strip()
                     
                     options.append(cleaned_html)
                     found = True
@@ -327,10 +749,28 @@ class MySchoolScraper:
         }
 
     def scrape_questions(self, subject_url, limit=50, min_year=2000, max_year=None, existing_urls=None, exam_type=None, question_type=None):
+        """Blocking wrapper around scrape_questions_async for scripts and sync endpoints.
+        Resets the block statistics, so block_stats() afterwards describes this run."""
+        self.reset_stats()
+        return asyncio.run(self.scrape_questions_async(
+            subject_url, limit=limit, min_year=min_year, max_year=max_year,
+            existing_urls=existing_urls, exam_type=exam_type, question_type=question_type
+        ))
+
+    async def scrape_questions_async(self, subject_url, limit=50, min_year=2000, max_year=None, existing_urls=None, exam_type=None, question_type=None, fetcher=None):
+        if fetcher is None:
+            async with AsyncFetcher(max_connections=self.limiter.max_in_flight) as fetcher:
+                return await self.scrape_questions_async(
+                    subject_url, limit=limit, min_year=min_year, max_year=max_year,
+                    existing_urls=existing_urls, exam_type=exam_type, question_type=question_type, fetcher=fetcher
+                )
+
         questions = []
         import datetime
         current_year = max_year if max_year else datetime.datetime.now().year
         existing_urls = set(existing_urls or [])
+        # Frontier partitions follow the data/<subject>/<exam>/<year>/<type> layout
+        subject_slug = urlparse(subject_url).path.rstrip('/').rsplit('/', 1)[-1]
         
         # Determine exam types to scrape
         target_types = [exam_type] if exam_type else ['jamb', 'waec', 'neco']
@@ -351,53 +791,38 @@ class MySchoolScraper:
                     if len(questions) >= limit:
                         break
                         
+                    partition = f"{subject_slug}/{etype}/{year}/{qtype}"
                     page = 1
                     while len(questions) < limit:
                         # Construct URL with exam_type, exam_year, and type (objective/theory/practical)
                         url = f"{subject_url}?page={page}&exam_type={etype}&exam_year={year}&type={qtype}"
                         print(f"Scraping: {etype} {year} ({qtype}) Page {page}")
                         
-                        soup = self.get_soup(url)
-                        if not soup:
-                            break
+                        # Process in parallel, passing the current qtype as the forced type
+                        # because 'practical' should be saved as 'theory' but fetched via 'practical' param
+                        forced_type = 'theory' if qtype in ['theory', 'practical'] else 'objective'
 
-                        # Find all links that contain "View Answer" or "Discuss"
-                        all_links = soup.find_all('a', href=re.compile(r'/classroom/questions/'))
-                        detail_links = []
-                        for l in all_links:
-                            link_text = l.get_text().strip()
-                            if "View Answer" in link_text or "Discuss" in link_text or "Question Detail" in link_text:
-                                detail_links.append(l)
-
-                        if not detail_links:
-                            # If no detail links but many other links exist, maybe the text changed
-                            # Look specifically for links that look like question links
-                            if len(all_links) > 10:
-                                print(f"DEBUG: Found {len(all_links)} links but none matched 'View Answer'. Trying fallback...")
+                        listing = await self.fetch_listing_page(
+                            url, page, fetcher, partition=partition, force_type=forced_type, exam_type=etype, year=year
+                        )
+                        if not listing:
+                            break
+                        detail_urls, has_next, listed = listing
+                        if not detail_urls:
                             break
 
-                        urls_to_fetch = []
-                        for link in detail_links:
-                            detail_url = link.get('href')
-                            if not detail_url:
-                                continue
-                            if not detail_url.startswith('http'):
-                                detail_url = self.base_url + detail_url
-                                
-                            if detail_url not in existing_urls:
-                                urls_to_fetch.append(detail_url)
-
+                        urls_to_fetch = [u for u in detail_urls if u not in existing_urls]
                         if not urls_to_fetch:
                             if page > 5: break
                             page += 1
                             continue
 
-                        # Process in parallel, passing the current qtype as the forced type
-                        # because 'practical' should be saved as 'theory' but fetched via 'practical' param
-                        forced_type = 'theory' if qtype in ['theory', 'practical'] else 'objective'
-                        
-                        with ThreadPoolExecutor(max_workers=5) as executor:
-                            results = list(executor.map(lambda u: self.process_detail_page(u, force_type=forced_type), urls_to_fetch))
+                        # The host limiter decides how many of these are actually in flight;
+                        # complete listing entries need no request at all
+                        results = await asyncio.gather(*(
+                            self.question_for(u, listed.get(u), fetcher, force_type=forced_type, partition=partition)
+                            for u in urls_to_fetch
+                        ))
 
                         for res in results:
                             if res:
@@ -419,9 +844,23 @@ class MySchoolScraper:
                             print(f"No matching questions found for {etype} {year} {qtype} on Page {page}. Skipping year for this type.")
                             break
                         
-                        pagination = soup.find('a', href=re.compile(rf'page={page + 1}'))
-                        if not pagination:
+                        if not has_next:
                             break
                         page += 1
-                    
+
+                    # Detail pages that failed earlier (this run or a past one) and whose
+                    # backoff has passed, whether or not a listing showed them again
+                    if self.frontier and len(questions) < limit:
+                        seen = existing_urls | {q['source_url'] for q in questions}
+                        retries = [u for u in self.frontier.due(partition, kind='detail') if u not in seen]
+                        retry_type = 'theory' if qtype in ['theory', 'practical'] else 'objective'
+                        results = await asyncio.gather(*(
+                            self.process_detail_page_async(u, fetcher, force_type=retry_type, partition=partition)
+                            for u in retries
+                        ))
+                        for res in results:
+                            if res and res['year'] in (year, None) and (res['exam_type'] or etype).lower() == etype.lower():
+                                if len(questions) < limit:
+                                    questions.append(res)
+
         return questions
@@ -0,0 +1,204 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.myschool_scraper import MySchoolScraper, make_soup
+from scrapers.http_cache import HTTPCache
+from scrapers.frontier import Frontier
+from scrapers.local_store import LocalStore, OK, EMPTY, DEFAULT_PATH
+
+_scraper = None
+
+# /classroom/<subject>/<id>; detail pages under /classroom/questions/ carry no subject
+SUBJECT_URL_RE = re.compile(r'/classroom/([^/?#]+)/[^/?#]+')
+NOT_SUBJECTS = {'questions', 'topic'}
+
+_check_strain = False
+
+def _init_worker(parser=None, strain_details=False, check_strain=False):
+    global _scraper, _check_strain
+    _scraper = MySchoolScraper(cache=False, offline=True, parser=parser, strain_details=strain_details)
+    _check_strain = check_strain
+
+def subject_from_soup(soup):
+    """Subject slug from the exam link (/classroom/<subject>?exam_type=...)."""
+    link = soup.select_one('a[href*="exam_type="]')
+    if link:
+        match = re.search(r'/classroom/([^/?#]+)\?', link['href'])
+        if match:
+            return match.group(1).replace('-', ' ')
+    return None
+
+def subject_from_url(url):
+    match = SUBJECT_URL_RE.search(url or '')
+    if match and match.group(1) not in NOT_SUBJECTS:
+        return match.group(1).replace('-', ' ')
+    return None
+
+def scope_from_partition(partition):
+    """Frontier partition "<subject-slug>/<exam>/<year>/<type>" -> dict of the question fields it pins."""
+    parts = (partition or '').split('/')
+    if len(parts) != 4:
+        return {}
+    subject, exam_type, year, question_type = parts
+    return {'subject': subject.replace('-', ' '), 'exam_type': exam_type,
+            'year': int(year) if year.isdigit() else None, 'question_type': question_type}
+
+def parse_page(task):
+    """Worker: (url, path, hint) -> (url, question or None, seconds, error or None).
+
+    `hint` holds what the crawl knew about the page (scope_from_partition);
+    it fills in fields the page itself doesn't show.
+    """
+    url, path, hint = task
+    start = time.perf_counter()
+    try:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            html = f.read()
+        soup = make_soup(html, 'detail', _scraper.parser, _scraper.strain_details)
+        question = _scraper.parse_detail_page(soup, url)
+        if question is None:
+            return url, None, time.perf_counter() - start, 'no question body found'
+        question['subject'] = subject_from_soup(soup) or subject_from_url(url) or hint.get('subject')
+        if soup.select_one('a[href*="exam_type="]') is None:
+            # Without the exam link the parser's exam type is only its default
+            question['exam_type'] = hint.get('exam_type') or question.get('exam_type')
+        question['year'] = question.get('year') or hint.get('year')
+        missing = [field for field in ('subject', 'exam_type', 'year') if not question[field]]
+        if missing:
+            return url, None, time.perf_counter() - start, f"no {', '.join(missing)} found"
+        if _check_strain and _scraper.strain_details:
+            # Same page without DETAIL_STRAINER; any difference is markup the strainer dropped
+            full = _scraper.parse_detail_page(make_soup(html, 'detail', _scraper.parser, False), url)
+            differs = sorted(k for k in full if full[k] != question.get(k) and k not in ('subject', 'exam_type', 'year'))
+            if differs:
+                return url, None, time.perf_counter() - start, f"strained parse differs: {', '.join(differs)}"
+        return url, question, time.perf_counter() - start, None
+    except Exception as e:
+        return url, None, time.perf_counter() - start, f'{type(e).__name__}: {e}'
+
+def pages_from_dir(directory):
+    for root, dirs, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith('.html') or name.endswith('.html.gz'):
+                path = os.path.join(root, name)
+                yield path, path, {}
+
+def pages_from_cache(cache, frontier=None):
+    """(url, path, hint) for every cached detail page; hints come from the crawl frontier."""
+    for url, path in cache.iter_pages('detail'):
+        entry = frontier.get(url) if frontier else None
+        yield url, path, scope_from_partition(entry.partition if entry else None)
+
+def save(store, questions):
+    """Writes parsed questions to the store, one save_partition per scope. Returns how many were written."""
+    scopes = {}
+    for q in questions:
+        scopes.setdefault((q['subject'], q['exam_type'], q['year'], q['question_type']), []).append(q)
+    added = 0
+    for scope, items in scopes.items():
+        # A re-parse doesn't change whether the scrape of a scope was complete
+        existing = store.partition(*scope)
+        status = existing.status if existing and existing.status != EMPTY else OK
+        added += store.save_partition(*scope, items, status=status, replace=True)
+    return added
+
+def reparse(tasks, store, workers=None, chunksize=32, slowest=10, progress_every=1000, parser=None,
+            strain_details=False, batch_size=500, check_strain=False, timings_path=None):
+    """Parses `tasks` on all cores and writes the questions to `store` (a LocalStore) as they arrive.
+
+    Stored questions with the same source_url are replaced. `check_strain`
+    also parses each page unstrained and fails pages whose result differs.
+    `timings_path` gets one JSON line per page: {"url", "ms", "error"}.
+    Returns a report with counts, timings, failures and the slowest pages.
+    """
+    timings, failures, batch = [], [], []
+    parsed = added = 0
+    start = time.perf_counter()
+
+    with open(timings_path, 'w', encoding='utf-8') if timings_path else contextlib.nullcontext() as timings_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(parser, strain_details, check_strain)) as executor:
+        for i, (url, question, seconds, error) in enumerate(executor.map(parse_page, tasks, chunksize=chunksize), 1):
+            timings.append((seconds, url))
+            if timings_file:
+                timings_file.write(json.dumps({'url': url, 'ms': round(1000 * seconds, 3), 'error': error}) + '\n')
+            if error:
+                failures.append({'url': url, 'error': error})
+            else:
+                batch.append(question)
+                parsed += 1
+                if len(batch) >= batch_size:
+                    added += save(store, batch)
+                    batch = []
+            if progress_every and i % progress_every == 0:
+                print(f"  {i} pages parsed ({len(failures)} failures)", file=sys.stderr)
+    if batch:
+        added += save(store, batch)
+
+    elapsed = time.perf_counter() - start
+    ordered = sorted(t for t, _ in timings)
+    return {
+        'pages': len(timings),
+        'parsed': parsed,
+        'stored': added,
+        'failed': len(failures),
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(len(timings) / elapsed, 1) if elapsed else None,
+        'mean_parse_ms': round(1000 * sum(ordered) / len(ordered), 2) if ordered else None,
+        'p95_parse_ms': round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 2) if ordered else None,
+        'slowest': [{'url': url, 'ms': round(1000 * t, 2)} for t, url in sorted(timings, reverse=True)[:slowest]],
+        'failures': failures
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-parse stored MySchool detail pages offline into the local store, "
+                    "replacing the earlier parse of each page. Push the result with scripts/sync_job.py."
+    )
+    parser.add_argument('--cache', default=os.path.join('data', '.http_cache'), help="HTTP cache directory to read detail pages from")
+    parser.add_argument('--frontier', default=os.path.join('data', '.frontier.sqlite'),
+                        help="Crawl frontier whose partitions supply subject/exam/year a page doesn't show")
+    parser.add_argument('--dir', help="Directory of .html/.html.gz pages to parse instead of the cache")
+    parser.add_argument('--store', default=DEFAULT_PATH, help="Local store to write to")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--slowest', type=int, default=10, help="How many of the slowest pages to report")
+    parser.add_argument('--parser', choices=['lxml', 'html.parser'], default=None, help="BeautifulSoup parser (default: lxml if installed)")
+    parser.add_argument('--strain', action='store_true', help="Parse only the detail regions the scraper reads (DETAIL_STRAINER)")
+    parser.add_argument('--check-strain', action='store_true',
+                        help="With --strain, also parse each page unstrained and report pages where the results differ")
+    parser.add_argument('--timings', metavar='OUT.jsonl',
+                        help="Write every page's parse time as JSON lines (url, ms, error)")
+    args = parser.parse_args(argv)
+
+    if args.dir:
+        tasks = list(pages_from_dir(args.dir))
+    else:
+        cache = HTTPCache(args.cache)
+        frontier = Frontier(args.frontier) if os.path.exists(args.frontier) else None
+        tasks = list(pages_from_cache(cache, frontier))
+        cache.close()
+        if frontier:
+            frontier.close()
+
+    print(f"Re-parsing {len(tasks)} pages into {args.store}...", file=sys.stderr)
+    store = LocalStore(args.store)
+    try:
+        report = reparse(tasks, store, workers=args.workers, slowest=args.slowest, parser=args.parser,
+                         strain_details=args.strain, check_strain=args.check_strain, timings_path=args.timings)
+    finally:
+        store.close()
+
+    print(json.dumps(report, indent=2), file=sys.stderr)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import datetime
+
+# Allow running as `python scrapers/scheduler.py` as well as `python -m scrapers.scheduler`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.myschool_scraper import MySchoolScraper
+from scrapers.crawl_engine import AsyncFetcher
+from scrapers.local_store import LocalStore, OK, EMPTY, INCOMPLETE
+
+EXAM_TYPES = ['jamb', 'waec', 'neco']
+QUESTION_TYPES = ['objective', 'theory']
+
+class Partition:
+    """One subject/exam/year/type scope; the unit of scheduling and of storage."""
+
+    def __init__(self, subject, subject_url, exam_type, year, question_type):
+        self.subject = subject
+        self.subject_url = subject_url
+        self.exam_type = exam_type
+        self.year = year
+        self.question_type = question_type
+
+    @property
+    def key(self):
+        return f"{self.subject.lower().replace(' ', '_')}/{self.exam_type}/{self.year}/{self.question_type}"
+
+    def frontier_keys(self):
+        """Frontier partitions the scrape writes to ('theory' also crawls 'practical')."""
+        slug = self.subject_url.rstrip('/').rsplit('/', 1)[-1]
+        types = ['theory', 'practical'] if self.question_type == 'theory' else [self.question_type]
+        return [f"{slug}/{self.exam_type}/{self.year}/{t}" for t in types]
+
+    def __repr__(self):
+        return f"Partition({self.key})"
+
+def load_subjects(path='subjects.json', names=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        subjects = json.load(f)
+    if names:
+        wanted = {n.strip().lower() for n in names}
+        subjects = [s for s in subjects if s['name'].lower() in wanted or s['url'].rstrip('/').rsplit('/', 1)[-1] in wanted]
+    return subjects
+
+def build_matrix(subjects, exam_types=EXAM_TYPES, years=None, question_types=QUESTION_TYPES):
+    """subjects x exam types x years x question types, newest years first."""
+    if years is None:
+        years = range(datetime.datetime.now().year, 1999, -1)
+    return [
+        Partition(s['name'], s['url'], exam_type, year, question_type)
+        for year in sorted(years, reverse=True)
+        for s in subjects
+        for exam_type in exam_types
+        for question_type in question_types
+    ]
+
+def load_partition(partition, store):
+    """Stored questions of a finished partition, or None if it still needs scraping."""
+    return store.load_partition(partition.subject, partition.exam_type, partition.year, partition.question_type)
+
+def save_partition(partition, questions, store, status=None):
+    return store.save_partition(partition.subject, partition.exam_type, partition.year, partition.question_type,
+                                questions, status=status)
+
+def partition_questions(partition, scraped):
+    """Keeps questions of the partition's year and stamps its metadata."""
+    questions = []
+    for q in scraped:
+        if q['year'] == partition.year or q['year'] is None:
+            q['year'] = partition.year
+            q['question_type'] = partition.question_type
+            q['subject'] = partition.subject
+            questions.append(q)
+    return questions
+
+async def run_schedule_async(partitions, scraper=None, workers=8, limit=100, store=None,
+                             on_partition=None, deadline=None, fetcher=None, progress=print):
+    """Scrapes `partitions` with `workers` running at once.
+
+    All workers share one scraper, connection pool and host limiter, so the
+    global request rate stays what the limiter allows however many workers
+    there are. Each partition is saved to the local store (data/questions.sqlite
+    by default) as soon as it finishes. `on_partition(partition, questions)` is called
+    after that; returning False stops new partitions from starting, as does
+    passing `deadline` (seconds). Per-partition lines go to `progress`.
+    Returns a report dict.
+    """
+    scraper = scraper or MySchoolScraper(frontier=True)
+    store = store or LocalStore()
+    if fetcher is None:
+        async with AsyncFetcher(max_connections=scraper.limiter.max_in_flight) as fetcher:
+            return await run_schedule_async(partitions, scraper, workers, limit, store, on_partition, deadline,
+                                            fetcher, progress)
+
+    scraper.reset_stats()
+    queue = list(partitions)
+    report = {'partitions': len(queue), 'scraped': 0, 'questions': 0, 'empty': 0, 'incomplete': 0, 'errors': [], 'skipped': 0}
+    start = time.monotonic()
+    state = {'stop': False, 'next': 0}
+
+    def take():
+        if state['stop'] or state['next'] >= len(queue):
+            return None
+        if deadline and time.monotonic() - start > deadline:
+            state['stop'] = True
+            return None
+        partition = queue[state['next']]
+        state['next'] += 1
+        return partition
+
+    async def worker():
+        while True:
+            partition = take()
+            if partition is None:
+                return
+            try:
+                scraped = await scraper.scrape_questions_async(
+                    partition.subject_url, limit=limit, min_year=partition.year, max_year=partition.year,
+                    exam_type=partition.exam_type, question_type=partition.question_type, fetcher=fetcher
+                )
+            except Exception as e:
+                report['errors'].append({'partition': partition.key, 'error': f'{type(e).__name__}: {e}'})
+                continue
+
+            questions = partition_questions(partition, scraped)
+            # Pages still waiting for a retry mean an empty result is not final
+            unfinished = scraper.frontier and any(
+                scraper.frontier.stats(key).get('pending') for key in partition.frontier_keys()
+            )
+            status = OK if questions else (INCOMPLETE if unfinished else EMPTY)
+            save_partition(partition, questions, store, status)
+            if unfinished:
+                report['incomplete'] += 1
+            report['scraped'] += 1
+            report['questions'] += len(questions)
+            if not questions:
+                report['empty'] += 1
+
+            elapsed = time.monotonic() - start
+            done = report['scraped'] + len(report['errors'])
+            eta = elapsed / done * (len(queue) - done)
+            progress(f"[{done}/{len(queue)}] {partition.key}: {len(questions)} questions "
+                  f"({elapsed:.0f}s elapsed, ~{eta:.0f}s left)")
+
+            if on_partition and on_partition(partition, questions) is False:
+                state['stop'] = True
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+
+    report['skipped'] = len(queue) - state['next']
+    report['seconds'] = round(time.monotonic() - start, 1)
+    report['blocks'] = scraper.block_stats()
+    return report
+
+def run_schedule(partitions, scraper=None, workers=8, limit=100, store=None, on_partition=None, deadline=None,
+                 progress=print):
+    """Blocking wrapper around run_schedule_async for scripts."""
+    return asyncio.run(run_schedule_async(partitions, scraper, workers, limit, store, on_partition, deadline,
+                                          progress=progress))
+
+def parse_years(spec):
+    """'2010-2024' or '2019,2021' -> list of years."""
+    years = []
+    for part in spec.split(','):
+        if '-' in part:
+            lo, hi = sorted(int(y) for y in part.split('-'))
+            years.extend(range(lo, hi + 1))
+        elif part.strip():
+            years.append(int(part))
+    return years
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape many MySchool subject/exam/year/type partitions in parallel.")
+    parser.add_argument('--subjects', help="Comma separated subject names or slugs (default: all in subjects.json)")
+    parser.add_argument('--exam-types', default=','.join(EXAM_TYPES))
+    parser.add_argument('--years', default=f"2000-{datetime.datetime.now().year}", help="e.g. 2010-2024 or 2019,2021")
+    parser.add_argument('--types', default=','.join(QUESTION_TYPES), help="Question types")
+    parser.add_argument('--workers', type=int, default=8, help="Partitions scraped at once")
+    parser.add_argument('--rate', type=float, default=None, help="Requests per second to myschool.ng (shared by all workers)")
+    parser.add_argument('--max-in-flight', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=100, help="Max questions per partition")
+    parser.add_argument('--deadline', type=float, default=None, help="Stop starting new partitions after this many seconds")
+    parser.add_argument('--refresh', action='store_true', help="Re-scrape partitions that were already scraped")
+    parser.add_argument('--store', default=None, help="Local question store (default: data/questions.sqlite)")
+    args = parser.parse_args(argv)
+
+    subjects = load_subjects(names=args.subjects.split(',') if args.subjects else None)
+    partitions = build_matrix(subjects, args.exam_types.split(','), parse_years(args.years), args.types.split(','))
+    store = LocalStore(args.store) if args.store else LocalStore()
+    store.import_json_tree_once()
+    if not args.refresh:
+        partitions = [p for p in partitions if load_partition(p, store) is None]
+
+    scraper = MySchoolScraper(rate=args.rate, max_in_flight=args.max_in_flight, frontier=True)
+    print(f"Scheduling {len(partitions)} partitions over {args.workers} workers "
+          f"at {scraper.limiter.bucket.rate:g} req/s...")
+    report = run_schedule(partitions, scraper, workers=args.workers, limit=args.limit,
+                          store=store, deadline=args.deadline)
+    print(json.dumps(report, indent=2))
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,22 @@
 import os
-import json
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.local_store import LocalStore, EMPTY
 
 def clear_empty_caches():
     print("=== Clearing Empty Local Caches ===")
-    data_dir = "data"
-    if not os.path.exists(data_dir):
-        print("Data directory not found. Nothing to clear.")
-        return
+    store = LocalStore()
+    # Older runs cached partitions as data/<subject>/<exam>/<year>/<type>/questions.json
+    store.import_json_tree_once()
 
-    cleared_count = 0
-    for root, dirs, files in os.walk(data_dir):
-        for file in files:
-            if file == "questions.json":
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if isinstance(data, list) and len(data) == 0:
-                            os.remove(file_path)
-                            cleared_count += 1
-                            print(f"Removed empty cache: {file_path}")
-                except Exception as e:
-                    print(f"Error reading {file_path}: {e}")
+    empty = store.partitions(status=EMPTY)
+    for partition in empty:
+        print(f"Removed empty cache: {partition.key}")
+    cleared_count = store.clear_partitions(EMPTY)
 
     print("-" * 30)
-    print(f"Done! Cleared {cleared_count} empty cache files.")
+    print(f"Done! Cleared {cleared_count} empty partitions.")
     print("You can now run 'python scripts/sync_data.py' to retry scraping.")
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import hashlib
+import requests
+
+# Add parent directory to path to import backend.hashing
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.hashing import content_hash, url_hash, SHORT_HASH_LEN
+
+MANIFEST_CACHE_DIR = os.path.join("data", ".manifests")
+
+class RemoteManifest:
+    """Set-backed view of what the server already holds for a scope."""
+
+    def __init__(self, url_hashes=(), content_hashes=()):
+        self.url_hashes = set(url_hashes)
+        self.content_hashes = set(content_hashes)
+
+    def __len__(self):
+        return len(self.content_hashes)
+
+    def contains(self, question, subject=None):
+        """True if the question's source_url or content hash is already on the server."""
+        url = question.get('source_url')
+        if url and url_hash(url) in self.url_hashes:
+            return True
+        h = content_hash(question.get('body'), subject or question.get('subject'), question.get('year'), question.get('exam_type'))
+        return h[:SHORT_HASH_LEN] in self.content_hashes
+
+    def add(self, question, subject=None):
+        if question.get('source_url'):
+            self.url_hashes.add(url_hash(question['source_url']))
+        h = content_hash(question.get('body'), subject or question.get('subject'), question.get('year'), question.get('exam_type'))
+        self.content_hashes.add(h[:SHORT_HASH_LEN])
+
+def _cache_path(server_url, params):
+    key = hashlib.sha256(json.dumps([server_url, params], sort_keys=True).encode('utf-8')).hexdigest()[:24]
+    return os.path.join(MANIFEST_CACHE_DIR, f"{key}.json")
+
+def _get_cached(server_url, path, params, timeout=30, session=None):
+    """GETs a sync endpoint, revalidating the copy under data/.manifests by ETag.
+
+    Returns the JSON payload, or None if the server predates the endpoint.
+    """
+    cache_path = _cache_path(server_url + path, params)
+    cached = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except Exception:
+            cached = None
+
+    headers = {'If-None-Match': cached['etag']} if cached else {}
+    resp = (session or requests).get(f"{server_url}{path}", params=params, headers=headers, timeout=timeout)
+
+    if resp.status_code == 304 and cached:
+        return cached['manifest']
+    if resp.status_code == 200:
+        data = resp.json()
+        if resp.headers.get('ETag'):
+            os.makedirs(MANIFEST_CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'etag': resp.headers['ETag'], 'manifest': data}, f)
+        return data
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return None
+
+def _scope_params(subject=None, exam_type=None, year=None, question_type=None):
+    return {k: v for k, v in {
+        'subject': subject, 'exam_type': exam_type, 'year': year, 'question_type': question_type
+    }.items() if v}
+
+def fetch_manifest(server_url, subject=None, exam_type=None, year=None, question_type=None, timeout=30):
+    """Downloads the compact /sync/manifest for a scope.
+
+    The last response is kept under data/.manifests with its ETag, so an
+    unchanged scope costs a 304. Returns None if the server predates the
+    endpoint, letting callers fall back to the old /questions download.
+    """
+    params = _scope_params(subject, exam_type, year, question_type)
+    params['format'] = 'compact'
+    data = _get_cached(server_url, '/sync/manifest', params, timeout)
+    if data is None:
+        return None
+    return RemoteManifest(data.get('url_hashes', []), data.get('content_hashes', []))
+
+def fetch_partition_digests(server_url, subject=None, exam_type=None, year=None, question_type=None, timeout=30,
+                            session=None):
+    """Downloads /sync/partitions as {(subject, exam_type, year, question_type): digest}.
+
+    Cached by ETag like fetch_manifest. Returns None if the server predates
+    the endpoint.
+    """
+    params = _scope_params(subject, exam_type, year, question_type)
+    data = _get_cached(server_url, '/sync/partitions', params, timeout, session)
+    if data is None:
+        return None
+    return {
+        (p['subject'], p['exam_type'], p['year'], p['question_type']): p['digest']
+        for p in data.get('partitions', [])
+    }
@@ -2,10 +2,19 @@ import requests
 import sys
 import os
 import json
+import time
 
 # Add parent directory to path to import scrapers
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from scrapers.myschool_scraper import MySchoolScraper
+from scrapers.scheduler import Partition, load_partition, run_schedule
+from scrapers.local_store import LocalStore
+from scripts.remote_manifest import RemoteManifest, fetch_manifest
+from scripts.uploader import Uploader
+from backend.hashing import url_hash
+
+# Years scraped at once; the request rate is still set by the host limiter
+SCRAPE_WORKERS = 4
 
 def sync():
     # Configuration
@@ -48,7 +57,19 @@ def sync():
         print(f"\nRequesting Remote Server to fetch {count} questions for {subject_query} via ALOC...")
         try:
             resp = requests.get(f"{REMOTE_URL}/fetch-aloc?subject={subject_query.lower()}&count={count}", timeout=30)
-            if resp.status_code == 200:
+            if resp.status_code == 202:
+                # The server's worker runs the fetch; wait for it to finish
+                print(resp.json().get('message'))
+                status_url = f"{REMOTE_URL}{resp.json()['status_url']}"
+                job = resp.json()['job']
+                while job['status'] in ('queued', 'running'):
+                    time.sleep(3)
+                    job = requests.get(status_url, timeout=30).json()
+                if job['status'] == 'done':
+                    print(f"Success! {job['result']['message']}")
+                else:
+                    print(f"Job failed: {job['error']}")
+            elif resp.status_code == 200:
                 print(f"Success! {resp.json().get('message')}")
             else:
                 print(f"Error {resp.status_code}: {resp.json().get('detail')}")
@@ -61,7 +82,8 @@ def sync():
     question_type = input("Enter Question Type (objective/theory, default objective): ").strip().lower() or "objective"
     limit = int(input("Enter max questions to scrape (default 50): ") or 50)
     
-    scraper = MySchoolScraper()
+    # Resumable: pages finished in an interrupted run are not fetched again
+    scraper = MySchoolScraper(frontier=True)
     
     # 2. Get Subject URL
     print("\nFetching subject list from scraper...")
@@ -78,22 +100,23 @@ def sync():
         print(f"Error: Subject '{subject_query}' not found. Check subjects.json for valid names.")
         return
 
-    # 3. Get Existing URLs from Remote to avoid duplicates
-    # 3. Get Existing URLs from Remote to avoid duplicates
+    # 3. Get what the remote already has to avoid duplicates
     print(f"Checking existing questions on remote server for {subject_name} ({question_type})...")
     try:
-        remote_filter_url = f"{REMOTE_URL}/questions?subject={subject_name.lower()}&question_type={question_type}"
-        resp = requests.get(remote_filter_url, timeout=15)
-        if resp.status_code == 200:
-            existing_questions = resp.json()
-            existing_urls = [q['source_url'] for q in existing_questions if q.get('source_url')]
-            print(f"Found {len(existing_urls)} existing {question_type} questions on remote.")
-        else:
-            print(f"Warning: Remote server returned {resp.status_code} for filter check. Assuming 0 existing.")
-            existing_urls = []
+        remote = fetch_manifest(REMOTE_URL, subject=subject_name.lower(), question_type=question_type)
+        if remote is None:
+            # Older server without /sync/manifest: download the questions themselves
+            remote_filter_url = f"{REMOTE_URL}/questions?subject={subject_name.lower()}&question_type={question_type}"
+            resp = requests.get(remote_filter_url, timeout=15)
+            if resp.status_code == 200:
+                remote = RemoteManifest(url_hashes=[url_hash(q['source_url']) for q in resp.json() if q.get('source_url')])
+            else:
+                print(f"Warning: Remote server returned {resp.status_code} for filter check. Assuming 0 existing.")
+                remote = RemoteManifest()
+        print(f"Found {len(remote.url_hashes)} existing {question_type} questions on remote.")
     except Exception as e:
         print(f"Warning: Could not fetch existing questions from remote: {e}. Proceeding with clean scrape.")
-        existing_urls = []
+        remote = RemoteManifest()
 
     # 4. Scrape Locally or Load from Cache
     print(f"\nScraping {subject_name} ({exam_type}) {question_type} locally with yearly saving...")
@@ -101,88 +124,55 @@ def sync():
     import datetime
     current_year = datetime.datetime.now().year
     all_questions = []
-    
-    # Iterate through years we want to ensure we have
-    found_any_matching = False
-    for year in range(current_year, 1999, -1):
-        if len(all_questions) >= limit:
-            print(f"\nTarget limit of {limit} questions reached. Stopping scrape loop.")
-            break
-            
-        # Partition data by subject/exam_type/year/question_type
-        data_dir = os.path.join("data", subject_name.lower().replace(" ", "_"), exam_type, str(year), question_type)
-        os.makedirs(data_dir, exist_ok=True)
-        cache_file = os.path.join(data_dir, "questions.json")
-        
-        year_questions = []
-        is_cached = False
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                year_questions = json.load(f)
-            
-            if len(year_questions) > 0:
-                is_cached = True
-                print(f"  Year {year}: Loaded {len(year_questions)} questions from local cache.")
-            else:
-                # If cached as empty, we only skip if it's an older year.
-                # For recent years or if the user is explicitly trying to sync, we might want to retry.
-                if year < 2010:
-                    print(f"  Year {year}: Cache shows 0 questions. Skipping (use --clear to retry).")
-                    continue
-                else:
-                    print(f"  Year {year}: Cache empty. Attempting re-scrape...")
-
-        if not is_cached:
-            print(f"  Year {year}: Scraping MySchool...")
-            year_data = scraper.scrape_questions(
-                subject_url, 
-                limit=100, 
-                min_year=year, 
-                max_year=year, 
-                existing_urls=[], 
-                exam_type=exam_type,
-                question_type=question_type
-            )
-            
-            # Robust filtering
-            year_questions = []
-            for q in year_data:
-                if q['year'] == year or q['year'] is None:
-                    q['year'] = year
-                    q['question_type'] = question_type
-                    year_questions.append(q)
-            
-            if year_questions:
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(year_questions, f, indent=2)
-                print(f"  Year {year}: Saved {len(year_questions)} questions to local cache.")
-            else:
-                # Check if we were blocked before saving 0
-                if getattr(scraper, 'was_blocked', False):
-                    print(f"  Year {year}: Scrape failed due to potential block. Not caching empty result.")
-                else:
-                    with open(cache_file, 'w', encoding='utf-8') as f:
-                        json.dump([], f)
-                    print(f"  Year {year}: No questions found on MySchool.")
 
+    def collect(year, year_questions):
         # Track how many from this year are actually new
         new_in_year = 0
         for q in year_questions:
-            found_any_matching = True
             q['subject'] = subject_name
             q['question_type'] = question_type
             
-            is_new = True
-            if q['source_url'] and q['source_url'] in existing_urls:
-                is_new = False
-            
-            if is_new:
-                if q['source_url'] not in [sq['source_url'] for sq in all_questions if sq.get('source_url')]:
-                    all_questions.append(q)
-                    new_in_year += 1
+            if not remote.contains(q):
+                all_questions.append(q)
+                remote.add(q)  # also dedups within this run
+                new_in_year += 1
         
         if year_questions and new_in_year > 0:
-            print(f"  -> Added {new_in_year} new questions to upload queue.")
+            print(f"  -> Year {year}: added {new_in_year} new questions to upload queue.")
+        return len(all_questions) < limit
+    
+    # Partition data by subject/exam_type/year/question_type in data/questions.sqlite;
+    # cached years are read first, the rest are scraped in parallel below
+    store = LocalStore()
+    store.import_json_tree_once()
+    to_scrape = []
+    for year in range(current_year, 1999, -1):
+        if len(all_questions) >= limit:
+            print(f"\nTarget limit of {limit} questions reached. Stopping scrape loop.")
+            break
+
+        partition = Partition(subject_name, subject_url, exam_type, year, question_type)
+        year_questions = load_partition(partition, store)
+        if year_questions:
+            print(f"  Year {year}: Loaded {len(year_questions)} questions from local cache.")
+            collect(year, year_questions)
+        elif year_questions is not None and year < 2010:
+            # If cached as empty, we only skip if it's an older year.
+            # For recent years or if the user is explicitly trying to sync, we might want to retry.
+            print(f"  Year {year}: Cache shows 0 questions. Skipping (run scripts/clear_empty_caches.py to retry).")
+        else:
+            to_scrape.append(partition)
+
+    if to_scrape and len(all_questions) < limit:
+        print(f"  Scraping {len(to_scrape)} years from MySchool, {SCRAPE_WORKERS} at a time...")
+        # Years are independent; each is saved as soon as it finishes. Stops
+        # starting new years once the limit is reached.
+        report = run_schedule(
+            to_scrape, scraper, workers=SCRAPE_WORKERS, limit=100, store=store,
+            on_partition=lambda partition, questions: collect(partition.year, questions)
+        )
+        if report['incomplete']:
+            print(f"  {report['incomplete']} years had pages that failed (possible block); they will be retried next run.")
 
     if not all_questions:
         print("\nNo new questions found for upload. All questions from these years are already on your Render server.")
@@ -198,21 +188,19 @@ def sync():
         return
 
     print("Uploading to remote server...")
+    uploader = Uploader(REMOTE_URL)
     try:
-        # Post to the new bulk endpoint
-        sync_resp = requests.post(
-            f"{REMOTE_URL}/questions/bulk",
-            json=all_questions,
-            headers={"Content-Type": "application/json"}
-        )
-        
-        if sync_resp.status_code == 200:
-            print(f"Success! Server message: {sync_resp.json().get('message')}")
-            print("Refresh your website dashboard to see the new questions.")
+        report = uploader.upload(all_questions)
+        print(f"Success! Added {report['accepted']} new questions ({report['duplicates']} already there) "
+              f"in {report['batches']} batches.")
+        if report['failed']:
+            print(f"{len(report['failed'])} batches failed ({report['failed'][0]['error']}). Run the sync again to resume.")
         else:
-            print(f"Error {sync_resp.status_code}: {sync_resp.text}")
+            print("Refresh your website dashboard to see the new questions.")
     except Exception as e:
         print(f"Upload failed: {e}")
+    finally:
+        uploader.close()
 
 if __name__ == "__main__":
     sync()
@@ -0,0 +1,350 @@
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import contextlib
+
+# Add parent directory to path to import scrapers
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.myschool_scraper import MySchoolScraper
+from scrapers.scheduler import (EXAM_TYPES, QUESTION_TYPES, build_matrix, load_partition, load_subjects, parse_years,
+                                run_schedule, save_partition)
+from scrapers.local_store import LocalStore, partition_key, DEFAULT_PATH
+from scripts.remote_manifest import fetch_partition_digests
+from scripts.uploader import Uploader, UploadJournal
+from backend.aloc_client import ALOCClient
+from backend.jobs import aloc_rows
+
+SOURCES = ('myschool', 'aloc', 'store')
+
+# ALOC serves objective questions only, for these subjects and exams
+ALOC_SUBJECTS = {
+    'mathematics': 'mathematics', 'english language': 'english', 'chemistry': 'chemistry', 'physics': 'physics',
+    'biology': 'biology', 'geography': 'geography', 'literature in english': 'englishlit', 'economics': 'economics',
+    'commerce': 'commerce', 'accounts - principles of accounts': 'accounting', 'government': 'government',
+    'christian religious knowledge (crk)': 'crk', 'islamic religious knowledge (irk)': 'irk', 'history': 'history',
+    'insurance': 'insurance', 'civic education': 'civiledu',
+}
+ALOC_EXAM_TYPES = {'jamb': 'utme', 'waec': 'wassce'}
+ALOC_MAX_COUNT = 40
+
+# Every key a job spec may set, with its default
+DEFAULT_SPEC = {
+    'server': None,              # target API; no upload if null
+    'source': 'myschool',        # 'myschool' scrapes missing partitions first, 'aloc' fetches them from
+                                 # the ALOC API, 'store' only uploads
+    'subjects': None,            # names or slugs from subjects.json; null means all
+    'exam_types': EXAM_TYPES,
+    'years': f"2000-{time.localtime().tm_year}",
+    'question_types': QUESTION_TYPES,
+    'workers': 8,                # partitions scraped at once
+    'rate': None,                # requests per second to myschool.ng
+    'max_in_flight': None,
+    'limit': 100,                # max questions per partition
+    'deadline': None,            # seconds after which no new partition starts
+    'refresh': False,            # re-scrape partitions already in the store
+    'upload_workers': 4,         # upload batches in flight
+    'store': DEFAULT_PATH,
+    'aloc_token_env': 'ALOC_TOKEN',  # environment variable holding the ALOC access token (source 'aloc')
+}
+
+class JobSpecError(ValueError):
+    pass
+
+def load_spec(path=None, overrides=None):
+    """Reads a JSON job spec and fills in defaults. Raises JobSpecError."""
+    spec = {}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        if not isinstance(spec, dict):
+            raise JobSpecError("A job spec must be a JSON object.")
+    spec.update({k: v for k, v in (overrides or {}).items() if v is not None})
+
+    unknown = sorted(set(spec) - set(DEFAULT_SPEC))
+    if unknown:
+        raise JobSpecError(f"Unknown job spec keys: {', '.join(unknown)}")
+    spec = dict(DEFAULT_SPEC, **spec)
+    if spec['source'] not in SOURCES:
+        raise JobSpecError(f"source must be one of {', '.join(SOURCES)}")
+    for key in ('subjects', 'exam_types', 'question_types'):
+        if isinstance(spec[key], str):
+            spec[key] = [v.strip() for v in spec[key].split(',') if v.strip()]
+    if isinstance(spec['years'], (list, tuple)):
+        spec['years'] = ','.join(str(y) for y in spec['years'])
+    spec['years'] = str(spec['years'])
+    if spec['server']:
+        spec['server'] = spec['server'].rstrip('/')
+    return spec
+
+def plan(spec, subjects_path='subjects.json'):
+    subjects = load_subjects(subjects_path, names=spec['subjects'])
+    if spec['subjects']:
+        found = {s['name'].lower() for s in subjects} | {s['url'].rstrip('/').rsplit('/', 1)[-1] for s in subjects}
+        missing = [n for n in spec['subjects'] if n.strip().lower() not in found]
+        if missing:
+            raise JobSpecError(f"Unknown subjects: {', '.join(missing)}")
+    return build_matrix(subjects, spec['exam_types'], parse_years(spec['years']), spec['question_types'])
+
+class EventLog:
+    """Writes one JSON object per line: {"event": ..., "time": ..., ...}."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def __call__(self, event, **fields):
+        line = json.dumps(dict(event=event, time=round(time.time(), 3), **fields), default=str) + '\n'
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+def aloc_scope(partition):
+    """ALOC (subject, type) parameters for a partition, or None if ALOC doesn't serve it."""
+    subject = ALOC_SUBJECTS.get(partition.subject.lower())
+    exam_type = ALOC_EXAM_TYPES.get(partition.exam_type)
+    if subject is None or exam_type is None or partition.question_type != 'objective':
+        return None
+    return subject, exam_type
+
+def fetch_aloc(partitions, store, emit, client, limit=None, on_partition=None):
+    """Fetches each partition from the ALOC API into the store. Returns a report like run_schedule's.
+
+    A failed request leaves its partition unsaved, so the next run retries it.
+    `on_partition(partition, rows)` is called after each saved partition.
+    """
+    start = time.monotonic()
+    report = {'partitions': len(partitions), 'scraped': 0, 'questions': 0, 'empty': 0, 'errors': []}
+    for partition in partitions:
+        subject, exam_type = aloc_scope(partition)
+        try:
+            data = client.get_multiple_questions(subject, count=min(limit or ALOC_MAX_COUNT, ALOC_MAX_COUNT),
+                                                 year=partition.year, type=exam_type)
+            if not data or 'data' not in data:
+                raise ValueError(f"no data: {data.get('error') if data else 'request failed'}")
+            rows = [r for r in aloc_rows(data['data'], partition.subject) if r['year'] in (None, partition.year)]
+        except Exception as e:
+            report['errors'].append({'partition': partition.key, 'error': f"{type(e).__name__}: {e}"})
+            emit('partition', key=partition.key, questions=0, status='error')
+            continue
+        save_partition(partition, rows, store)
+        report['scraped'] += 1
+        report['questions'] += len(rows)
+        report['empty'] += not rows
+        emit('partition', key=partition.key, questions=len(rows),
+             status=store.partition(partition.subject, partition.exam_type, partition.year,
+                                    partition.question_type).status)
+        if on_partition:
+            on_partition(partition, rows)
+    report['seconds'] = round(time.monotonic() - start, 1)
+    return report
+
+def run_job(spec, emit, store=None, scraper=None, session=None, dry_run=False, subjects_path='subjects.json',
+            aloc=None):
+    """Runs scrape -> local store -> delta upload for a loaded spec. Returns the summary dict.
+
+    With a server set, each partition is uploaded as soon as it is scraped
+    (summary['streamed']); the delta upload afterwards sends the rest.
+
+    Source 'aloc' reads its token from the environment variable the spec
+    names in `aloc_token_env` (unless an `aloc` client is passed).
+    """
+    partitions = plan(spec, subjects_path)
+    store = store or LocalStore(spec['store'])
+    store.import_json_tree_once()
+
+    summary = {'partitions': len(partitions), 'scrape': None, 'streamed': None, 'upload': None}
+    to_scrape = []
+    if spec['source'] in ('myschool', 'aloc'):
+        to_scrape = partitions if spec['refresh'] else [p for p in partitions if load_partition(p, store) is None]
+    if spec['source'] == 'aloc':
+        to_scrape = [p for p in to_scrape if aloc_scope(p)]
+        if aloc is None:
+            token = os.getenv(spec['aloc_token_env'] or '')
+            if not token:
+                raise JobSpecError(f"source 'aloc' needs an ALOC access token in ${spec['aloc_token_env']}")
+            aloc = ALOCClient(token=token)
+    emit('plan', partitions=len(partitions), to_scrape=len(to_scrape), server=spec['server'], dry_run=dry_run)
+    if dry_run:
+        return summary
+
+    # Finished partitions are uploaded while the rest are still being scraped
+    streaming = UploadStream(spec, store, emit, session) if spec['server'] and to_scrape else None
+    try:
+        if to_scrape and spec['source'] == 'aloc':
+            report = fetch_aloc(to_scrape, store, emit, aloc, limit=spec['limit'],
+                                on_partition=streaming and streaming.put)
+            summary['scrape'] = report
+            emit('scrape_done', **report)
+        elif to_scrape:
+            scraper = scraper or MySchoolScraper(rate=spec['rate'], max_in_flight=spec['max_in_flight'], frontier=True)
+
+            def on_partition(partition, questions):
+                emit('partition', key=partition.key, questions=len(questions),
+                     status=store.partition(partition.subject, partition.exam_type, partition.year,
+                                            partition.question_type).status)
+                if streaming:
+                    streaming.put(partition, questions)
+
+            report = run_schedule(to_scrape, scraper, workers=spec['workers'], limit=spec['limit'], store=store,
+                                  on_partition=on_partition, deadline=spec['deadline'], progress=lambda msg: None)
+            summary['scrape'] = report
+            emit('scrape_done', **report)
+    finally:
+        if streaming:
+            summary['streamed'] = streaming.close()
+
+    if spec['server']:
+        # Catches up on whatever the stream did not push: partitions that were
+        # already in the store, and failed streamed uploads
+        summary['upload'] = upload_changed(spec, partitions, store, emit, session,
+                                           streamed=streaming.pushed if streaming else ())
+    emit('done', **summary)
+    return summary
+
+class UploadStream:
+    """Uploads partitions on a background thread as the scrape finishes them.
+
+    put() queues a partition and returns at once; close() waits for the queue
+    to drain and returns a report like Uploader.upload's. Partitions whose
+    upload failed are left out of `pushed`, so upload_changed sends them again.
+    """
+
+    def __init__(self, spec, store, emit, session=None):
+        self.spec = spec
+        self.store = store
+        self.emit = emit
+        self.session = session
+        self.queue = queue.Queue()
+        self.pushed = []
+        self.report = {'partitions': 0, 'questions': 0, 'accepted': 0, 'duplicates': 0, 'rejected': 0, 'failed': []}
+        self.thread = threading.Thread(target=self._run, name='upload-stream', daemon=True)
+        self.thread.start()
+
+    def put(self, partition, questions):
+        if questions:
+            self.queue.put(partition)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        return self.report
+
+    def _run(self):
+        # The journal's sqlite connection has to be opened on the thread that uses it
+        journal = UploadJournal(os.path.join(os.path.dirname(self.store.path), '.upload_journal.sqlite'))
+        uploader = Uploader(self.spec['server'], workers=self.spec['upload_workers'], journal=journal,
+                            session=self.session)
+        try:
+            while True:
+                partition = self.queue.get()
+                if partition is None:
+                    return
+                self._upload(uploader, partition)
+        finally:
+            uploader.close()
+
+    def _upload(self, uploader, partition):
+        row = self.store.partition(partition.subject, partition.exam_type, partition.year, partition.question_type)
+        questions = list(self.store.iter_questions(*row.scope))
+        try:
+            report = uploader.upload(questions, progress=lambda msg: None)
+        except Exception as e:
+            report = {'questions': len(questions), 'accepted': 0, 'duplicates': 0, 'rejected': 0,
+                      'failed': [{'questions': len(questions), 'error': f"{type(e).__name__}: {e}"}]}
+        for name in ('questions', 'accepted', 'duplicates', 'rejected'):
+            self.report[name] += report[name]
+        self.report['partitions'] += 1
+        if report['failed']:
+            self.report['failed'].extend(dict(f, partition=row.key) for f in report['failed'])
+        else:
+            self.pushed.append(row)
+        self.emit('upload_partition', key=row.key, questions=report['questions'], accepted=report['accepted'],
+                  duplicates=report['duplicates'], failed=len(report['failed']))
+
+def upload_changed(spec, partitions, store, emit, session=None, streamed=()):
+    """Uploads the job's partitions whose digest differs from the server's.
+
+    `streamed` are partitions an UploadStream already pushed during this job;
+    they are checkpointed here and not sent again.
+    """
+    scope = {partition_key(p.subject, p.exam_type, p.year, p.question_type) for p in partitions}
+    scope -= {p.key for p in streamed}
+    server_digests = fetch_partition_digests(spec['server'], session=session)
+    if streamed:
+        store.mark_pushed(streamed, server_digests or {})
+    if server_digests is None:
+        emit('log', message="Server has no /sync/partitions; uploading every partition in scope.")
+        changed = [p for p in store.partitions() if p.key in scope and p.question_count]
+    else:
+        changed = [p for p in store.changed_partitions(server_digests) if p.key in scope]
+    questions = [q for p in changed for q in store.iter_questions(*p.scope)]
+    emit('upload_plan', partitions=len(changed), questions=len(questions))
+    if not questions:
+        return {'partitions': 0, 'questions': 0, 'accepted': 0, 'duplicates': 0, 'failed': []}
+
+    journal = UploadJournal(os.path.join(os.path.dirname(store.path), '.upload_journal.sqlite'))
+    uploader = Uploader(spec['server'], workers=spec['upload_workers'], journal=journal, session=session)
+    try:
+        report = uploader.upload(
+            questions, progress=lambda msg: emit('log', message=msg.strip()),
+            on_batch=lambda size, counts, seconds, totals: emit(
+                'upload_batch', size=size, seconds=round(seconds, 2), next_batch=uploader.batch_size, **counts
+            )
+        )
+    finally:
+        uploader.close()
+    if not report['failed']:
+        store.mark_pushed(changed, fetch_partition_digests(spec['server'], session=session) or {})
+    report['partitions'] = len(changed)
+    emit('upload_done', **report)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Unattended scrape -> store -> upload run driven by a JSON job spec. "
+                    "Progress is written as JSON lines; other output goes to stderr."
+    )
+    parser.add_argument('spec', nargs='?', help="Job spec file (JSON); see DEFAULT_SPEC for keys")
+    parser.add_argument('--server', help="Overrides the spec's server")
+    parser.add_argument('--source', choices=SOURCES)
+    parser.add_argument('--subjects')
+    parser.add_argument('--years')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--upload-workers', type=int)
+    parser.add_argument('--events', default='-', help="Where to write JSON-lines progress (default: stdout)")
+    parser.add_argument('--dry-run', action='store_true', help="Only print the plan")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec, {
+            'server': args.server, 'source': args.source, 'subjects': args.subjects, 'years': args.years,
+            'workers': args.workers, 'upload_workers': args.upload_workers,
+        })
+    except (OSError, json.JSONDecodeError, JobSpecError) as e:
+        parser.error(str(e))
+
+    events = sys.stdout if args.events == '-' else open(args.events, 'a', encoding='utf-8')
+    emit = EventLog(events)
+    # Keep stdout machine-readable: scraper chatter goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            summary = run_job(spec, emit, dry_run=args.dry_run)
+        except JobSpecError as e:
+            emit('error', message=str(e))
+            return 2
+        except Exception as e:
+            emit('error', message=f"{type(e).__name__}: {e}")
+            return 1
+        finally:
+            if events is not sys.stdout:
+                events.close()
+
+    failed = (summary['upload'] or {}).get('failed') or (summary['scrape'] or {}).get('errors')
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import os
+import sys
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Add parent directory to path to import backend.hashing
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.hashing import content_hash
+
+JOURNAL_PATH = os.path.join("data", ".upload_journal.sqlite")
+
+# Journal rows of uploads that never finished are dropped after this long
+JOURNAL_MAX_AGE = 30 * 24 * 3600
+
+# Worth retrying with the same Idempotency-Key
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class UploadError(Exception):
+    pass
+
+def question_key(q):
+    return content_hash(q.get('body'), q.get('subject'), q.get('year'), q.get('exam_type'))
+
+class UploadJournal:
+    """Remembers which questions of an upload the server has acknowledged.
+
+    Keyed by job (see Uploader.job_id), so re-running an interrupted upload
+    of the same questions skips every batch that was already acked.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS acked (
+                job TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                acked_at REAL NOT NULL,
+                PRIMARY KEY (job, content_hash)
+            );
+        ''')
+        self.db.execute('DELETE FROM acked WHERE acked_at < ?', (time.time() - JOURNAL_MAX_AGE,))
+        self.db.commit()
+
+    def acked(self, job):
+        return {row[0] for row in self.db.execute('SELECT content_hash FROM acked WHERE job = ?', (job,))}
+
+    def ack(self, job, hashes):
+        now = time.time()
+        self.db.executemany('INSERT OR IGNORE INTO acked (job, content_hash, acked_at) VALUES (?, ?, ?)',
+                            [(job, h, now) for h in hashes])
+        self.db.commit()
+
+    def finish(self, job):
+        self.db.execute('DELETE FROM acked WHERE job = ?', (job,))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+class Uploader:
+    """Pushes questions to /questions/bulk/ndjson in concurrent gzip batches.
+
+    Up to `workers` batches are in flight over one pooled session. The batch
+    size doubles while the server answers within half of `target_latency`
+    and halves when it is slower. Failed batches are retried with the same
+    Idempotency-Key; acked batches go to the journal, so running the same
+    upload again after an interruption only sends what is left. Servers
+    without the NDJSON endpoint get plain JSON on /questions/bulk.
+    """
+
+    def __init__(self, server_url, workers=4, batch_size=500, min_batch=50, max_batch=5000,
+                 target_latency=5.0, retries=4, backoff=1.0, timeout=120, journal=True, session=None):
+        self.server_url = server_url.rstrip('/')
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.target_latency = target_latency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.journal = UploadJournal() if journal is True else (journal or None)
+        self.ndjson = True
+        self.owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    def job_id(self, keys):
+        digest = hashlib.sha256(self.server_url.encode('utf-8'))
+        for key in sorted(keys):
+            digest.update(key.encode('utf-8'))
+        return digest.hexdigest()[:24]
+
+    def _post(self, rows, idempotency_key):
+        headers = {'Idempotency-Key': idempotency_key}
+        if self.ndjson:
+            body = gzip.compress(''.join(json.dumps(q) + '\n' for q in rows).encode('utf-8'), compresslevel=6)
+            headers.update({'Content-Encoding': 'gzip', 'Content-Type': 'application/x-ndjson'})
+            resp = self.session.post(f"{self.server_url}/questions/bulk/ndjson", params={'batch_size': len(rows)},
+                                     data=body, headers=headers, timeout=self.timeout)
+            if resp.status_code != 404:
+                return resp
+            # Older server: fall back to the JSON endpoint for the rest of the upload
+            self.ndjson = False
+        return self.session.post(f"{self.server_url}/questions/bulk", json=rows, headers=headers, timeout=self.timeout)
+
+    def send_batch(self, rows, idempotency_key):
+        """POSTs one batch, retrying transient failures. Returns (counts, seconds)."""
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                resp = self._post(rows, idempotency_key)
+                error = None if resp.status_code == 200 else f"HTTP {resp.status_code}: {resp.text[:200]}"
+                retry = resp.status_code in RETRY_STATUSES
+            except requests.RequestException as e:
+                resp, error, retry = None, f"{type(e).__name__}: {e}", True
+
+            if error is None:
+                data = resp.json()
+                counts = data.get('totals') or {'accepted': data.get('added', 0), 'duplicates': data.get('duplicates', 0),
+                                                'rejected': 0}
+                return counts, time.monotonic() - start
+            if not retry or attempt >= self.retries:
+                raise UploadError(error)
+            attempt += 1
+            delay = resp.headers.get('Retry-After') if resp is not None else None
+            time.sleep(float(delay) if delay and delay.isdigit() else min(self.backoff * 2 ** attempt, 30))
+
+    def _adapt(self, seconds):
+        if seconds < self.target_latency / 2:
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
+        elif seconds > self.target_latency:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+
+    def upload(self, questions, progress=print, on_batch=None):
+        """Uploads `questions` (dicts in QuestionSchema shape). Returns a report dict.
+
+        A batch that still fails after its retries is reported and skipped;
+        its questions stay out of the journal so the next run sends them.
+        `on_batch(size, counts, seconds, report)` is called for each acked batch.
+        """
+        keyed = {}
+        for q in questions:
+            if q.get('body'):
+                keyed.setdefault(question_key(q), q)
+        job = self.job_id(keyed)
+        acked = self.journal.acked(job) if self.journal else set()
+        pending = [(key, q) for key, q in keyed.items() if key not in acked]
+
+        report = {'questions': len(keyed), 'resumed': len(keyed) - len(pending), 'batches': 0,
+                  'accepted': 0, 'duplicates': 0, 'rejected': 0, 'failed': [], 'seconds': 0}
+        if report['resumed']:
+            progress(f"Resuming upload: {report['resumed']} questions were already acknowledged.")
+
+        start = time.monotonic()
+        position = 0
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while position < len(pending) or in_flight:
+                while position < len(pending) and len(in_flight) < self.workers:
+                    batch = pending[position:position + self.batch_size]
+                    position += len(batch)
+                    keys = [key for key, _ in batch]
+                    idempotency_key = hashlib.sha256(f"{job}:{','.join(keys)}".encode('utf-8')).hexdigest()[:32]
+                    future = pool.submit(self.send_batch, [q for _, q in batch], idempotency_key)
+                    in_flight[future] = keys
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    keys = in_flight.pop(future)
+                    report['batches'] += 1
+                    try:
+                        counts, seconds = future.result()
+                    except UploadError as e:
+                        report['failed'].append({'questions': len(keys), 'error': str(e)})
+                        progress(f"  Batch of {len(keys)} failed: {e}")
+                        continue
+                    for name in ('accepted', 'duplicates', 'rejected'):
+                        report[name] += counts.get(name, 0)
+                    if self.journal:
+                        self.journal.ack(job, keys)
+                    self._adapt(seconds)
+                    if on_batch:
+                        on_batch(len(keys), counts, seconds, report)
+                    done = report['resumed'] + report['accepted'] + report['duplicates'] + report['rejected']
+                    progress(f"  Batch {report['batches']}: {len(keys)} sent in {seconds:.1f}s "
+                             f"({done}/{report['questions']} done, next batch {self.batch_size})")
+
+        if self.journal and not report['failed']:
+            self.journal.finish(job)
+        report['seconds'] = round(time.monotonic() - start, 1)
+        return report
+
+    def close(self):
+        if self.owns_session:
+            self.session.close()
+        if self.journal:
+            self.journal.close()
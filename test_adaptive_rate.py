@@ -0,0 +1,75 @@
+import asyncio
+import httpx
+from scrapers.crawl_engine import TokenBucket, AIMDController, AsyncFetcher, configure_host
+from scrapers.myschool_scraper import MySchoolScraper
+
+def test_aimd_controller():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    controller = AIMDController(bucket, min_rate=0.25, max_rate=1.5, increase=0.25, window=3, cooldown=60)
+
+    print("\n--- Test 1: clean windows raise the rate up to the ceiling ---")
+    for _ in range(3):
+        controller.on_success()
+    assert bucket.rate == 1.25
+    for _ in range(30):
+        controller.on_success()
+    assert bucket.rate == 1.5
+
+    print("--- Test 2: a burst of blocks halves the rate once per cooldown ---")
+    for _ in range(5):
+        controller.on_block()
+    assert bucket.rate == 0.75
+    assert controller.backoff_delay() == 16
+    controller.last_decrease = 0
+    controller.on_block()
+    controller.last_decrease = 0
+    controller.on_block()
+    assert bucket.rate == 0.25  # floor
+    stats = controller.stats()
+    print(stats)
+    assert stats["blocked"] == 7 and stats["decreases"] == 3 and stats["highest_rate"] == 1.5
+
+    print("--- Test 3: a clean response resets the backoff ---")
+    controller.on_success()
+    assert controller.backoff_delay() == 1
+
+def test_scraper_reports_blocks():
+    print("--- Test 4: 403s and captcha pages are counted and slow the host down ---")
+    scraper = MySchoolScraper(rate=100, max_in_flight=2, cache=False)
+    scraper.controller.cooldown = 0
+
+    async def handler(request):
+        path = request.url.path
+        if path.endswith("/1"):
+            return httpx.Response(403, text="Forbidden")
+        if path.endswith("/2"):
+            return httpx.Response(200, text="<html>Please verify you are a human</html>")
+        return httpx.Response(200, text="<html><h3>ok</h3></html>")
+
+    async def run():
+        scraper.reset_stats()
+        async with AsyncFetcher(transport=httpx.MockTransport(handler)) as fetcher:
+            original = scraper.retry_delay
+            scraper.retry_delay = lambda: 0
+            try:
+                failed = []
+                for n in (1, 2, 3):
+                    soup = await scraper.fetch_soup(f"https://myschool.ng/classroom/questions/{n}", fetcher)
+                    failed.append(scraper.fetch_failed(soup))
+                return failed
+            finally:
+                scraper.retry_delay = original
+
+    before = scraper.limiter.bucket.rate
+    failed = asyncio.run(run())
+    stats = scraper.block_stats()
+    print(stats)
+    assert failed == [True, True, False]
+    assert stats["blocked_403"] == 2 and stats["retries"] == 1 and stats["bot_pages"] == 1
+    assert stats["blocked"] == 3 and stats["ok"] == 1 and stats["requests"] == 4
+    assert scraper.limiter.bucket.rate < before
+    configure_host("myschool.ng", rate=1.0, max_in_flight=4)
+
+if __name__ == "__main__":
+    test_aimd_controller()
+    test_scraper_reports_blocks()
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from backend.main import app
+from backend.models import SessionLocal, Question, engine, Base
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def make_batch(n, prefix="Dedup"):
+    return [
+        {"body": f"{prefix} Q{i}", "answer": "A", "subject": "Biology", "year": 2018, "exam_type": "neco",
+         "options": ["a", "b"], "explanation": None, "source_url": f"https://example.test/{prefix}/{i}" if i % 2 else None}
+        for i in range(n)
+    ]
+
+def count_statements(fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements)
+
+def test_bulk_dedup():
+    client.get("/clear-questions")
+
+    print("\n--- Test 1: In-batch and whitespace duplicates are dropped ---")
+    batch = make_batch(4)
+    batch.append(dict(batch[0], body="  Dedup   Q0 "))
+    batch.append(dict(batch[1], body="Different body, same url"))
+    resp = client.post("/questions/bulk", json=batch)
+    print(resp.json())
+    assert resp.json()["added"] == 4
+    assert resp.json()["duplicates"] == 2
+
+    print("--- Test 2: Re-uploading adds nothing ---")
+    resp = client.post("/questions/bulk", json=batch)
+    assert resp.json()["added"] == 0
+
+    db = SessionLocal()
+    assert db.query(Question).filter(Question.content_hash.is_(None)).count() == 0
+    db.close()
+
+def test_bulk_statement_count_is_constant():
+    client.get("/clear-questions")
+    small = count_statements(lambda: client.post("/questions/bulk", json=make_batch(5, "Small")))
+    large = count_statements(lambda: client.post("/questions/bulk", json=make_batch(200, "Large")))
+    print(f"\nStatements: 5 rows -> {small}, 200 rows -> {large}")
+    assert small == large
+
+if __name__ == "__main__":
+    test_bulk_dedup()
+    test_bulk_statement_count_is_constant()
@@ -0,0 +1,85 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import subprocess
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import SessionLocal, Question, engine, Base, canonical
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+# questions as the baseline schema created it, before canonical values
+BASELINE_SCHEMA = """CREATE TABLE questions (
+    id INTEGER PRIMARY KEY, body TEXT NOT NULL, options JSON, answer VARCHAR(500), explanation TEXT,
+    subject VARCHAR(100), year INTEGER, exam_type VARCHAR(50), question_type VARCHAR(50), topic VARCHAR(200),
+    source_url VARCHAR(500)
+)"""
+
+def bodies(query):
+    resp = client.get(f"/questions?{query}")
+    assert resp.status_code == 200, resp.text
+    return sorted(q["body"] for q in resp.json())
+
+def test_filter_values_are_canonical():
+    client.get("/clear-questions")
+    db = SessionLocal()
+    db.add_all([
+        Question(body="Canon Q1", subject=" Biology ", exam_type="JAMB ", question_type="Objective", year=2023,
+                 topic=" Cell Biology ", answer="A"),
+        Question(body="Canon Q2", subject="biology", exam_type="jamb", question_type="objective", year=2023,
+                 topic="Genetics", answer="B"),
+        Question(body="Canon Q3", subject="", exam_type="  ", question_type="theory", year=2023, answer="C"),
+    ])
+    db.commit()
+    stored = {q.body: (q.subject, q.exam_type, q.question_type, q.topic) for q in db.query(Question)}
+    db.close()
+
+    print("\n--- Test 1: writes store trimmed lowercase values ---")
+    assert stored["Canon Q1"] == ("biology", "jamb", "objective", "Cell Biology")
+
+    print("--- Test 2: '' and blank values are stored as NULL ---")
+    assert canonical("") is None and canonical("   ") is None and canonical(None) is None
+    assert stored["Canon Q3"][:2] == (None, None)
+
+    print("--- Test 3: mixed-case and padded filters return the same rows ---")
+    expected = ["Canon Q1", "Canon Q2"]
+    for query in ("subject=biology&exam_type=jamb", "subject=BIOLOGY&exam_type=Jamb",
+                  "subject=%20Biology%20&exam_type=%20JAMB&question_type=OBJECTIVE"):
+        assert bodies(query) == expected, query
+    assert client.get("/filters?subject=BIOLOGY").json() == client.get("/filters?subject=biology").json()
+
+    print("--- Test 4: topics match exactly, as /filters lists them (trimmed, case kept) ---")
+    assert bodies("subject=biology&topic=Cell%20Biology") == ["Canon Q1"]
+    assert bodies("subject=biology&topic=%20Cell%20Biology%20") == ["Canon Q1"]
+    # Before: ilike matched any casing; topics keep their display casing now
+    assert bodies("subject=biology&topic=cell%20biology") == []
+    client.get("/clear-questions")
+
+def test_migrate_lowercases_a_baseline_database():
+    print("--- Test 5: migrate canonicalizes rows written before the change ---")
+    path = os.path.join(tempfile.mkdtemp(), "baseline.db")
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.executemany("INSERT INTO questions (body, subject, year, exam_type, question_type, topic) VALUES (?, ?, ?, ?, ?, ?)", [
+        ("Old Q1", " Chemistry", 2010, "WAEC", "Objective", "Acids "),
+        ("Old Q2", "chemistry", 2010, "waec", None, "Acids"),
+    ])
+    conn.commit()
+    conn.close()
+
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}")
+    subprocess.run([sys.executable, "-m", "backend.migrate"], check=True, env=env,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT subject, exam_type, question_type, topic FROM questions ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [("chemistry", "waec", "objective", "Acids")] * 2
+
+if __name__ == "__main__":
+    test_filter_values_are_canonical()
+    test_migrate_lowercases_a_baseline_database()
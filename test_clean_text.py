@@ -0,0 +1,37 @@
+import random
+from scrapers.myschool_scraper import MySchoolScraper, clean_text
+from scrapers.benchmark_clean import legacy_clean_text, SAMPLES
+
+TOKENS = [
+    "CO2", "H2SO4", "Na", "Fe3", "H2O", "1s2", "2p6", "3d10", "x^2", "x^{n+1}", r"\^{2}",
+    "y_1", "a_{12}", r"\_{3}", "_{a_{b} c}", "_{a_2}", r"\frac{1}{2}", r"\frac{a_{1}}{b}",
+    r"\(", r"\)", r"\[", r"\]", r"\\()", r"\to", r"\times", r"\div", r"\lambda", r"\theta",
+    r"\uparrow", r"\downarrow", r"\tomato", "&nbsp;", "\xa0", "\ufffd", "<sub>2</sub>",
+    '<img src="/img/A2.png"/>', "The", "word", " ", " ", "\\", "_", "^", "{", "}", "2", "s",
+]
+SUBJECTS = ["", "chemistry", "English Language", "physics", "mathematics", "https://myschool.ng/classroom/english/1"]
+
+def test_matches_legacy_on_samples():
+    print("\n--- Test 1: built-in samples match the legacy cleaner ---")
+    for text, subject in SAMPLES:
+        for s in (subject, "english", ""):
+            assert clean_text(text, s) == legacy_clean_text(text, s), (text, s)
+
+def test_matches_legacy_fuzzed():
+    print("--- Test 2: random token strings match the legacy cleaner ---")
+    rng = random.Random(1234)
+    for _ in range(5000):
+        text = "".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 12)))
+        subject = rng.choice(SUBJECTS)
+        assert clean_text(text, subject) == legacy_clean_text(text, subject), (text, subject)
+
+def test_method_delegates():
+    print("--- Test 3: clean_scientific_text still cleans strings ---")
+    scraper = MySchoolScraper(cache=False)
+    assert scraper.clean_scientific_text("CO2 \\to H2O", "chemistry") == "CO<sub>2</sub> → H2O"
+    assert scraper.clean_scientific_text("", "chemistry") == ""
+
+if __name__ == "__main__":
+    test_matches_legacy_on_samples()
+    test_matches_legacy_fuzzed()
+    test_method_delegates()
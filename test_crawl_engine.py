@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import httpx
+from scrapers.crawl_engine import TokenBucket, AsyncFetcher, HostLimiter, configure_host
+from scrapers.myschool_scraper import MySchoolScraper
+
+LISTING = """<html><body>
+<div><a href="/classroom/questions/{n}1">View Answer</a></div>
+<div><a href="/classroom/questions/{n}2">View Answer</a></div>
+<div><a href="/classroom/questions/{n}3">View Answer</a></div>
+</body></html>"""
+
+DETAIL = """<html><body>
+<h3 class="page-title">Question</h3>
+<div class="question-desc"><p>Which gas is CO2 number {qid}?</p></div>
+<ul class="list-unstyled">
+<li><strong>A.</strong> Oxygen</li><li><strong>B.</strong> Carbon dioxide</li>
+<li><strong>C.</strong> Nitrogen</li><li><strong>D.</strong> Helium</li>
+</ul>
+<h5>Correct Answer: Option B</h5>
+<a href="/classroom/chemistry?exam_type=waec&exam_year=2020">WAEC 2020</a>
+</body></html>"""
+
+def fake_site():
+    state = {"in_flight": 0, "peak": 0, "requests": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.02)
+        state["in_flight"] -= 1
+        path = request.url.path
+        if path.startswith("/classroom/questions/"):
+            return httpx.Response(200, text=DETAIL.format(qid=path.rsplit("/", 1)[-1]))
+        if request.url.params.get("exam_year") == "2020" and request.url.params.get("page") == "1":
+            return httpx.Response(200, text=LISTING.format(n=7))
+        return httpx.Response(200, text="<html></html>")
+
+    return httpx.MockTransport(handler), state
+
+def test_token_bucket_spacing():
+    bucket = TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.wait()
+    elapsed = time.monotonic() - start
+    print(f"\n6 tokens at 50/s took {elapsed:.3f}s")
+    assert elapsed >= 0.09
+
+def test_async_scrape_respects_in_flight_limit():
+    scraper = MySchoolScraper(rate=200, max_in_flight=2, cache=False)
+    transport, state = fake_site()
+
+    async def run():
+        async with AsyncFetcher(transport=transport) as fetcher:
+            return await scraper.scrape_questions_async(
+                "https://myschool.ng/classroom/chemistry", limit=10, min_year=2020, max_year=2020,
+                exam_type="waec", question_type="objective", fetcher=fetcher
+            )
+
+    questions = asyncio.run(run())
+    print(f"Scraped {len(questions)} questions, peak in flight {state['peak']}, requests {state['requests']}")
+    assert len(questions) == 3
+    assert questions[0]["answer"] == "B"
+    assert questions[0]["options"][1] == "Carbon dioxide"
+    assert questions[0]["year"] == 2020
+    assert state["peak"] <= 2
+    # Restore the default pacing for other tests in this process
+    configure_host("myschool.ng", rate=1.0, max_in_flight=4)
+
+def test_in_flight_limit_is_process_wide():
+    print("--- Threads and separate event loops share one in-flight allowance ---")
+    limiter = HostLimiter(rate=10000, burst=100, max_in_flight=3)
+    state = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def enter():
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+
+    def leave():
+        with lock:
+            state["now"] -= 1
+
+    def sync_worker():
+        for _ in range(5):
+            with limiter.thread_slot():
+                enter()
+                time.sleep(0.005)
+                leave()
+
+    async def one():
+        async with limiter:
+            enter()
+            try:
+                await asyncio.sleep(0.005)
+            finally:
+                leave()
+
+    async def scrape():
+        # A request cancelled while queued must not keep or leak a slot
+        waiting = asyncio.ensure_future(one())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(*(one() for _ in range(10)))
+
+    # Like scrape_questions: every scrape runs its own asyncio.run
+    threads = [threading.Thread(target=lambda: asyncio.run(scrape())) for _ in range(3)]
+    threads += [threading.Thread(target=sync_worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    limiter.resize(2)
+    for t in threads:
+        t.join()
+    print(f"peak in flight {state['peak']}, left {limiter.in_flight}")
+    assert state["peak"] <= 3 and limiter.in_flight == 0 and not limiter._waiters
+
+if __name__ == "__main__":
+    test_token_bucket_spacing()
+    test_async_scrape_respects_in_flight_limit()
+    test_in_flight_limit_is_process_wide()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine
+from scrapers.local_store import LocalStore
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def question(n):
+    return {"body": f"Delta question {n}", "options": ["A", "B"], "answer": "A", "explanation": None,
+            "source_url": f"https://myschool.ng/classroom/questions/delta-{n}"}
+
+def server_digests():
+    data = client.get("/sync/partitions?subject=geography").json()
+    return {(p["subject"], p["exam_type"], p["year"], p["question_type"]): p["digest"] for p in data["partitions"]}
+
+def push(store, partitions):
+    rows = [q for p in partitions for q in store.iter_questions(*p.scope)]
+    client.post("/questions/bulk", json=rows)
+    store.mark_pushed(partitions, server_digests())
+
+def test_only_changed_partitions_are_pushed():
+    client.get("/clear-questions")
+    store = LocalStore(os.path.join(tempfile.mkdtemp(), "questions.sqlite"))
+    store.save_partition("Geography", "waec", 2020, "objective", [question(1), question(2)])
+    store.save_partition("Geography", "waec", 2021, "objective", [question(3)])
+    store.save_partition("Geography", "waec", 2022, "objective", [])
+
+    print("\n--- Test 1: a fresh server needs every non-empty partition ---")
+    changed = store.changed_partitions(server_digests())
+    assert [p.key for p in changed] == ["geography/waec/2020/objective", "geography/waec/2021/objective"]
+    push(store, changed)
+
+    print("--- Test 2: digests match after the push, so a re-run sends nothing ---")
+    digests = server_digests()
+    assert digests[("geography", "waec", 2020, "objective")] == store.partition("geography", "waec", 2020, "objective").digest
+    assert store.changed_partitions(digests) == []
+
+    print("--- Test 3: a new local question only resends its partition ---")
+    store.save_partition("Geography", "waec", 2021, "objective", [question(4)])
+    assert [p.key for p in store.changed_partitions(server_digests())] == ["geography/waec/2021/objective"]
+    push(store, store.changed_partitions(server_digests()))
+
+    print("--- Test 4: extra server rows don't cause a resend, losing rows does ---")
+    client.post("/questions/bulk", json=[dict(question(5), subject="Geography", exam_type="waec", year=2020)])
+    assert [p.key for p in store.changed_partitions(server_digests())] == ["geography/waec/2020/objective"]
+    push(store, store.changed_partitions(server_digests()))
+    assert store.changed_partitions(server_digests()) == []
+    client.get("/clear-questions")
+    assert len(store.changed_partitions(server_digests())) == 2
+
+    print("--- Test 5: unchanged scopes revalidate to 304 ---")
+    resp = client.get("/sync/partitions?subject=geography")
+    again = client.get("/sync/partitions?subject=geography", headers={"If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+if __name__ == "__main__":
+    test_only_changed_partitions_are_pushed()
@@ -0,0 +1,80 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine, SessionLocal, Question, QuestionFacet
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def test_filters_follow_writes():
+    client.get("/clear-questions")
+
+    batch = [
+        {"body": "Facet Q1", "source_url": "facet-1", "answer": "A", "subject": "Chemistry", "year": 2021, "exam_type": "WAEC", "topic": "Acids", "options": None, "explanation": None},
+        {"body": "Facet Q2", "source_url": "facet-2", "answer": "B", "subject": "chemistry", "year": 2021, "exam_type": "waec", "topic": "Acids", "options": None, "explanation": None},
+        {"body": "Facet Q3", "source_url": "facet-3", "answer": "C", "subject": "chemistry", "year": 2019, "exam_type": "waec", "question_type": "theory", "options": None, "explanation": None},
+        {"body": "Facet Q4", "source_url": "facet-4", "answer": "D", "subject": "physics", "year": 2020, "exam_type": "jamb", "options": None, "explanation": None},
+    ]
+    resp = client.post("/questions/bulk", json=batch)
+    assert resp.status_code == 200
+
+    print("\n--- Test 1: Filters scoped to chemistry/waec ---")
+    data = client.get("/filters?subject=Chemistry&exam_type=waec").json()
+    print(data)
+    assert data["subjects"] == ["Chemistry", "Physics"]
+    assert data["years"] == [2021, 2019]
+    assert data["topics"] == ["Acids", "General"]
+    assert data["question_types"] == ["objective", "theory"]
+    assert data["counts"]["years"] == {"2021": 2, "2019": 1}
+    assert data["counts"]["subjects"] == {"Chemistry": 3, "Physics": 1}
+
+    print("--- Test 2: Duplicate upload leaves counts unchanged ---")
+    client.post("/questions/bulk", json=batch)
+    data = client.get("/filters?subject=chemistry&exam_type=waec").json()
+    assert data["counts"]["years"] == {"2021": 2, "2019": 1}
+
+    print("--- Test 3: Clearing empties the facets ---")
+    client.get("/clear-questions")
+    data = client.get("/filters").json()
+    assert data["subjects"] == [] and data["years"] == []
+
+def facet_counts(db):
+    return {(f.subject, f.year, f.question_type): f.count for f in db.query(QuestionFacet)}
+
+def test_orm_writes_keep_facets_current():
+    client.get("/clear-questions")
+    db = SessionLocal()
+    try:
+        print("--- Test 4: ORM inserts, updates and deletes outside ingest ---")
+        db.add_all([Question(body=f"ORM facet Q{i}", answer="A", subject="Economics", year=2015, exam_type="neco")
+                    for i in range(3)])
+        db.commit()
+        assert facet_counts(db) == {("economics", 2015, "objective"): 3}
+
+        moved = db.query(Question).order_by(Question.id).first()
+        moved.year = 2016
+        db.commit()
+        assert facet_counts(db) == {("economics", 2015, "objective"): 2, ("economics", 2016, "objective"): 1}
+
+        db.delete(moved)
+        db.commit()
+        assert facet_counts(db) == {("economics", 2015, "objective"): 2}
+
+        print("--- Test 5: bulk deletes and rolled back writes ---")
+        db.add(Question(body="ORM facet rollback", answer="A", subject="economics", year=2015, exam_type="neco"))
+        db.flush()
+        db.rollback()
+        assert facet_counts(db) == {("economics", 2015, "objective"): 2}
+        db.query(Question).filter(Question.body == "ORM facet Q1").delete()
+        db.commit()
+        assert facet_counts(db) == {("economics", 2015, "objective"): 1}
+        db.query(Question).delete()
+        db.commit()
+        assert facet_counts(db) == {}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    test_filters_follow_writes()
+    test_orm_writes_keep_facets_current()
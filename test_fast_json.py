@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from backend import main
+from backend.main import app
+from backend.models import Base, engine, SessionLocal, Question
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def question(n, **extra):
+    return dict({"body": f"Fast Q{n}: what is π × {n}?", "answer": "B", "options": ["Naïve", "Ökonomie", 'Say "hi"'],
+                 "explanation": None, "subject": "Mathematics", "year": 2018, "exam_type": "waec"}, **extra)
+
+def bodies(query, selected=None):
+    return {fast: main.render_json(main.question_rows(query, selected, fast=fast), fast=fast) for fast in (False, True)}
+
+def test_fast_path_renders_the_same_json():
+    client.get("/clear-questions")
+    client.post("/questions/bulk", json=[question(1), question(2, explanation="Because\nπ ≈ 3.14", topic=None),
+                                          question(3, options=None, year=None, source_url="https://example.com/q/3")])
+
+    print("\n--- Test 1: column tuples + fast encoder give byte-identical output ---")
+    db = SessionLocal()
+    try:
+        query = db.query(Question).order_by(Question.id)
+        for selected in (None, ["id", "body", "options"]):
+            rendered = bodies(query, selected)
+            assert rendered[True] == rendered[False], rendered
+
+        print("--- Test 2: the stdlib fallback matches too ---")
+        encoder, main.orjson = main.orjson, None
+        try:
+            rendered = bodies(query)
+            assert rendered[True] == rendered[False]
+        finally:
+            main.orjson = encoder
+    finally:
+        db.close()
+
+    print("--- Test 3: non-string keys (the /filters counts) encode as JSON strings ---")
+    assert main.render_json({2018: 3}, fast=True) == main.render_json({2018: 3}, fast=False) == b'{"2018":3}'
+    client.get("/clear-questions")
+
+if __name__ == "__main__":
+    test_fast_path_renders_the_same_json()
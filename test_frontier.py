@@ -0,0 +1,95 @@
+import asyncio
+import os
+import tempfile
+import httpx
+from scrapers.crawl_engine import AsyncFetcher, configure_host
+from scrapers.frontier import Frontier
+from scrapers.myschool_scraper import MySchoolScraper
+from test_crawl_engine import LISTING, DETAIL
+
+def flaky_site(fail_ids):
+    """Fake myschool.ng whose detail pages in `fail_ids` answer 503."""
+    state = {"paths": []}
+
+    async def handler(request):
+        path = request.url.path
+        state["paths"].append(path)
+        if path.startswith("/classroom/questions/"):
+            qid = path.rsplit("/", 1)[-1]
+            if qid in fail_ids:
+                return httpx.Response(503, text="<html>busy</html>")
+            return httpx.Response(200, text=DETAIL.format(qid=qid))
+        if request.url.params.get("exam_year") == "2020" and request.url.params.get("page") == "1":
+            return httpx.Response(200, text=LISTING.format(n=7))
+        return httpx.Response(200, text="<html></html>")
+
+    return httpx.MockTransport(handler), state
+
+def scrape(scraper, transport):
+    async def run():
+        async with AsyncFetcher(transport=transport) as fetcher:
+            return await scraper.scrape_questions_async(
+                "https://myschool.ng/classroom/chemistry", limit=10, min_year=2020, max_year=2020,
+                exam_type="waec", question_type="objective", fetcher=fetcher
+            )
+    return asyncio.run(run())
+
+def test_backoff_schedule():
+    frontier = Frontier(os.path.join(tempfile.mkdtemp(), "frontier.sqlite"), base_delay=10, max_attempts=3)
+    url = "https://myschool.ng/classroom/questions/1"
+    assert frontier.discover([url, url], "detail", "chemistry/waec/2020/objective") == 1
+
+    print("\n--- Test 1: failures back off exponentially, then give up ---")
+    first = frontier.retry_later(url, 503)
+    assert first.state == "pending" and not first.due and first.last_status == 503
+    second = frontier.retry_later(url, 503)
+    assert second.next_attempt_at - second.updated_at == 20
+    assert frontier.retry_later(url, 403).state == "failed"
+    assert frontier.due() == []
+
+    print("--- Test 2: results survive reopening the file ---")
+    frontier.complete("https://myschool.ng/classroom/questions/2", {"body": "Q"}, partition="chemistry/waec/2020/objective")
+    frontier.close()
+    reopened = Frontier(frontier.path)
+    assert reopened.get("https://myschool.ng/classroom/questions/2").result == {"body": "Q"}
+    assert reopened.stats("chemistry/waec/2020/objective") == {"done": 1, "failed": 1}
+
+def test_scrape_resumes_from_frontier():
+    frontier = Frontier(os.path.join(tempfile.mkdtemp(), "frontier.sqlite"), base_delay=0)
+    scraper = MySchoolScraper(rate=200, max_in_flight=2, cache=False, frontier=frontier)
+
+    print("--- Test 3: a failing page is queued for retry ---")
+    transport, state = flaky_site({"73"})
+    first = scrape(scraper, transport)
+    assert len(first) == 2
+    assert frontier.due(kind="detail") == ["https://myschool.ng/classroom/questions/73"]
+
+    print("--- Test 4: the next run only fetches what is still missing ---")
+    transport, state = flaky_site(set())
+    second = scrape(scraper, transport)
+    print(f"Second run requested {state['paths']}")
+    assert len(second) == 3
+    assert [p for p in state["paths"] if p.startswith("/classroom/questions/")] == ["/classroom/questions/73"]
+    assert frontier.stats("chemistry/waec/2020/objective")["done"] == 4  # listing + 3 details
+    configure_host("myschool.ng", rate=1.0, max_in_flight=4)
+
+def test_due_retries_are_drained():
+    frontier = Frontier(os.path.join(tempfile.mkdtemp(), "frontier.sqlite"), base_delay=0)
+    scraper = MySchoolScraper(rate=200, max_in_flight=2, cache=False, frontier=frontier)
+    # Failed in an earlier run; the listing no longer shows it
+    gone = "https://myschool.ng/classroom/questions/99"
+    frontier.retry_later(gone, 503, partition="chemistry/waec/2020/objective")
+    frontier.retry_later("https://myschool.ng/classroom/questions/98", 503, partition="physics/waec/2020/objective")
+
+    print("--- Test 5: backed-off pages of the partition are retried after its listing pass ---")
+    transport, state = flaky_site(set())
+    questions = scrape(scraper, transport)
+    assert gone in {q["source_url"] for q in questions} and len(questions) == 4
+    assert "/classroom/questions/98" not in state["paths"]
+    assert frontier.due(kind="detail") == ["https://myschool.ng/classroom/questions/98"]
+    configure_host("myschool.ng", rate=1.0, max_in_flight=4)
+
+if __name__ == "__main__":
+    test_backoff_schedule()
+    test_scrape_resumes_from_frontier()
+    test_due_retries_are_drained()
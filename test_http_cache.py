@@ -0,0 +1,76 @@
+import asyncio
+import tempfile
+import httpx
+from scrapers.http_cache import HTTPCache
+from scrapers.crawl_engine import AsyncFetcher, configure_host
+from scrapers.myschool_scraper import MySchoolScraper
+
+DETAIL_URL = "https://myschool.ng/classroom/questions/42"
+PAGE = "<html><body><div class='question-desc'>Cached body</div></body></html>"
+
+def test_cache_revalidates_with_etag():
+    cache = HTTPCache(tempfile.mkdtemp(), ttl={"detail": 0})
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=PAGE, headers={"ETag": '"v1"'})
+
+    configure_host("myschool.ng", rate=200)
+    scraper = MySchoolScraper(cache=cache)
+
+    async def run():
+        async with AsyncFetcher(transport=httpx.MockTransport(handler)) as fetcher:
+            first = await scraper.fetch_soup(DETAIL_URL, fetcher)
+            second = await scraper.fetch_soup(DETAIL_URL, fetcher)
+            return first, second
+
+    first, second = asyncio.run(run())
+    print(f"\nRequests sent with If-None-Match: {seen}")
+    assert seen == [None, '"v1"']
+    assert second.find("div", class_="question-desc").text == "Cached body"
+    assert first.text == second.text
+
+    print("--- Offline mode serves stale pages without a fetcher ---")
+    offline = MySchoolScraper(cache=cache, offline=True)
+    assert offline.get_soup(DETAIL_URL).find("div").text == "Cached body"
+    assert offline.get_soup("https://myschool.ng/classroom/questions/404") is None
+    configure_host("myschool.ng", rate=1.0)
+
+def test_cache_is_content_addressed_and_bounded():
+    cache = HTTPCache(tempfile.mkdtemp(), max_bytes=3000)
+    cache.store("https://myschool.ng/classroom/questions/1", PAGE)
+    cache.store("https://myschool.ng/classroom/questions/2", PAGE)
+    assert cache.stats()["entries"] == {"detail": 2}
+    single = cache.stats()["bytes"]
+
+    import os
+    for i in range(50):
+        cache.store(f"https://myschool.ng/classroom/biology?page={i}", PAGE + os.urandom(200).hex())
+    stats = cache.stats()
+    print(f"\nAfter filling: {stats} (one shared object was {single} bytes)")
+    assert stats["bytes"] <= 3000
+    assert cache.lookup("https://myschool.ng/classroom/biology?page=49") is not None
+    assert cache.lookup("https://myschool.ng/classroom/questions/1") is None
+
+def test_hits_only_touch_recency_now_and_then():
+    print("--- Cache hits write to the index at most once per touch_interval ---")
+    cache = HTTPCache(tempfile.mkdtemp())
+    cache.store(DETAIL_URL, PAGE)
+    writes = cache.db.total_changes
+    for _ in range(5):
+        assert cache.lookup(DETAIL_URL) is not None
+    assert cache.db.total_changes == writes
+
+    cache.touch_interval = -1
+    before = cache.db.execute("SELECT accessed_at FROM entries").fetchone()[0]
+    cache.lookup(DETAIL_URL)
+    assert cache.db.total_changes == writes + 1
+    assert cache.db.execute("SELECT accessed_at FROM entries").fetchone()[0] >= before
+
+if __name__ == "__main__":
+    test_cache_revalidates_with_etag()
+    test_cache_is_content_addressed_and_bounded()
+    test_hits_only_touch_recency_now_and_then()
@@ -0,0 +1,111 @@
+import os
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine, SessionLocal, Job, WorkerHeartbeat
+from backend import jobs
+from backend.worker import work
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+ALOC_DATA = {"data": [
+    {"question": f"Queued ALOC question {i}", "option": {"a": "1", "b": "2", "c": "3", "d": "4"},
+     "answer": "b", "solution": None, "examyear": "2014", "examtype": "utme"}
+    for i in range(5)
+]}
+
+def clear_jobs():
+    db = SessionLocal()
+    db.query(Job).delete()
+    db.commit()
+    db.close()
+
+def test_aloc_job_runs_in_worker():
+    client.get("/clear-questions")
+    clear_jobs()
+
+    print("\n--- Test 1: the endpoint only queues the job ---")
+    with patch.dict(os.environ, {"ALOC_TOKEN": "test-token"}):
+        resp = client.get("/fetch-aloc?subject=Commerce&count=5")
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+    assert client.get(resp.json()["status_url"]).json()["status"] == "queued"
+    assert client.get("/questions?subject=commerce").json() == []
+
+    print("--- Test 2: the worker fetches, ingests and records throughput ---")
+    with patch("backend.aloc_client.ALOCClient.get_multiple_questions", return_value=ALOC_DATA):
+        assert work(worker="test-worker", once=True) == 1
+    job = client.get(f"/jobs/{job_id}").json()
+    print(job["result"])
+    assert job["status"] == "done" and job["worker"] == "test-worker" and job["attempts"] == 1
+    assert job["result"]["added"] == 5 and job["result"]["fetched"] == 5 and "seconds" in job["result"]
+    assert len(client.get("/questions?subject=commerce").json()) == 5
+
+    stats = client.get("/jobs?kind=aloc").json()["stats"]["aloc"]
+    assert stats["statuses"] == {"done": 1} and stats["added"] == 5
+
+def test_blocked_scrape_fails_with_message():
+    clear_jobs()
+    print("--- Test 3: a blocked MySchool scrape fails the job, not the request ---")
+    resp = client.post("/scrape/myschool?subject=Chemistry&exam_type=waec&year=2020")
+    assert resp.status_code == 202
+    with patch("backend.jobs.MySchoolScraper") as scraper_class:
+        scraper = scraper_class.return_value
+        scraper.base_url = "https://myschool.ng"
+        scraper.scrape_questions.return_value = []
+        scraper.block_stats.return_value = {"blocked": 3, "requests": 3}
+        work(worker="test-worker", once=True)
+    job = client.get(resp.json()["status_url"]).json()
+    assert job["status"] == "failed" and "blocking" in job["error"]
+    assert scraper.scrape_questions.call_args.kwargs["min_year"] == 2020
+
+def test_claims_and_stale_jobs():
+    clear_jobs()
+    print("--- Test 4: a job is claimed once and requeued if its worker dies ---")
+    db = SessionLocal()
+    try:
+        job = jobs.enqueue(db, "aloc", {"subject": "commerce"})
+        assert jobs.claim(db, "a").id == job.id
+        assert jobs.claim(db, "b") is None
+
+        assert jobs.requeue_stale(db, stale_after=-1) == 1
+        db.refresh(job)
+        assert job.status == jobs.QUEUED
+        for _ in range(jobs.MAX_ATTEMPTS - 1):
+            jobs.claim(db, "a")
+            jobs.requeue_stale(db, stale_after=-1)
+        db.refresh(job)
+        assert job.status == jobs.FAILED and job.attempts == jobs.MAX_ATTEMPTS
+    finally:
+        db.close()
+    assert client.get("/jobs/999999").status_code == 404
+
+def test_queueing_without_a_worker_warns():
+    clear_jobs()
+    db = SessionLocal()
+    db.query(WorkerHeartbeat).delete()
+    db.commit()
+    db.close()
+
+    print("--- Test 5: queueing with no worker running warns that the job will wait ---")
+    resp = client.post("/scrape/myschool?subject=Chemistry&exam_type=waec&year=2020")
+    assert resp.status_code == 202 and "backend.worker" in resp.json()["warning"]
+    assert client.get("/jobs").json()["worker_seen_at"] is None
+
+    with patch("backend.jobs.MySchoolScraper") as scraper_class:
+        scraper_class.return_value.scrape_questions.return_value = []
+        scraper_class.return_value.block_stats.return_value = {}
+        work(worker="test-worker", once=True)
+    resp = client.post("/scrape/myschool?subject=Chemistry&exam_type=waec&year=2020")
+    assert resp.status_code == 202 and "warning" not in resp.json()
+    assert client.get("/jobs").json()["worker_seen_at"]
+    clear_jobs()
+
+if __name__ == "__main__":
+    test_aloc_job_runs_in_worker()
+    test_blocked_scrape_fails_with_message()
+    test_claims_and_stale_jobs()
+    test_queueing_without_a_worker_warns()
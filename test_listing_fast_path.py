@@ -0,0 +1,90 @@
+import asyncio
+import httpx
+from scrapers.crawl_engine import AsyncFetcher, configure_host
+from scrapers.myschool_scraper import MySchoolScraper
+
+ITEM = """<div class="question-item">
+<div class="question-desc"><p>Listed question {n}: what is CO2?</p></div>
+<ul class="list-unstyled">
+<li><strong>A.</strong> Water</li><li><strong>B.</strong> Carbon dioxide</li>
+<li><strong>C.</strong> Salt</li><li><strong>D.</strong> Sand</li>
+</ul>
+{extra}
+<a href="/classroom/questions/{n}">View Answer &amp; Discuss</a>
+</div>"""
+
+COMPLETE = """<h5>Correct Answer: Option B</h5>
+<h5>Explanation</h5><div class="explanation"><p>CO2 is carbon dioxide.</p></div>"""
+
+# The Explanation header is empty: the text after it belongs to the next item
+HEADER_ONLY = """<h5>Correct Answer: Option B</h5><h5>Explanation</h5>"""
+
+LISTING = "<html><body>" + "".join([
+    ITEM.format(n=4, extra=HEADER_ONLY),
+    ITEM.format(n=1, extra=COMPLETE),
+    ITEM.format(n=2, extra=COMPLETE),
+    ITEM.format(n=3, extra=""),
+]) + "</body></html>"
+
+DETAIL = """<html><body>
+<div class="question-desc"><p>Detail question {qid}: what is CO2?</p></div>
+<ul class="list-unstyled">
+<li><strong>A.</strong> Water</li><li><strong>B.</strong> Carbon dioxide</li>
+</ul>
+<h5>Correct Answer: Option B</h5>
+<h5>Explanation</h5><div><p>From the detail page.</p></div>
+<a href="/classroom/chemistry?exam_type=waec&exam_year=2020">WAEC 2020</a>
+</body></html>"""
+
+def scrape(**options):
+    paths = []
+
+    async def handler(request):
+        paths.append(request.url.path)
+        if request.url.path.startswith("/classroom/questions/"):
+            return httpx.Response(200, text=DETAIL.format(qid=request.url.path.rsplit("/", 1)[-1]))
+        if request.url.params.get("page") == "1":
+            return httpx.Response(200, text=LISTING)
+        return httpx.Response(200, text="<html></html>")
+
+    scraper = MySchoolScraper(rate=200, cache=False, **options)
+
+    async def run():
+        async with AsyncFetcher(transport=httpx.MockTransport(handler)) as fetcher:
+            return await scraper.scrape_questions_async(
+                "https://myschool.ng/classroom/chemistry", limit=10, min_year=2020, max_year=2020,
+                exam_type="waec", question_type="objective", fetcher=fetcher
+            )
+
+    questions = asyncio.run(run())
+    configure_host("myschool.ng", rate=1.0, max_in_flight=4)
+    return questions, [p for p in paths if p.startswith("/classroom/questions/")], scraper.block_stats()
+
+def test_complete_listing_entries_skip_detail_fetch():
+    print("\n--- Test 1: only entries without an answer or explanation cost a detail fetch ---")
+    questions, detail_paths, stats = scrape()
+    print(f"detail fetches={detail_paths}, stats={stats}")
+    assert sorted(detail_paths) == ["/classroom/questions/3", "/classroom/questions/4"]
+    assert stats["listing_items"] == 4 and stats["detail_saved"] == 2
+    assert len(questions) == 4
+    by_url = {q["source_url"].rsplit("/", 1)[-1]: q for q in questions}
+    # Not the next item's "CO2 is carbon dioxide."
+    assert "From the detail page." in by_url["4"]["explanation"]
+
+    listed = by_url["1"]
+    assert listed["body"] == "<p>Listed question 1: what is CO<sub>2</sub>?</p>"
+    assert listed["options"][:4] == ["Water", "Carbon dioxide", "Salt", "Sand"]
+    assert listed["answer"] == "B" and "carbon dioxide" in listed["explanation"]
+    assert listed["exam_type"] == "waec" and listed["year"] == 2020
+    assert listed["source_url"] == "https://myschool.ng/classroom/questions/1"
+    assert "Detail question 3" in by_url["3"]["body"]
+
+def test_fast_path_can_be_disabled():
+    print("--- Test 2: without the fast path every question is fetched ---")
+    questions, detail_paths, stats = scrape(listing_fast_path=False)
+    assert len(detail_paths) == 4 and stats["detail_saved"] == 0
+    assert all("Detail question" in q["body"] for q in questions)
+
+if __name__ == "__main__":
+    test_complete_listing_entries_skip_detail_fetch()
+    test_fast_path_can_be_disabled()
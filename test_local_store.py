@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+from scrapers.local_store import LocalStore, EMPTY, BLOCKED
+
+def question(n, **extra):
+    return dict({"body": f"Stored question {n}", "options": ["A", "B"], "answer": "A",
+                 "source_url": f"https://myschool.ng/classroom/questions/{n}"}, **extra)
+
+def test_partitions_and_dedup():
+    store = LocalStore(os.path.join(tempfile.mkdtemp(), "questions.sqlite"))
+
+    print("\n--- Test 1: partitions record their questions and status ---")
+    assert store.save_partition("Chemistry", "WAEC", 2020, "objective", [question(1), question(2)]) == 2
+    assert store.save_partition("Chemistry", "waec", 2020, "objective", [question(2), question(3)]) == 1
+    assert store.save_partition("Chemistry", "waec", 2019, "objective", []) == 0
+    store.save_partition("Chemistry", "waec", 2018, "objective", [], status=BLOCKED)
+
+    assert [q["body"] for q in store.load_partition("chemistry", "waec", 2020, "objective")] == [
+        "Stored question 1", "Stored question 2", "Stored question 3"
+    ]
+    assert store.partition("Chemistry", "waec", 2020, "objective").question_count == 3
+    assert store.load_partition("Chemistry", "waec", 2019, "objective") == []
+    assert store.load_partition("Chemistry", "waec", 2018, "objective") is None  # blocked: scrape again
+    assert store.load_partition("Chemistry", "waec", 2017, "objective") is None
+
+    print("--- Test 2: empty partitions are found by index, not by opening files ---")
+    assert [p.key for p in store.partitions(status=EMPTY)] == ["chemistry/waec/2019/objective"]
+    assert store.clear_partitions(EMPTY) == 1
+    assert store.stats() == {"questions": 3, "partitions": {"ok": 1, "blocked": 1}}
+
+def test_import_legacy_json_tree():
+    print("--- Test 3: the legacy data/ tree imports once ---")
+    root = tempfile.mkdtemp()
+    for subject, year, qs in [("english_language", "2015", [question(10), question(11)]), ("physics", "2016", [])]:
+        path = os.path.join(root, subject, "jamb", year, "objective")
+        os.makedirs(path)
+        with open(os.path.join(path, "questions.json"), "w", encoding="utf-8") as f:
+            json.dump(qs, f)
+
+    store = LocalStore(os.path.join(root, "questions.sqlite"))
+    report = store.import_json_tree_once(root)
+    assert report == {"files": 2, "questions": 2, "added": 2, "errors": 0}
+    assert store.import_json_tree_once(root) is None
+    english = store.load_partition("English Language", "jamb", 2015, "objective")
+    assert len(english) == 2 and english[0]["subject"] == "english language" and english[0]["year"] == 2015
+    assert store.load_partition("physics", "jamb", 2016, "objective") == []
+    assert len(list(store.iter_questions())) == 2
+
+if __name__ == "__main__":
+    test_partitions_and_dedup()
+    test_import_legacy_json_tree()
@@ -0,0 +1,74 @@
+import gzip
+import json
+from fastapi.testclient import TestClient
+from backend import main
+from backend.main import app
+from backend.models import Base, engine
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def ndjson(rows):
+    return "".join(json.dumps(r) + "\n" for r in rows).encode("utf-8")
+
+def test_streaming_upload():
+    client.get("/clear-questions")
+    rows = [
+        {"body": f"Stream Q{i}", "answer": "A", "subject": "Economics", "year": 2015, "exam_type": "waec",
+         "options": ["x", "y"], "explanation": None, "source_url": f"stream-{i}"}
+        for i in range(1200)
+    ]
+    body = ndjson(rows[:700]) + b'{"body": "missing required fields"}\nnot json\n\n' + ndjson(rows[500:])
+
+    print("\n--- Test 1: gzip NDJSON in batches of 500 ---")
+    resp = client.post(
+        "/questions/bulk/ndjson?batch_size=500",
+        content=gzip.compress(body),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/x-ndjson"}
+    )
+    data = resp.json()
+    print(data["totals"], [b["accepted"] for b in data["batches"]])
+    assert resp.status_code == 200
+    assert data["totals"] == {"accepted": 1200, "duplicates": 200, "rejected": 2}
+    assert len(data["batches"]) == 3
+    assert [e["line"] for e in data["errors"]] == [701, 702]
+
+    print("--- Test 2: plain NDJSON re-upload is all duplicates ---")
+    resp = client.post("/questions/bulk/ndjson", content=ndjson(rows[:10]))
+    assert resp.json()["totals"] == {"accepted": 0, "duplicates": 10, "rejected": 0}
+
+    print("--- Test 3: corrupt gzip is rejected ---")
+    resp = client.post("/questions/bulk/ndjson", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+    assert resp.status_code == 400
+
+def test_upload_limits():
+    client.get("/clear-questions")
+    gzipped = {"Content-Encoding": "gzip"}
+
+    print("--- Test 4: an over-long line is refused, even with its newline in the same chunk ---")
+    resp = client.post("/questions/bulk/ndjson", content=gzip.compress(b"x" * (main.MAX_NDJSON_LINE + 1) + b"\n"),
+                       headers=gzipped)
+    assert resp.status_code == 413
+
+    print("--- Test 5: a gzip bomb stops at the decompressed size limit ---")
+    bomb = gzip.compress(b"\n" * (64 * 1024 * 1024))
+    assert len(bomb) < 100 * 1024
+    limit, main.MAX_NDJSON_BYTES = main.MAX_NDJSON_BYTES, 10 * 1024 * 1024
+    try:
+        resp = client.post("/questions/bulk/ndjson", content=bomb, headers=gzipped)
+        assert resp.status_code == 413 and "body" in resp.json()["detail"]
+        # Within the limit it goes through
+        resp = client.post("/questions/bulk/ndjson", content=gzip.compress(ndjson([
+            {"body": "Small gzip Q", "answer": "A", "subject": "Economics", "year": 2015, "exam_type": "waec",
+             "options": None, "explanation": None}
+        ])), headers=gzipped)
+        assert resp.status_code == 200 and resp.json()["totals"]["accepted"] == 1
+    finally:
+        main.MAX_NDJSON_BYTES = limit
+    client.get("/clear-questions")
+
+if __name__ == "__main__":
+    test_streaming_upload()
+    test_upload_limits()
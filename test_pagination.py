@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import SessionLocal, Question, engine, Base
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def seed(count=7):
+    db = SessionLocal()
+    db.query(Question).delete()
+    for i in range(count):
+        db.add(Question(
+            body=f"Paged Q{i}",
+            subject="physics",
+            year=2020,
+            exam_type="waec",
+            question_type="objective",
+            answer="A",
+            explanation=f"Long explanation {i}"
+        ))
+    db.commit()
+    db.close()
+
+def test_keyset_pagination():
+    seed(7)
+
+    print("\n--- Test 1: First page carries total and cursor ---")
+    resp = client.get("/questions?subject=physics&limit=3")
+    assert resp.status_code == 200
+    first = resp.json()
+    assert len(first) == 3
+    assert resp.headers["X-Total-Count"] == "7"
+    cursor = resp.headers["X-Next-Cursor"]
+    assert cursor == str(first[-1]["id"])
+
+    print("--- Test 2: Walk remaining pages with after= ---")
+    seen = [q["id"] for q in first]
+    while cursor:
+        resp = client.get(f"/questions?subject=physics&limit=3&after={cursor}")
+        assert "X-Total-Count" not in resp.headers
+        page = resp.json()
+        seen.extend(q["id"] for q in page)
+        cursor = resp.headers.get("X-Next-Cursor")
+    assert len(seen) == 7
+    assert seen == sorted(seen)
+
+def test_field_projection():
+    seed(2)
+
+    print("\n--- Test 3: fields= skips explanation ---")
+    resp = client.get("/questions?subject=physics&fields=body,year")
+    assert resp.status_code == 200
+    for q in resp.json():
+        assert set(q.keys()) == {"id", "body", "year"}
+
+    print("--- Test 4: unknown fields are rejected ---")
+    resp = client.get("/questions?fields=body,password")
+    assert resp.status_code == 400
+
+if __name__ == "__main__":
+    test_keyset_pagination()
+    test_field_projection()
@@ -0,0 +1,78 @@
+from scrapers.myschool_scraper import MySchoolScraper, make_soup
+
+DETAIL_URL = "https://myschool.ng/classroom/questions/42"
+DETAIL = """<!DOCTYPE html><html><head><title>Q</title><script>var big = "{ lots of js }";</script>
+<style>.x { color: red }</style></head><body>
+<div class="container"><nav class="navbar"><ul class="nav"><li><a href="/classroom">Classroom</a></li></ul></nav>
+<div class="sidebar"><a href="/ads/1">Advert</a><p class="promo">Buy now</p></div>
+<h3 class="page-title">Which element has the symbol B?</h3>
+<div class="question-desc"><p>Which element has the symbol B&nbsp;in H2SO4?</p>
+<a href="/classroom/questions/42?explanation_video=1">Watch video</a></div>
+<ul class="list-unstyled">
+<li><strong>A.</strong> Boron <img src="/img/b.png"></li>
+<li><strong>B.</strong> Barium</li>
+<li><strong>C.</strong> Bromine</li>
+<li><strong>D.</strong> Bismuth</li>
+</ul>
+<h5>Correct Answer: Option A</h5>
+<h5>Explanation</h5><div class="explanation"><p>Boron is B, Na2CO3 is soda.</p></div>
+<a href="/classroom/topic/periodic-table">Periodic Table</a>
+<a href="/classroom/chemistry?exam_type=waec&exam_year=2015">WAEC 2015</a>
+</div><script>trackPage();</script></body></html>"""
+
+LISTING = """<html><head><script>x()</script></head><body><div>
+<p>Q1 teaser</p><a href="/classroom/questions/1">View Answer &amp; Discuss</a>
+<p>Q2 teaser</p><a href="/classroom/questions/2">View Answer &amp; Discuss</a>
+<a href="?page=2">Next</a></div></body></html>"""
+
+# Answer and explanation in generic Bootstrap containers DETAIL_STRAINER doesn't recognise
+GENERIC = """<html><body><div class="row"><div class="col-md-8">
+<div class="question-desc"><p>Which element has the symbol B?</p></div>
+<ul class="list-unstyled"><li><strong>A.</strong> Boron</li><li><strong>B.</strong> Barium</li></ul>
+<div class="mb-4"><span class="text-success">Correct Answer: Option A</span></div>
+<h5>Explanation</h5><div class="mb-4">Boron is B.</div>
+</div><div class="col-md-4"><div>Related: other stuff</div></div></div></body></html>"""
+
+def parse(parser, strain=False, html=DETAIL):
+    scraper = MySchoolScraper(cache=False, parser=parser, strain_details=strain)
+    return scraper.parse_detail_page(scraper.make_soup(DETAIL_URL, html), DETAIL_URL)
+
+def test_backends_agree():
+    print("\n--- Test 1: html.parser, lxml and strained lxml parse the same question ---")
+    reference = parse("html.parser")
+    assert reference["options"][:4] == [
+        'Boron <img src="https://myschool.ng/img/b.png" style="max-width: 100%; height: auto; display: block; margin: 10px 0;"/>',
+        "Barium", "Bromine", "Bismuth"
+    ]
+    assert reference["answer"] == "A" and reference["year"] == 2015 and reference["exam_type"] == "waec"
+    assert reference["topic"] == "Periodic Table"
+    assert "H2SO<sub>4</sub>" in reference["body"] and "video" not in reference["body"]
+    assert "Na2CO<sub>3</sub>" in reference["explanation"]
+    assert parse("lxml") == reference
+    assert parse("lxml", strain=True) == reference
+
+def test_strainers_drop_unread_markup():
+    print("--- Test 2: strainers keep only the regions the scraper reads ---")
+    listing = make_soup(LISTING, "listing", "lxml")
+    assert [a["href"] for a in listing.find_all("a")] == ["/classroom/questions/1", "/classroom/questions/2", "?page=2"]
+    assert not listing.find("script") and not listing.find("p")
+
+    strained = make_soup(DETAIL, "detail", "lxml", strain_details=True)
+    assert not strained.find("script") and not strained.find("title")
+    assert strained.find("div", class_="question-desc") and strained.find("div", class_="explanation")
+    assert not strained.find("div", class_="container") and not strained.find("nav")
+    assert "Advert" not in str(strained) and "Buy now" not in str(strained)
+
+def test_generic_containers_need_the_full_page():
+    print("--- Test 3: the default (unstrained) parse reads answers in generic containers ---")
+    full = parse("lxml", html=GENERIC)
+    assert MySchoolScraper(cache=False).strain_details is False
+    assert full["answer"] == "A" and full["explanation"] == "Boron is B."
+    # Why straining is opt-in: it loses both, which reparse --check-strain reports
+    strained = parse("lxml", strain=True, html=GENERIC)
+    assert strained["answer"] != "A" and strained["explanation"] != "Boron is B."
+
+if __name__ == "__main__":
+    test_backends_agree()
+    test_strainers_drop_unread_markup()
+    test_generic_containers_need_the_full_page()
@@ -0,0 +1,72 @@
+import os
+import json
+import tempfile
+from scrapers.http_cache import HTTPCache
+from scrapers.frontier import Frontier
+from scrapers.local_store import LocalStore
+from scrapers.reparse import pages_from_cache, reparse
+
+DETAIL = """<html><body>
+<div class="question-desc"><p>What is CO2 number {n}?</p></div>
+<ul class="list-unstyled">
+<li><strong>A.</strong> Water</li><li><strong>B.</strong> Salt</li>
+</ul>
+<h5>Correct Answer: Option A</h5>
+<a href="/classroom/chemistry?exam_type=jamb&exam_year=2019">JAMB 2019</a>
+</body></html>"""
+
+# No exam link: subject, exam type and year only known from the crawl
+BARE = """<html><body>
+<div class="question-desc"><p>Bare page {n}</p></div>
+<ul class="list-unstyled"><li><strong>A.</strong> Yes</li><li><strong>B.</strong> No</li></ul>
+</body></html>"""
+
+def test_reparse_from_cache():
+    root = tempfile.mkdtemp()
+    cache = HTTPCache(os.path.join(root, "cache"))
+    frontier = Frontier(os.path.join(root, "frontier.sqlite"))
+    for n in range(20):
+        cache.store(f"https://myschool.ng/classroom/questions/{n}", DETAIL.format(n=n))
+    cache.store("https://myschool.ng/classroom/questions/broken", "<html><body>nothing here</body></html>")
+    cache.store("https://myschool.ng/classroom/chemistry?page=1", "<html>listing pages are skipped</html>")
+    cache.store("https://myschool.ng/classroom/questions/bare-1", BARE.format(n=1))
+    frontier.discover(["https://myschool.ng/classroom/questions/bare-1"], "detail", "physics/waec/2018/objective")
+    cache.store("https://myschool.ng/classroom/questions/bare-2", BARE.format(n=2))
+    tasks = list(pages_from_cache(cache, frontier))
+
+    store = LocalStore(os.path.join(root, "questions.sqlite"))
+    timings_path = os.path.join(root, "timings.jsonl")
+    report = reparse(tasks, store, workers=2, chunksize=4, progress_every=0, batch_size=8, timings_path=timings_path)
+    print(f"\n{ {k: v for k, v in report.items() if k not in ('slowest', 'failures')} }")
+
+    assert report["pages"] == 23 and report["parsed"] == 21 and report["stored"] == 21 and report["failed"] == 2
+    errors = {f["url"].rsplit("/", 1)[-1]: f["error"] for f in report["failures"]}
+    assert errors == {"broken": "no question body found", "bare-2": "no subject, year found"}
+    assert len(report["slowest"]) == 10
+
+    print("--- Every page's timing is written to the timings file ---")
+    with open(timings_path) as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(t["url"] for t in lines) == sorted(url for url, _, _ in tasks)
+    assert all(t["ms"] >= 0 for t in lines)
+    assert {t["url"].rsplit("/", 1)[-1]: t["error"] for t in lines if t["error"]} == errors
+
+    rows = list(store.iter_questions("chemistry", "jamb", 2019, "objective"))
+    assert len(rows) == 20 and rows[0]["answer"] == "A"
+    assert "CO<sub>2</sub>" in rows[0]["body"]
+    assert [q["body"] for q in store.iter_questions("physics", "waec", 2018)] == ["<p>Bare page 1</p>"]
+    assert store.partition("chemistry", "jamb", 2019, "objective").question_count == 20
+
+    print("--- A second run (a parser fix) replaces the stored parse of each page, checking the strainer ---")
+    cache.store("https://myschool.ng/classroom/questions/0", DETAIL.format(n="zero"))
+    report = reparse(list(pages_from_cache(cache, frontier)), store, workers=2, progress_every=0,
+                     strain_details=True, check_strain=True)
+    bodies = [q["body"] for q in store.iter_questions("chemistry")]
+    assert report["stored"] == 21 and len(bodies) == 20
+    assert any("zero" in b for b in bodies) and not any("number 0?" in b for b in bodies)
+    # check_strain: the strained and the full parse of every page agree
+    assert report["failed"] == 2 and not any("strained" in f["error"] for f in report["failures"])
+    store.close()
+
+if __name__ == "__main__":
+    test_reparse_from_cache()
@@ -0,0 +1,147 @@
+import time
+from fastapi.testclient import TestClient
+from backend import main
+from backend.main import app
+from backend.models import Base, engine, SessionLocal, Question
+from backend.cache import STATIC, ResponseCache, response_cache
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def question(n, **extra):
+    return dict({"body": f"Cached Q{n}", "answer": "A", "options": ["x", "y"], "explanation": None,
+                 "subject": "Commerce", "year": 2016, "exam_type": "jamb"}, **extra)
+
+def test_lru_ttl_and_generations():
+    print("\n--- Test 1: LRU eviction, TTL expiry and generation bumps ---")
+    cache = ResponseCache(maxsize=2, ttl=60)
+    a, b, c = (cache.key("questions", {"subject": s}) for s in ("a", "b", "c"))
+    assert cache.key("questions", {"subject": " Chemistry ", "year": None}) == cache.key("questions", {"subject": "chemistry"})
+    for key in (a, b):
+        cache.set(key, key, cache.generation)
+    cache.get(a)
+    cache.set(c, c, cache.generation)
+    assert cache.get(b) is None and cache.get(a) == a and cache.evictions == 1
+
+    stale = cache.generation
+    cache.bump()
+    assert cache.get(a) is None
+    cache.set(a, "computed before the write", stale)
+    assert cache.get(a) is None
+
+    cache.set(a, a, cache.generation, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get(a) is None
+    print(cache.stats())
+
+def test_read_endpoints_are_cached_until_a_write():
+    client.get("/clear-questions")
+    client.post("/questions/bulk", json=[question(1), question(2)])
+
+    print("--- Test 2: repeat reads are hits, with the same body and headers ---")
+    first = client.get("/questions?subject=commerce&limit=1")
+    again = client.get("/questions?subject=Commerce%20&limit=1")
+    assert first.headers["X-Cache"] == "MISS" and again.headers["X-Cache"] == "HIT"
+    assert again.json() == first.json() and again.headers["X-Total-Count"] == "2" and again.headers["X-Next-Cursor"]
+    client.get("/filters?subject=commerce")
+    assert client.get("/filters?subject=commerce").headers["X-Cache"] == "HIT"
+
+    print("--- Test 3: writes invalidate, duplicate-only uploads don't ---")
+    hits = response_cache.stats()["hits"]
+    client.post("/questions/bulk", json=[question(1)])
+    assert client.get("/questions?subject=commerce&limit=1").headers["X-Cache"] == "HIT"
+    client.post("/questions/bulk", json=[question(3)])
+    resp = client.get("/questions?subject=commerce&limit=1")
+    assert resp.headers["X-Cache"] == "MISS" and resp.headers["X-Total-Count"] == "3"
+    assert client.get("/filters?subject=commerce").json()["counts"]["years"] == {"2016": 3}
+    client.get("/clear-questions")
+    assert client.get("/questions?subject=commerce").json() == []
+    assert client.get("/cache/stats").json()["hits"] > hits
+
+def test_any_committed_write_invalidates():
+    client.get("/clear-questions")
+    client.post("/questions/bulk", json=[question(1)])
+    client.get("/questions?subject=commerce")
+    assert client.get("/questions?subject=commerce").headers["X-Cache"] == "HIT"
+
+    print("--- Test 6: writes outside the endpoints invalidate on commit, rollbacks don't ---")
+    db = SessionLocal()
+    try:
+        db.add(Question(body="Cached Q direct", answer="A", subject="commerce", year=2016, exam_type="jamb"))
+        db.flush()
+        db.rollback()
+        assert client.get("/questions?subject=commerce").headers["X-Cache"] == "HIT"
+        db.add(Question(body="Cached Q direct", answer="A", subject="commerce", year=2016, exam_type="jamb"))
+        db.commit()
+        resp = client.get("/questions?subject=commerce")
+        assert resp.headers["X-Cache"] == "MISS" and len(resp.json()) == 2
+
+        db.query(Question).filter(Question.body == "Cached Q direct").delete(synchronize_session=False)
+        db.commit()
+        resp = client.get("/questions?subject=commerce")
+        assert resp.headers["X-Cache"] == "MISS" and len(resp.json()) == 1
+    finally:
+        db.close()
+    client.get("/clear-questions")
+
+class CountingScraper:
+    calls = 0
+
+    def scrape_subjects(self):
+        CountingScraper.calls += 1
+        return [{"name": "Biology", "url": "https://myschool.ng/classroom/biology"}]
+
+def test_static_entries_survive_writes():
+    print("--- Test 7: entries that don't read questions (the subject scrape) outlive writes ---")
+    cache = ResponseCache(maxsize=4, ttl=60)
+    key = cache.key("myschool-subjects", {})
+    cache.set(key, "subjects", STATIC)
+    cache.bump()
+    assert cache.get(key) == "subjects"
+
+    scraper, main.MySchoolScraper = main.MySchoolScraper, CountingScraper
+    try:
+        response_cache.store.delete(response_cache.key("myschool-subjects", {}))
+        assert client.get("/myschool-subjects").headers["X-Cache"] == "MISS"
+        client.post("/questions/bulk", json=[question(7)])
+        resp = client.get("/myschool-subjects")
+        assert resp.headers["X-Cache"] == "HIT" and CountingScraper.calls == 1
+    finally:
+        main.MySchoolScraper = scraper
+        response_cache.store.delete(response_cache.key("myschool-subjects", {}))
+    client.get("/clear-questions")
+
+def test_conditional_get():
+    client.get("/clear-questions")
+    client.post("/questions/bulk", json=[question(1), question(2)])
+
+    print("--- Test 4: unchanged data answers If-None-Match with a bodiless 304 ---")
+    for path in ("/questions?subject=commerce&limit=1", "/filters?subject=commerce", "/questions/search?q=cached"):
+        first = client.get(path)
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and "no-cache" in first.headers["Cache-Control"]
+        misses = response_cache.stats()["misses"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}'):
+            resp = client.get(path, headers={"If-None-Match": header})
+            assert resp.status_code == 304 and resp.content == b"" and resp.headers["ETag"] == etag
+        # Answered before the cache (and database) lookup
+        assert response_cache.stats()["misses"] == misses
+        assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+    print("--- Test 5: other parameters and writes change the ETag ---")
+    etag = client.get("/questions?subject=commerce&limit=1").headers["ETag"]
+    assert client.get("/questions?subject=Commerce&limit=1").headers["ETag"] == etag
+    assert client.get("/questions?subject=commerce&limit=2").headers["ETag"] != etag
+    client.post("/questions/bulk", json=[question(3)])
+    resp = client.get("/questions?subject=commerce&limit=1", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag and resp.headers["X-Total-Count"] == "3"
+    client.get("/clear-questions")
+
+if __name__ == "__main__":
+    test_lru_ttl_and_generations()
+    test_read_endpoints_are_cached_until_a_write()
+    test_any_committed_write_invalidates()
+    test_static_entries_survive_writes()
+    test_conditional_get()
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import tempfile
+import httpx
+from scrapers.crawl_engine import AsyncFetcher, configure_host
+from scrapers.frontier import Frontier
+from scrapers.myschool_scraper import MySchoolScraper
+from scrapers.local_store import LocalStore
+from scrapers.scheduler import build_matrix, run_schedule_async, load_partition, parse_years
+from test_crawl_engine import LISTING
+
+DETAIL = """<html><body>
+<div class="question-desc"><p>{subject} question {qid}?</p></div>
+<ul class="list-unstyled">
+<li><strong>A.</strong> One</li><li><strong>B.</strong> Two</li>
+</ul>
+<h5>Correct Answer: Option A</h5>
+<a href="/classroom/{subject}?exam_type=waec&exam_year={year}">WAEC {year}</a>
+</body></html>"""
+
+SUBJECTS = [
+    {"name": "Chemistry", "url": "https://myschool.ng/classroom/chemistry"},
+    {"name": "Physics", "url": "https://myschool.ng/classroom/physics"},
+]
+
+def fake_site():
+    """Every subject has one listing page of 3 questions per year."""
+    state = {"in_flight": 0, "peak": 0, "requests": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        path = request.url.path
+        if path.startswith("/classroom/questions/"):
+            qid = path.rsplit("/", 1)[-1]
+            subject = "chemistry" if qid.startswith("c") else "physics"
+            return httpx.Response(200, text=DETAIL.format(subject=subject, qid=qid, year=qid[1:5]))
+        params = request.url.params
+        if params.get("page") == "1" and params.get("type") == "objective":
+            prefix = path.rsplit("/", 1)[-1][0] + params["exam_year"]
+            return httpx.Response(200, text=LISTING.format(n=prefix))
+        return httpx.Response(200, text="<html></html>")
+
+    return httpx.MockTransport(handler), state
+
+def schedule(partitions, **kwargs):
+    root = tempfile.mkdtemp()
+    store = LocalStore(os.path.join(root, "questions.sqlite"))
+    frontier = Frontier(os.path.join(root, "frontier.sqlite"))
+    scraper = MySchoolScraper(rate=500, max_in_flight=3, cache=False, frontier=frontier)
+    transport, state = fake_site()
+
+    async def run():
+        async with AsyncFetcher(transport=transport) as fetcher:
+            return await run_schedule_async(partitions, scraper, store=store, fetcher=fetcher, **kwargs)
+
+    return store, asyncio.run(run()), state
+
+def test_matrix_runs_in_parallel():
+    partitions = build_matrix(SUBJECTS, ["waec"], parse_years("2019-2021"), ["objective"])
+    assert [p.key for p in partitions[:2]] == ["chemistry/waec/2021/objective", "physics/waec/2021/objective"]
+
+    print("\n--- Test 1: all partitions are scraped and stored ---")
+    store, report, state = schedule(partitions, workers=4)
+    print(f"report={report}, peak in flight {state['peak']}")
+    assert report["scraped"] == 6 and report["questions"] == 18 and not report["errors"]
+    stored = load_partition(partitions[0], store)
+    assert len(stored) == 3 and stored[0]["subject"] == "chemistry" and stored[0]["year"] == 2021
+    assert store.partition("Physics", "waec", 2019, "objective").question_count == 3
+    assert store.stats() == {"questions": 18, "partitions": {"ok": 6}}
+
+    print("--- Test 2: workers share the host limiter ---")
+    assert 1 < state["peak"] <= 3
+
+def test_on_partition_can_stop():
+    print("--- Test 3: returning False stops new partitions ---")
+    partitions = build_matrix(SUBJECTS[:1], ["waec"], parse_years("2015-2021"), ["objective"])
+    seen = []
+    store, report, state = schedule(partitions, workers=1, on_partition=lambda p, qs: seen.append(p.year) or len(seen) < 2)
+    assert seen == [2021, 2020]
+    assert report["skipped"] == 5
+    configure_host("myschool.ng", rate=1.0, max_in_flight=4)
+
+if __name__ == "__main__":
+    test_matrix_runs_in_parallel()
+    test_on_partition_can_stop()
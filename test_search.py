@@ -0,0 +1,99 @@
+import os
+import tempfile
+from sqlalchemy import create_engine
+from fastapi.testclient import TestClient
+from backend import search as fts
+from backend.main import app
+from backend.models import Base, engine, SessionLocal, Question
+
+# Setup test DB; the index is created by backend.migrate, not on startup
+Base.metadata.create_all(bind=engine)
+fts.install(engine)
+
+client = TestClient(app)
+
+def question(body, **extra):
+    return dict({"body": body, "answer": "A", "options": ["Osmosis", "Diffusion"], "explanation": None,
+                 "subject": "Biology", "year": 2019, "exam_type": "waec"}, **extra)
+
+def search(query):
+    resp = client.get(f"/questions/search?{query}")
+    assert resp.status_code == 200, resp.text
+    return resp
+
+def test_search_ranks_and_filters():
+    client.get("/clear-questions")
+    client.post("/questions/bulk", json=[
+        question("Photosynthesis takes place in the chloroplast"),
+        question("Which organelle carries out respiration?", explanation="Not photosynthesis: the mitochondrion"),
+        question("Photosynthesis in C4 plants", year=2021),
+        question("Define osmosis", options=["Movement of water", "Photosynthesis"], exam_type="neco"),
+    ] + [question(f"Cell division question {i}") for i in range(30)])
+
+    print("\n--- Test 1: body matches rank above option and explanation matches ---")
+    resp = search("q=photosynthesis")
+    bodies = [q["body"] for q in resp.json()]
+    print(bodies)
+    assert resp.headers["X-Total-Count"] == "4"
+    assert set(bodies[:2]) == {"Photosynthesis takes place in the chloroplast", "Photosynthesis in C4 plants"}
+
+    print("--- Test 2: filters, prefixes and every word must match ---")
+    assert [q["year"] for q in search("q=photo&year=2021").json()] == [2021]
+    assert [q["exam_type"] for q in search("q=photosynthesis&exam_type=neco").json()] == ["neco"]
+    assert search("q=photosynthesis%20chloroplast").headers["X-Total-Count"] == "1"
+    assert search("q=%22(NEAR*%20AND").json() == []
+
+    print("--- Test 3: paging by offset ---")
+    first = search("q=cell%20division&limit=20&fields=body")
+    assert first.headers["X-Total-Count"] == "30" and first.headers["X-Next-Offset"] == "20"
+    rest = search("q=cell%20division&limit=20&offset=20")
+    assert len(rest.json()) == 10 and "X-Next-Offset" not in rest.headers
+    assert not {q["id"] for q in first.json()} & {q["id"] for q in rest.json()}
+
+def test_index_follows_writes():
+    client.get("/clear-questions")
+    print("--- Test 4: ORM updates, inserts and deletes reach the index ---")
+    client.post("/questions/bulk", json=[question("Mitosis produces two identical cells")])
+    db = SessionLocal()
+    try:
+        row = db.query(Question).first()
+        row.body = "Meiosis produces four gametes"
+        db.add(Question(body="Mitosis is asexual", answer="A", subject="biology", exam_type="waec"))
+        db.commit()
+    finally:
+        db.close()
+    assert [q["body"] for q in search("q=mitosis").json()] == ["Mitosis is asexual"]
+    assert len(search("q=meiosis").json()) == 1
+    client.get("/clear-questions")
+    assert search("q=meiosis").json() == []
+
+def test_index_is_only_used_once_installed():
+    print("--- Test 5: a database without the index is detected at query time ---")
+    other = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}")
+    Base.metadata.create_all(bind=other)
+    assert not fts.available(other)
+    assert fts.install(other) and fts.available(other)
+
+def test_like_fallback_covers_every_indexed_column():
+    client.get("/clear-questions")
+    client.post("/questions/bulk", json=[
+        question("Which organelle carries out respiration?", explanation="The mitochondrion"),
+        question("Define osmosis", options=["Movement of water", "Plasmolysé cells"]),
+        question("Unrelated question"),
+    ])
+    print("--- Test 6: without the index, LIKE searches bodies, options and explanations ---")
+    backend, fts.SEARCH_BACKEND = fts.SEARCH_BACKEND, "none"
+    try:
+        assert [q["body"] for q in search("q=mitochondrion").json()] == ["Which organelle carries out respiration?"]
+        assert [q["body"] for q in search("q=movement%20water").json()] == ["Define osmosis"]
+        assert [q["body"] for q in search("q=plasmolys%C3%A9").json()] == ["Define osmosis"]
+        assert search("q=organelle%20water").json() == []
+    finally:
+        fts.SEARCH_BACKEND = backend
+    client.get("/clear-questions")
+
+if __name__ == "__main__":
+    test_search_ranks_and_filters()
+    test_index_follows_writes()
+    test_index_is_only_used_once_installed()
+    test_like_fallback_covers_every_indexed_column()
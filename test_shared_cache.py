@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine
+from backend.cache import DatabaseVersion, ResponseCache, SQLiteStore, response_cache
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def worker_cache(path, name, maxsize=512):
+    """What one gunicorn worker builds: its own connection to the shared file and version row."""
+    return ResponseCache(maxsize, 60, SQLiteStore(path, maxsize, prune_every=1), DatabaseVersion(name, check_interval=0))
+
+def test_workers_share_entries_and_invalidation():
+    print("\n--- Test 1: an entry stored by one worker is a hit in another ---")
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    name = f"test-{os.getpid()}-{time.time()}"
+    a, b = worker_cache(path, name), worker_cache(path, name)
+    key = a.key("questions", {"subject": "Physics", "limit": 5})
+    a.set(key, (b'[{"id": 1}]', {"X-Total-Count": "1"}), a.generation)
+    assert b.get(key) == (b'[{"id": 1}]', {"X-Total-Count": "1"})
+
+    print("--- Test 2: a write in another process invalidates every worker ---")
+    code = f"from backend.cache import DatabaseVersion; DatabaseVersion({name!r}).bump()"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert a.get(key) is None and b.get(key) is None
+    b.set(key, (b'[]', {}), b.generation)
+    assert a.get(key) == (b'[]', {})
+
+    print("--- Test 3: the shared file stays within maxsize, least recently used first ---")
+    small = worker_cache(os.path.join(tempfile.mkdtemp(), "cache.sqlite"), name, maxsize=2)
+    keys = [small.key("filters", {"subject": s}) for s in ("a", "b", "c")]
+    for k in keys:
+        small.set(k, (k[1][0][1].encode(), {}), small.generation)
+        time.sleep(0.01)
+    assert len(small.store) == 2 and small.get(keys[0]) is None and small.get(keys[2]) == (b"c", {})
+    print(small.stats())
+
+def test_api_reads_see_writes_from_the_job_worker():
+    print("--- Test 4: the API stops serving cached data once another process writes ---")
+    client.get("/clear-questions")
+    client.get("/questions?subject=geography")
+    assert client.get("/questions?subject=geography").headers["X-Cache"] == "HIT"
+    # Stands in for backend/worker.py finishing a job
+    DatabaseVersion(response_cache.version.name).bump()
+    time.sleep(getattr(response_cache.version, "check_interval", 0))
+    assert client.get("/questions?subject=geography").headers["X-Cache"] == "MISS"
+
+if __name__ == "__main__":
+    test_workers_share_entries_and_invalidation()
+    test_api_reads_see_writes_from_the_job_worker()
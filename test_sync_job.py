@@ -0,0 +1,138 @@
+import io
+import os
+import json
+import time
+import tempfile
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine
+from scrapers.local_store import LocalStore
+from scripts.sync_job import EventLog, JobSpecError, load_spec, main, run_job
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def question(n):
+    return {"body": f"Job question {n}", "options": ["A", "B"], "answer": "B", "explanation": None,
+            "source_url": f"https://myschool.ng/classroom/questions/job-{n}"}
+
+def run(spec, store, aloc=None):
+    stream = io.StringIO()
+    summary = run_job(spec, EventLog(stream), store=store, session=client, aloc=aloc)
+    return summary, [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_job_spec_validation():
+    print("\n--- Test 1: specs are validated and CLI flags override them ---")
+    path = os.path.join(tempfile.mkdtemp(), "job.json")
+    with open(path, "w") as f:
+        json.dump({"subjects": "Chemistry, Physics", "years": [2019, 2020], "source": "store"}, f)
+    spec = load_spec(path, {"workers": 2, "server": "http://example.test/"})
+    assert spec["subjects"] == ["Chemistry", "Physics"] and spec["years"] == "2019,2020"
+    assert spec["workers"] == 2 and spec["server"] == "http://example.test" and spec["exam_types"] == ["jamb", "waec", "neco"]
+    for bad in ({"subject": "Chemistry"}, {"source": "aloc-api"}):
+        try:
+            load_spec(None, bad)
+            assert False, bad
+        except JobSpecError as e:
+            print(f"rejected: {e}")
+
+def test_store_job_uploads_changed_partitions():
+    client.get("/clear-questions")
+    store = LocalStore(os.path.join(tempfile.mkdtemp(), "questions.sqlite"))
+    store.save_partition("Chemistry", "waec", 2020, "objective", [question(1), question(2)])
+    store.save_partition("Chemistry", "waec", 2019, "objective", [question(3)])
+    store.save_partition("Physics", "waec", 2020, "objective", [question(4)])  # outside the job
+    spec = load_spec(None, {"server": "http://testserver", "source": "store", "subjects": "Chemistry",
+                            "exam_types": "waec", "years": "2019-2020", "question_types": "objective"})
+
+    print("--- Test 2: a store job pushes the partitions in its scope ---")
+    summary, events = run(spec, store)
+    print([e["event"] for e in events])
+    assert [e["event"] for e in events][0] == "plan" and events[-1]["event"] == "done"
+    assert events[0]["partitions"] == 2 and events[0]["to_scrape"] == 0
+    assert summary["upload"]["accepted"] == 3 and summary["upload"]["partitions"] == 2
+    assert any(e["event"] == "upload_batch" for e in events)
+
+    print("--- Test 3: running it again uploads nothing ---")
+    summary, events = run(spec, store)
+    assert summary["upload"]["questions"] == 0
+    assert [e for e in events if e["event"] == "upload_plan"][0]["partitions"] == 0
+
+def test_cli_dry_run():
+    print("--- Test 4: the CLI writes JSON lines and exits 0 ---")
+    root = tempfile.mkdtemp()
+    events = os.path.join(root, "events.jsonl")
+    code = main(["--subjects", "Chemistry", "--years", "2020", "--dry-run", "--events", events,
+                 "--source", "store"])
+    lines = [json.loads(line) for line in open(events)]
+    assert code == 0 and lines[0]["event"] == "plan" and lines[0]["partitions"] == 6
+
+class FakeALOC:
+    """Answers like the ALOC /m endpoint."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_multiple_questions(self, subject, count=10, year=None, type=None):
+        self.calls.append((subject, year, type))
+        return {"data": [{"question": f"ALOC {subject} {type} {year} #{n}", "option": {"a": "1", "b": "2", "c": "3", "d": "4"},
+                          "answer": "c", "solution": None, "examyear": str(year), "examtype": type} for n in range(3)]}
+
+def test_aloc_job_fetches_into_the_store():
+    client.get("/clear-questions")
+    store = LocalStore(os.path.join(tempfile.mkdtemp(), "questions.sqlite"))
+    spec = load_spec(None, {"server": "http://testserver", "source": "aloc", "subjects": "Chemistry",
+                            "exam_types": "waec,neco", "years": "2020", "aloc_token_env": "TEST_ALOC_TOKEN_UNSET"})
+
+    print("--- Test 5: an ALOC job needs the token variable the spec names ---")
+    os.environ.pop("TEST_ALOC_TOKEN_UNSET", None)
+    try:
+        run(spec, store)
+        assert False
+    except JobSpecError as e:
+        assert "TEST_ALOC_TOKEN_UNSET" in str(e)
+
+    print("--- Test 6: it fetches the partitions ALOC serves (objective WAEC here) and uploads them ---")
+    aloc = FakeALOC()
+    stream = io.StringIO()
+    summary = run_job(spec, EventLog(stream), store=store, session=client, aloc=aloc)
+    assert aloc.calls == [("chemistry", 2020, "wassce")]
+    assert summary["scrape"]["questions"] == 3 and not summary["scrape"]["errors"]
+    assert [q["answer"] for q in store.iter_questions("chemistry", "waec", 2020, "objective")] == ["C"] * 3
+    assert summary["streamed"]["accepted"] == 3 and summary["upload"]["questions"] == 0
+
+class SlowALOC(FakeALOC):
+    """Holds back every fetch after the first until the server has the first partition."""
+
+    def get_multiple_questions(self, subject, count=10, year=None, type=None):
+        deadline = time.monotonic() + 10
+        while self.calls and not client.get("/questions?subject=chemistry").json() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.waited = bool(self.calls) and time.monotonic() < deadline
+        return super().get_multiple_questions(subject, count, year, type)
+
+def test_partitions_upload_while_scraping_continues():
+    client.get("/clear-questions")
+    store = LocalStore(os.path.join(tempfile.mkdtemp(), "questions.sqlite"))
+    spec = load_spec(None, {"server": "http://testserver", "source": "aloc", "subjects": "Chemistry",
+                            "exam_types": "jamb,waec", "years": "2020"})
+
+    print("--- Test 7: the first partition reaches the server before the second is fetched ---")
+    aloc = SlowALOC()
+    summary, events = run(spec, store, aloc)
+    assert len(aloc.calls) == 2 and aloc.waited
+    names = [e["event"] for e in events]
+    assert names.index("upload_partition") < names.index("scrape_done")
+    assert summary["streamed"]["partitions"] == 2 and summary["streamed"]["accepted"] == 6
+    # The catch-up pass finds nothing left and the partitions are checkpointed
+    assert summary["upload"]["questions"] == 0
+    assert all(p.pushed_at for p in store.partitions())
+
+if __name__ == "__main__":
+    test_job_spec_validation()
+    test_store_job_uploads_changed_partitions()
+    test_cli_dry_run()
+    test_aloc_job_fetches_into_the_store()
+    test_partitions_upload_while_scraping_continues()
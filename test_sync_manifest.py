@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine
+from backend.cache import response_cache
+from scripts.remote_manifest import RemoteManifest
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def test_sync_manifest():
+    client.get("/clear-questions")
+    batch = [
+        {"body": "Manifest Q1", "answer": "A", "subject": "Agricultural Science", "year": 2012, "exam_type": "neco",
+         "options": None, "explanation": None, "source_url": "https://myschool.ng/classroom/questions/1"},
+        {"body": "Manifest Q2", "answer": "B", "subject": "Agricultural Science", "year": 2012, "exam_type": "neco",
+         "options": None, "explanation": None},
+    ]
+    client.post("/questions/bulk", json=batch)
+
+    print("\n--- Test 1: Full manifest lists urls and hashes ---")
+    resp = client.get("/sync/manifest?subject=agricultural science")
+    data = resp.json()
+    assert data["count"] == 2
+    assert data["source_urls"] == ["https://myschool.ng/classroom/questions/1"]
+
+    print("--- Test 2: Unchanged scope revalidates to 304 ---")
+    resp = client.get("/sync/manifest?subject=agricultural science&format=compact")
+    etag = resp.headers["ETag"]
+    misses = response_cache.stats()["misses"]
+    again = client.get("/sync/manifest?subject=agricultural science&format=compact", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    # Answered from the data generation, before the cache or the database
+    assert response_cache.stats()["misses"] == misses
+    assert client.get("/sync/manifest?subject=Agricultural Science&format=compact").headers["X-Cache"] == "HIT"
+
+    print("--- Test 3: Compact manifest answers membership ---")
+    compact = resp.json()
+    remote = RemoteManifest(compact["url_hashes"], compact["content_hashes"])
+    assert remote.contains({"source_url": "https://myschool.ng/classroom/questions/1", "body": "changed"})
+    assert remote.contains({"body": " Manifest  Q2", "year": 2012, "exam_type": "NECO"}, subject="Agricultural Science")
+    assert not remote.contains({"body": "Manifest Q3", "year": 2012, "exam_type": "neco"}, subject="Agricultural Science")
+
+    print("--- Test 4: New data changes the ETag ---")
+    client.post("/questions/bulk", json=[dict(batch[1], body="Manifest Q3")])
+    changed = client.get("/sync/manifest?subject=agricultural science&format=compact", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+
+if __name__ == "__main__":
+    test_sync_manifest()
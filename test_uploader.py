@@ -0,0 +1,94 @@
+import os
+import tempfile
+import requests
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import Base, engine
+from scripts.uploader import Uploader, UploadJournal
+
+# Setup test DB
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+class FlakySession:
+    """TestClient wrapper failing chosen calls: 'error' returns a 503, 'lost'
+    lets the server process the batch but drops the response, 'refuse' is a
+    non-retryable 400."""
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.calls = 0
+        self.keys = []
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        self.keys.append(kwargs["headers"]["Idempotency-Key"])
+        failure = self.failures.get(self.calls)
+        if failure == "error":
+            return FakeResponse(503)
+        if failure == "refuse":
+            return FakeResponse(400)
+        if "data" in kwargs:
+            kwargs["content"] = kwargs.pop("data")
+        resp = client.post(url, **kwargs)
+        if failure == "lost":
+            raise requests.ConnectionError("connection reset")
+        return resp
+
+    def close(self):
+        pass
+
+class FakeResponse(requests.Response):
+    def __init__(self, status):
+        super().__init__()
+        self.status_code = status
+        self._content = b"{}"
+
+def questions(n, start=0):
+    return [{"body": f"Upload Q{i}", "answer": "A", "subject": "Civic Education", "year": 2018, "exam_type": "neco",
+             "options": ["x", "y"], "explanation": None, "source_url": f"upload-{i}"} for i in range(start, start + n)]
+
+def uploader(session, **kwargs):
+    journal = UploadJournal(os.path.join(tempfile.mkdtemp(), "journal.sqlite"))
+    options = dict(workers=3, batch_size=50, backoff=0, journal=journal, session=session)
+    options.update(kwargs)
+    return Uploader("http://testserver", **options)
+
+def test_concurrent_upload():
+    client.get("/clear-questions")
+    print("\n--- Test 1: batches run concurrently and grow while the server is fast ---")
+    up = uploader(FlakySession())
+    report = up.upload(questions(1000), progress=lambda msg: None)
+    print(report)
+    assert report["accepted"] == 1000 and not report["failed"]
+    assert up.batch_size > 50 and report["batches"] < 20
+
+def test_retries_reuse_idempotency_key():
+    client.get("/clear-questions")
+    print("--- Test 2: a lost response is retried and replayed, not double counted ---")
+    session = FlakySession({1: "lost", 3: "error"})
+    report = uploader(session, workers=1, batch_size=40, min_batch=40, target_latency=0).upload(questions(100), progress=lambda msg: None)
+    print(report)
+    assert report["accepted"] == 100 and report["duplicates"] == 0 and not report["failed"]
+    assert session.keys[0] == session.keys[1] and session.keys[2] == session.keys[3]
+
+def test_interrupted_upload_resumes():
+    client.get("/clear-questions")
+    print("--- Test 3: a rerun only sends batches that were never acknowledged ---")
+    journal = UploadJournal(os.path.join(tempfile.mkdtemp(), "journal.sqlite"))
+    rows = questions(100)
+    first = uploader(FlakySession({3: "refuse", 4: "refuse"}), workers=1, batch_size=25, min_batch=25, target_latency=0,
+                     journal=journal).upload(rows, progress=lambda msg: None)
+    assert first["accepted"] == 50 and len(first["failed"]) == 2
+
+    session = FlakySession()
+    second = uploader(session, workers=1, batch_size=25, min_batch=25, target_latency=0, journal=journal).upload(rows, progress=lambda msg: None)
+    print(second)
+    assert second["resumed"] == 50 and second["accepted"] == 50 and session.calls == 2
+    assert journal.db.execute("SELECT COUNT(*) FROM acked").fetchone()[0] == 0  # finished jobs are forgotten
+
+if __name__ == "__main__":
+    test_concurrent_upload()
+    test_retries_reuse_idempotency_key()
+    test_interrupted_upload_resumes()